@@ -0,0 +1,66 @@
+# ============================================================================
+# accounts/authentication.py - Résolution token/session -> utilisateur en cache
+# ============================================================================
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+USER_CACHE_KEY = 'auth:user:{}'
+TOKEN_CACHE_KEY = 'auth:token:{}'
+
+
+def get_cached_user(user_id):
+    """Return the user with its profile, from cache when possible"""
+    key = USER_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        try:
+            user = User.objects.select_related('profile').get(pk=user_id)
+        except (User.DoesNotExist, ValueError):
+            return None
+        cache.set(key, user, settings.AUTH_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def invalidate_token(key):
+    cache.delete(TOKEN_CACHE_KEY.format(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication resolving token -> user through the cache"""
+
+    def authenticate_credentials(self, key):
+        cache_key = TOKEN_CACHE_KEY.format(key)
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            user_id = Token.objects.filter(key=key).values_list('user_id', flat=True).first()
+            if user_id is None:
+                raise AuthenticationFailed(_('Invalid token.'))
+            cache.set(cache_key, user_id, settings.AUTH_CACHE_TIMEOUT)
+
+        user = get_cached_user(user_id)
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (user, Token(key=key, user=user))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose per-request session user lookup goes through the cache"""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
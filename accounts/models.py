@@ -33,6 +33,35 @@ class UserProfile(models.Model):
     class Meta:
         verbose_name = _('User Profile')
         verbose_name_plural = _('User Profiles')
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.get_role_display()}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+        }
+
+    def get_changed_fields(self):
+        """Names of fields modified since the profile was loaded or last saved"""
+        loaded = getattr(self, '_loaded_values', None)
+        fields = [
+            field for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in ('created_at', 'updated_at')
+        ]
+        if loaded is None:
+            return [field.name for field in fields]
+        return [
+            field.name for field in fields
+            if field.attname in loaded and getattr(self, field.attname) != loaded[field.attname]
+        ]
@@ -1,9 +1,10 @@
 # core/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from accounts.models import UserProfile  # <-- Corrigé : importer depuis accounts.models
+from accounts.authentication import invalidate_user, invalidate_token
 
 
 @receiver(post_save, sender=User)
@@ -16,6 +17,33 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    """Save user profile when user is saved"""
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
+    """Save the loaded user profile when its fields were changed"""
+    if not User.profile.related.is_cached(instance):
+        return
+    try:
+        profile = instance.profile
+    except UserProfile.DoesNotExist:
+        return
+    changed_fields = profile.get_changed_fields()
+    if changed_fields:
+        profile.save(update_fields=changed_fields + ['updated_at'])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached user so the next request sees the change"""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """Revoked or regenerated tokens stop resolving immediately"""
+    invalidate_token(instance.key)
@@ -0,0 +1,135 @@
+# ============================================================================
+# api/batch.py - Exécution in-process des sous-requêtes du endpoint batch
+# ============================================================================
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+
+API_PREFIX = '/api/v1/'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ALLOWED_METHODS = SAFE_METHODS + ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Unhandled errors of an operation are reported like those of a request
+logger = logging.getLogger('django.request')
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'API_BATCH_WORKERS', 4),
+    thread_name_prefix='api-batch',
+)
+
+
+class BatchError(ValueError):
+    """Invalid batch payload"""
+
+
+def parse_operations(data):
+    """Validate the batch payload and return (operations, parallel)"""
+    if isinstance(data, list):
+        operations, parallel = data, False
+    elif isinstance(data, dict):
+        operations, parallel = data.get('requests'), bool(data.get('parallel', False))
+    else:
+        raise BatchError('Expected a list of requests.')
+
+    if not isinstance(operations, list) or not operations:
+        raise BatchError('Expected a non-empty list of requests.')
+    if len(operations) > settings.API_BATCH_MAX_REQUESTS:
+        raise BatchError(f'A batch may contain at most {settings.API_BATCH_MAX_REQUESTS} requests.')
+
+    for operation in operations:
+        if not isinstance(operation, dict) or not isinstance(operation.get('path'), str):
+            raise BatchError('Each request needs a "path".')
+        operation['method'] = str(operation.get('method', 'GET')).upper()
+        if operation['method'] not in ALLOWED_METHODS:
+            raise BatchError(f'Method "{operation["method"]}" not allowed.')
+        if parallel and operation['method'] not in SAFE_METHODS:
+            raise BatchError('Parallel batches may only contain read requests.')
+    return operations, parallel
+
+
+def build_subrequest(request, operation):
+    """Build a WSGI request for one operation, sharing the batch's authentication"""
+    path = operation['path']
+    if not path.startswith('/'):
+        path = API_PREFIX + path
+    url = urlsplit(path)
+
+    body = b''
+    if operation.get('body') is not None:
+        body = json.dumps(operation['body']).encode()
+
+    environ = {
+        key: value for key, value in request.META.items()
+        if key.startswith(('HTTP_', 'SERVER_', 'REMOTE_')) or key in ('SCRIPT_NAME', 'wsgi.url_scheme')
+    }
+    environ.update({
+        'REQUEST_METHOD': operation['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    })
+    environ.setdefault('wsgi.url_scheme', request.scheme)
+
+    subrequest = WSGIRequest(environ)
+    # Picked up by DRF's Request: the batch was already authenticated once
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def run_operation(request, operation):
+    """Dispatch one operation through the URL resolver and return its result"""
+    subrequest = build_subrequest(request, operation)
+    path = subrequest.path_info
+    if not path.startswith(API_PREFIX) or path.rstrip('/') == API_PREFIX + 'batch':
+        return {'status': 400, 'body': {'detail': f'Path "{path}" cannot be batched.'}}
+
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {'status': 404, 'body': {'detail': 'Not found.'}}
+
+    view = match.func
+    if asyncio.iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        response = view(subrequest, *match.args, **match.kwargs)
+        if getattr(response, 'streaming', False):
+            return {'status': 406, 'body': {'detail': 'Streaming responses cannot be batched.'}}
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        # Only this operation fails, the others still get their result
+        logger.exception('Internal Server Error: %s', path, extra={'status_code': 500, 'request': subrequest})
+        return {'status': 500, 'body': {'detail': 'A server error occurred.'}}
+
+    content = response.content.decode(response.charset or 'utf-8')
+    if response.get('Content-Type', '').startswith('application/json') and content:
+        content = json.loads(content)
+    return {'status': response.status_code, 'body': content or None}
+
+
+def _run_in_thread(request, operation):
+    try:
+        return run_operation(request, operation)
+    finally:
+        close_old_connections()
+
+
+def run_batch(request, operations, parallel=False):
+    """Run operations in order, or concurrently when they are all reads"""
+    if not parallel:
+        return [run_operation(request, operation) for operation in operations]
+    futures = [_executor.submit(_run_in_thread, request, operation) for operation in operations]
+    return [future.result() for future in futures]
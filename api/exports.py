@@ -65,11 +65,11 @@ def generate_invoice_pdf(invoice):
     # Client info
     elements.append(Paragraph(_("<b>Client Information</b>"), styles['Heading3']))
     client_info = f"""
-    <b>{invoice.client.name}</b><br/>
+    <b>{invoice.client_name}</b><br/>
     {invoice.client.company}<br/>
     {invoice.client.address}<br/>
     {invoice.client.postal_code} {invoice.client.city}, {invoice.client.country}<br/>
-    {_("Tax ID")}: {invoice.client.tax_id}<br/>
+    {_("Tax ID")}: {invoice.client_tax_id}<br/>
     {_("Email")}: {invoice.client.email}<br/>
     {_("Phone")}: {invoice.client.phone}
     """
@@ -168,7 +168,7 @@ def generate_proforma_pdf(proforma):
     # Client info
     elements.append(Paragraph(_("<b>Client Information</b>"), styles['Heading3']))
     client_info = f"""
-    <b>{proforma.client.name}</b><br/>
+    <b>{proforma.client_name}</b><br/>
     {proforma.client.company}<br/>
     {proforma.client.address}<br/>
     {proforma.client.postal_code} {proforma.client.city}, {proforma.client.country}
@@ -256,7 +256,7 @@ def generate_invoice_excel(invoice):
     ws['E3'] = invoice.invoice_date
     
     ws['A4'] = _("Client:")
-    ws['B4'] = invoice.client.name
+    ws['B4'] = invoice.client_name
     ws['D4'] = _("Due Date:")
     ws['E4'] = invoice.due_date
     
@@ -350,7 +350,7 @@ def generate_invoices_list_excel(invoices):
     row = 2
     for invoice in invoices:
         ws.cell(row=row, column=1).value = invoice.invoice_number
-        ws.cell(row=row, column=2).value = invoice.client.name
+        ws.cell(row=row, column=2).value = invoice.client_name
         ws.cell(row=row, column=3).value = invoice.invoice_date
         ws.cell(row=row, column=4).value = invoice.due_date
         ws.cell(row=row, column=5).value = invoice.total
@@ -407,7 +407,7 @@ def generate_proforma_excel(proforma):
     # Client info
     ws['A6'] = "Client Information:"
     ws['A7'] = "Name:"
-    ws['B7'] = proforma.client.name
+    ws['B7'] = proforma.client_name
     ws['A8'] = "Email:"
     ws['B8'] = proforma.client.email
     ws['A9'] = "Address:"
@@ -0,0 +1,20 @@
+# ============================================================================
+# api/filters.py - Filtres DRF communs
+# ============================================================================
+from rest_framework import filters
+
+from core.search import search_q
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """SearchFilter backed by the full-text indexes of core.search"""
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        # '^', '=', '@' and '$' lookups keep the default behaviour
+        if any(field[0] in self.lookup_prefixes for field in search_fields):
+            return super().filter_queryset(request, queryset, view)
+        return queryset.filter(search_q(queryset.model, search_terms, search_fields, using=queryset.db))
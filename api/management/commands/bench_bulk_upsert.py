@@ -0,0 +1,63 @@
+# ============================================================================
+# api/management/commands/bench_bulk_upsert.py
+# ============================================================================
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from products.models import Product
+
+BENCH_USER = 'bench-bulk-upsert'
+SKU_PREFIX = 'BENCH-UPSERT-'
+
+
+class Command(BaseCommand):
+    help = "Compare one POST per product with a single /products/bulk/ upsert (the products are deleted afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 5000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    # Requests go through the whole stack (URLs, middleware, rendering), as the ERP's do
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        self.client = APIClient()
+        self.stdout.write(f"{'rows':>6} {'single (ms)':>12} {'bulk (ms)':>10} {'speedup':>8}")
+        for rows in options['rows']:
+            single = min(self.run(self.create_single, rows) for _ in range(options['repeat']))
+            bulk = min(self.run(self.upsert_bulk, rows) for _ in range(options['repeat']))
+            self.stdout.write(f"{rows:>6} {single * 1000:>12.1f} {bulk * 1000:>10.1f} {single / bulk:>7.1f}x")
+
+    def run(self, create, rows):
+        # Committed like real requests: one transaction per POST against one per bulk batch
+        user = User.objects.create_user(BENCH_USER)
+        payload = [self.row(i) for i in range(rows)]
+        try:
+            start = time.perf_counter()
+            create(user, payload)
+            return time.perf_counter() - start
+        finally:
+            Product.objects.filter(sku__startswith=SKU_PREFIX).delete()
+            user.delete()
+
+    def row(self, i):
+        return {'name': f'Bench {i}', 'sku': f'{SKU_PREFIX}{i:06d}', 'unit_price': '10.00', 'quantity_in_stock': 0}
+
+    def post(self, url, data):
+        response = self.client.post(url, data, format='json')
+        assert response.status_code in (200, 201), response.content
+
+    def create_single(self, user, payload):
+        """One API request per product"""
+        self.client.force_authenticate(user)
+        url = reverse('product-list')
+        for row in payload:
+            self.post(url, row)
+
+    def upsert_bulk(self, user, payload):
+        self.client.force_authenticate(user)
+        self.post(reverse('product-bulk'), payload)
@@ -0,0 +1,79 @@
+# ============================================================================
+# api/management/commands/bench_document_create.py
+# ============================================================================
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.serializers import InvoiceSerializer
+from clients.models import Client
+from invoices.models import Invoice, InvoiceItem
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare per-line invoice creation with nested single-request creation (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[1, 50, 500])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'lines':>6} {'per-line (ms)':>14} {'nested (ms)':>12} {'speedup':>8}")
+        for lines in options['lines']:
+            legacy = min(self.run(self.create_per_line, lines) for _ in range(options['repeat']))
+            nested = min(self.run(self.create_nested, lines) for _ in range(options['repeat']))
+            self.stdout.write(
+                f"{lines:>6} {legacy * 1000:>14.1f} {nested * 1000:>12.1f} {legacy / nested:>7.1f}x"
+            )
+
+    def run(self, create, lines):
+        try:
+            with transaction.atomic():
+                client = Client.objects.create(
+                    name='Benchmark', address='-', city='-', postal_code='-', country='-'
+                )
+                start = time.perf_counter()
+                create(client, lines)
+                elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            return elapsed
+
+    def header(self, client):
+        return {
+            'invoice_number': 'BENCH-00001',
+            'client': client.pk,
+            'invoice_date': date.today(),
+            'due_date': date.today() + timedelta(days=30),
+        }
+
+    def line(self, i):
+        return {
+            'description': f'Line {i}',
+            'quantity': Decimal('2'),
+            'unit_price': Decimal('10.00'),
+            'tax_rate': Decimal('20'),
+        }
+
+    def create_per_line(self, client, lines):
+        """Legacy path: one insert per line, each recomputing the invoice totals"""
+        header = self.header(client)
+        header['client'] = client
+        invoice = Invoice.objects.create(**header)
+        for i in range(lines):
+            InvoiceItem.objects.create(invoice=invoice, **self.line(i))
+
+    def create_nested(self, client, lines):
+        serializer = InvoiceSerializer(data={
+            **self.header(client),
+            'items': [self.line(i) for i in range(lines)],
+        })
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
@@ -0,0 +1,276 @@
+# ============================================================================
+# api/mixins.py - Mixins réutilisables pour les ViewSets de l'API
+# ============================================================================
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from core.autocomplete import invalidate_model
+from core.bulk import upsert_rows
+from core.ids import uuid7
+from core.snapshots import refresh_party_snapshots
+
+
+def parse_updated_since(request):
+    """Parse the ``updated_since`` query parameter into an aware datetime"""
+    value = request.query_params.get('updated_since')
+    if not value:
+        return None
+    since = parse_datetime(value.replace(' ', '+'))
+    if since is None:
+        raise ValidationError({'updated_since': ['Expected an ISO 8601 timestamp.']})
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class ChangeFeedMixin:
+    """
+    Delta-sync cursor: ``?updated_since=<timestamp>[&after_id=<id>]``.
+
+    Returns objects changed after the cursor ordered by ``(<field>, id)``,
+    which is backed by a composite index on every synced model. Clients
+    resume from the ``updated_at`` and ``id`` of the last row they received.
+    """
+    change_feed_field = 'updated_at'
+    # Cursor of the current request, read by KeysetPagination
+    change_feed_since = None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        since = parse_updated_since(self.request)
+        if since is None:
+            return queryset
+        self.change_feed_since = since
+
+        field = self.change_feed_field
+        after_id = self.request.query_params.get('after_id')
+        if after_id:
+            try:
+                after_id = queryset.model._meta.pk.to_python(after_id)
+            except (DjangoValidationError, ValueError):
+                raise ValidationError({'after_id': ['Not a valid id.']})
+            cursor = Q(**{f'{field}__gt': since}) | Q(**{field: since, 'id__gt': after_id})
+        else:
+            cursor = Q(**{f'{field}__gt': since})
+        return queryset.filter(cursor).order_by(field, 'id')
+
+
+class BulkUpsertMixin:
+    """
+    Adds a ``POST <resource>/bulk/`` action accepting a list of objects.
+
+    Rows are validated with one serializer per set of keys, limited to the
+    fields they give plus the required ones, then written in batches with
+    :func:`core.bulk.upsert_rows` keyed on ``bulk_unique_field``, a unique
+    natural key the sender knows (``sku``, ``external_reference``); keyed
+    on ``id``, rows without one are always inserted. An existing object
+    only gets the fields present in its row (rows are grouped by field
+    set), the others keep their value. The response reports one result
+    per input row.
+    """
+    bulk_unique_field = 'id'
+    bulk_batch_size = 500
+    bulk_excluded_update_fields = ('id', 'created_at', 'created_by')
+
+    def get_bulk_update_fields(self, model):
+        return [
+            field.name for field in model._meta.concrete_fields
+            if field.name not in self.bulk_excluded_update_fields
+            and field.name != self.bulk_unique_field
+            and not field.generated
+        ]
+
+    def get_bulk_row_fields(self, serializer, row, update_fields):
+        """Fields of ``update_fields`` given by ``row``, plus the auto_now timestamps"""
+        given = {
+            serializer.fields[name].source for name in row
+            if name in serializer.fields and not serializer.fields[name].read_only
+        }
+        model = serializer.Meta.model
+        return tuple(
+            name for name in update_fields
+            if name in given or getattr(model._meta.get_field(name), 'auto_now', False)
+        )
+
+    def bulk_created(self, rows):
+        """Called in the batch's transaction with the rows the batch created, as dicts of field values"""
+
+    def get_bulk_serializer(self, names):
+        """Serializer validating the rows giving the keys ``names``"""
+        serializer = self.get_serializer()
+        fields = serializer.fields
+        for name, field in list(fields.items()):
+            # Rows only run the fields they give, plus the required ones to report them missing
+            if name not in names and not field.required:
+                fields.pop(name)
+                continue
+            # Existing natural keys are expected in an upsert payload
+            field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        return serializer
+
+    def get_bulk_key(self, row, validated_data):
+        """Return the natural key of a row, generating a UUID when keyed on ``id``"""
+        if self.bulk_unique_field != 'id':
+            key = validated_data.get(self.bulk_unique_field)
+            if key in (None, ''):
+                raise serializers.ValidationError({self.bulk_unique_field: ['This field is required.']})
+            return key
+        raw_id = row.get('id')
+        if not raw_id:
+            return uuid7()
+        try:
+            return uuid.UUID(str(raw_id))
+        except ValueError:
+            raise serializers.ValidationError({'id': ['Must be a valid UUID.']})
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create or update a list of objects in batches"""
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'detail': 'Expected a list of objects.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        model = self.get_queryset().model
+        key_field = self.bulk_unique_field
+        pk_name = model._meta.pk.name
+        db = router.db_for_write(model)
+        # Serializer and fields to update, per set of row keys
+        by_keys = {}
+        update_fields = self.get_bulk_update_fields(model)
+        results = [None] * len(rows)
+
+        for start in range(0, len(rows), self.bulk_batch_size):
+            batch = []
+            seen = set()
+            for index in range(start, min(start + self.bulk_batch_size, len(rows))):
+                row = rows[index]
+                try:
+                    if not isinstance(row, dict):
+                        raise serializers.ValidationError({'non_field_errors': ['Expected an object.']})
+                    names = frozenset(row)
+                    if names not in by_keys:
+                        serializer = self.get_bulk_serializer(names)
+                        by_keys[names] = serializer, self.get_bulk_row_fields(serializer, row, update_fields)
+                    serializer, fields = by_keys[names]
+                    validated_data = serializer.run_validation(row)
+                    key = self.get_bulk_key(row, validated_data)
+                except serializers.ValidationError as exc:
+                    results[index] = {'index': index, 'status': 'error', 'errors': exc.detail}
+                    continue
+                if key in seen:
+                    results[index] = {
+                        'index': index, 'status': 'error',
+                        'errors': {key_field: ['Duplicate value in payload.']}
+                    }
+                    continue
+                seen.add(key)
+                validated_data[key_field] = key
+                validated_data['created_by'] = request.user
+                batch.append((index, validated_data, fields))
+
+            if not batch:
+                continue
+
+            # upsert_rows takes rows with the same keys
+            groups = defaultdict(list)
+            for _, values, fields in batch:
+                groups[frozenset(values), fields].append(values)
+            with transaction.atomic(using=db):
+                keys = [values[key_field] for _, values, _ in batch]
+                existing = dict(
+                    model._default_manager.using(db).filter(**{f'{key_field}__in': keys})
+                    .values_list(key_field, 'pk')
+                )
+                for (_, fields), group in groups.items():
+                    upsert_rows(model, group, key_field, fields, using=db)
+                self.bulk_created([values for _, values, _ in batch if values[key_field] not in existing])
+
+            for index, values, _ in batch:
+                key = values[key_field]
+                results[index] = {
+                    'index': index,
+                    'status': 'updated' if key in existing else 'created',
+                    'id': str(existing.get(key, values[pk_name])),
+                }
+                if key_field != 'id':
+                    results[index][key_field] = key
+
+        # upsert_rows does not send post_save
+        invalidate_model(model)
+        refresh_party_snapshots(model, [result['id'] for result in results if result['status'] == 'updated'])
+
+        summary = {'created': 0, 'updated': 0, 'error': 0}
+        for result in results:
+            summary[result['status']] += 1
+
+        return Response(
+            {
+                'created': summary['created'],
+                'updated': summary['updated'],
+                'errors': summary['error'],
+                'results': results,
+            },
+            status=status.HTTP_207_MULTI_STATUS if summary['error'] else status.HTTP_200_OK
+        )
+
+
+class ConversionRequestSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    def validate_ids(self, ids):
+        limit = settings.API_CONVERT_MAX_DOCUMENTS
+        if len(ids) > limit:
+            raise serializers.ValidationError(f'At most {limit} documents can be converted at once.')
+        return ids
+
+
+class BulkConvertMixin:
+    """
+    Adds a ``POST <resource>/convert/`` action taking ``{"ids": [...]}``.
+
+    The selected documents are converted in one transaction by
+    ``convert_documents(queryset)``, one of the services of
+    ``core.conversions``. The response lists the created documents and
+    the ids that were skipped (not found, not convertible or already
+    converted).
+    """
+    convert_number_field = None
+
+    def convert_documents(self, queryset):
+        raise NotImplementedError
+
+    @action(detail=False, methods=['post'])
+    def convert(self, request):
+        """Convert a selection of documents"""
+        payload = ConversionRequestSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        ids = payload.validated_data['ids']
+
+        pairs = self.convert_documents(self.get_queryset().filter(pk__in=ids))
+        converted = {source.pk for source, _ in pairs}
+        return Response({
+            'converted': [
+                {
+                    'source': str(source.pk),
+                    'id': str(target.pk),
+                    self.convert_number_field: getattr(target, self.convert_number_field),
+                }
+                for source, target in pairs
+            ],
+            'skipped': [str(pk) for pk in dict.fromkeys(ids) if pk not in converted],
+        }, status=status.HTTP_201_CREATED if pairs else status.HTTP_200_OK)
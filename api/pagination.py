@@ -0,0 +1,80 @@
+# ============================================================================
+# api/pagination.py - Pagination par numéro de page ou par clé (keyset)
+# ============================================================================
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page numbers by default, keyset pages with ``?after=<id>``.
+
+    Passing ``after`` (empty for the first page) orders the list by primary
+    key, newest first with the time-ordered ids of :mod:`core.ids`, and
+    starts each page after the given id. Pages are then read straight from
+    the primary key index: no OFFSET, no COUNT, and rows inserted meanwhile
+    do not shift the next page. ``?ordering`` is ignored in that mode.
+
+    With a change-feed cursor (``?updated_since``, see
+    :class:`~api.mixins.ChangeFeedMixin`) the feed's ``(updated_at, id)``
+    order and cursor are kept instead, and the next link carries the
+    cursor of the page's last row.
+    """
+    keyset_query_param = 'after'
+    keyset_ordering = '-pk'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+
+        self.change_feed_field = None
+        if getattr(view, 'change_feed_since', None) is not None:
+            self.change_feed_field = view.change_feed_field
+            return self.keyset_page(queryset, page_size)
+
+        queryset = queryset.order_by(self.keyset_ordering)
+        after = request.query_params[self.keyset_query_param]
+        if after:
+            try:
+                after = queryset.model._meta.pk.to_python(after)
+            except DjangoValidationError:
+                raise ValidationError({self.keyset_query_param: ['Not a valid id.']})
+            lookup = 'pk__lt' if self.keyset_ordering.startswith('-') else 'pk__gt'
+            queryset = queryset.filter(**{lookup: after})
+        return self.keyset_page(queryset, page_size)
+
+    def keyset_page(self, queryset, page_size):
+        rows = list(queryset[:page_size + 1])
+        self.keyset_rows = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        return self.keyset_rows
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        last = self.keyset_rows[-1]
+        if self.change_feed_field:
+            url = replace_query_param(url, 'updated_since', getattr(last, self.change_feed_field).isoformat())
+            return replace_query_param(url, 'after_id', last.pk)
+        return replace_query_param(url, self.keyset_query_param, last.pk)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
@@ -1,17 +1,61 @@
+from django.db import transaction
 from rest_framework import serializers
 from accounts.models import UserProfile
 from clients.models import Client
 from suppliers.models import Supplier
 from products.models import Product
-from invoices.models import Invoice, InvoiceItem
+from invoices.models import (
+    ArchivedInvoice, ArchivedInvoiceItem, BillingRun, Invoice, InvoiceItem, RecurringInvoice, RecurringInvoiceItem
+)
 from proforma.models import ProformaInvoice, ProformaItem
 from delivery.models import DeliveryNote, DeliveryItem
 from orders.models import CustomerOrder, CustomerOrderItem, SupplierOrder, SupplierOrderItem
+from orders.reservations import RESERVING_STATUSES, reserve_order
 from payments.models import Payment
-from core.models import DashboardMetric
+from core.models import DashboardMetric, Tombstone
 from django.contrib.auth.models import User
 
 
+# ============================================================================
+# Nested Line Items
+# ============================================================================
+
+class WritableItemsMixin:
+    """
+    Accept a writable nested ``items`` list on document serializers.
+
+    Lines are inserted with a single ``bulk_create`` inside the document's
+    transaction and totals are recalculated once, instead of once per line.
+    On update, a provided ``items`` list replaces the existing lines.
+    """
+    item_parent_field = None
+
+    def _write_items(self, document, items_data):
+        item_model = self.fields['items'].child.Meta.model
+        items = [item_model(**{self.item_parent_field: document}, **data) for data in items_data]
+        for item in items:
+            item.calculate_amounts()
+        item_model.objects.bulk_create(items)
+        document.calculate_totals()
+
+    def create(self, validated_data):
+        items_data = validated_data.pop('items', None)
+        with transaction.atomic():
+            document = super().create(validated_data)
+            if items_data:
+                self._write_items(document, items_data)
+        return document
+
+    def update(self, instance, validated_data):
+        items_data = validated_data.pop('items', None)
+        with transaction.atomic():
+            document = super().update(instance, validated_data)
+            if items_data is not None:
+                document.items.all().delete()
+                self._write_items(document, items_data)
+        return document
+
+
 # ============================================================================
 # User & Authentication Serializers
 # ============================================================================
@@ -41,8 +85,10 @@ class ClientSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Client
-        fields = '__all__'
+        exclude = ('name_search', 'company_search', 'email_search')
         read_only_fields = ('id', 'created_at', 'updated_at', 'created_by')
+        # Unset is NULL: several blank values would collide on the unique index
+        extra_kwargs = {'external_reference': {'allow_blank': False}}
 
 
 class SupplierSerializer(serializers.ModelSerializer):
@@ -50,8 +96,10 @@ class SupplierSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Supplier
-        fields = '__all__'
+        exclude = ('name_search', 'company_search', 'email_search')
         read_only_fields = ('id', 'created_at', 'updated_at', 'created_by')
+        # Unset is NULL: several blank values would collide on the unique index
+        extra_kwargs = {'external_reference': {'allow_blank': False}}
 
 
 # ============================================================================
@@ -59,17 +107,15 @@ class SupplierSerializer(serializers.ModelSerializer):
 # ============================================================================
 
 class ProductSerializer(serializers.ModelSerializer):
-    is_low_stock = serializers.SerializerMethodField()
+    is_low_stock = serializers.BooleanField(read_only=True)
+    quantity_available = serializers.IntegerField(read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ('name_search',)
         read_only_fields = ('id', 'created_at', 'updated_at', 'created_by')
 
-    def get_is_low_stock(self, obj):
-        return obj.is_low_stock()
-
 
 # ============================================================================
 # Invoice Serializers
@@ -84,10 +130,15 @@ class InvoiceItemSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'subtotal', 'tax', 'total', 'created_at')
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
-    items = InvoiceItemSerializer(many=True, read_only=True)
-    client_name = serializers.CharField(source='client.name', read_only=True)
+class InvoiceItemNestedSerializer(InvoiceItemSerializer):
+    class Meta(InvoiceItemSerializer.Meta):
+        read_only_fields = InvoiceItemSerializer.Meta.read_only_fields + ('invoice',)
+
+
+class InvoiceSerializer(WritableItemsMixin, serializers.ModelSerializer):
+    items = InvoiceItemNestedSerializer(many=True, required=False)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    item_parent_field = 'invoice'
 
     class Meta:
         model = Invoice
@@ -95,6 +146,70 @@ class InvoiceSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at', 'created_by')
 
 
+class ArchivedInvoiceItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = ArchivedInvoiceItem
+        fields = '__all__'
+
+
+class ArchivedInvoiceSerializer(serializers.ModelSerializer):
+    """Read-only shape of InvoiceSerializer for invoices moved to the archive"""
+    items = ArchivedInvoiceItemSerializer(many=True, read_only=True)
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    is_archived = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = ArchivedInvoice
+        fields = '__all__'
+
+
+class BillingRunSerializer(serializers.ModelSerializer):
+    invoice_date = serializers.DateField(required=False)
+
+    class Meta:
+        model = BillingRun
+        fields = '__all__'
+        read_only_fields = ('id', 'status', 'invoice_count', 'line_count', 'error', 'created_by',
+                            'created_at', 'updated_at', 'finished_at')
+        # A period already run is resumed rather than rejected
+        validators = []
+
+    def validate(self, attrs):
+        if attrs['period_start'] > attrs['period_end']:
+            raise serializers.ValidationError({'period_end': ['Must not be before period_start.']})
+        return attrs
+
+
+class RecurringInvoiceItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = RecurringInvoiceItem
+        fields = '__all__'
+        read_only_fields = ('id', 'subtotal', 'tax', 'total', 'recurring_invoice')
+
+
+class RecurringInvoiceSerializer(WritableItemsMixin, serializers.ModelSerializer):
+    items = RecurringInvoiceItemSerializer(many=True, required=False)
+    client_name = serializers.CharField(source='client.name', read_only=True)
+    item_parent_field = 'recurring_invoice'
+
+    class Meta:
+        model = RecurringInvoice
+        fields = '__all__'
+        read_only_fields = ('id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at', 'created_by')
+        extra_kwargs = {'next_run': {'required': False}}
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if end_date and start_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': ['Must not be before start_date.']})
+        return attrs
+
+
 # ============================================================================
 # Proforma Invoices Serializers
 # ============================================================================
@@ -108,10 +223,15 @@ class ProformaItemSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'subtotal', 'tax', 'total', 'created_at')
 
 
-class ProformaInvoiceSerializer(serializers.ModelSerializer):
-    items = ProformaItemSerializer(many=True, read_only=True)
-    client_name = serializers.CharField(source='client.name', read_only=True)
+class ProformaItemNestedSerializer(ProformaItemSerializer):
+    class Meta(ProformaItemSerializer.Meta):
+        read_only_fields = ProformaItemSerializer.Meta.read_only_fields + ('proforma',)
+
+
+class ProformaInvoiceSerializer(WritableItemsMixin, serializers.ModelSerializer):
+    items = ProformaItemNestedSerializer(many=True, required=False)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    item_parent_field = 'proforma'
 
     class Meta:
         model = ProformaInvoice
@@ -134,7 +254,6 @@ class DeliveryItemSerializer(serializers.ModelSerializer):
 
 class DeliveryNoteSerializer(serializers.ModelSerializer):
     items = DeliveryItemSerializer(many=True, read_only=True)
-    client_name = serializers.CharField(source='client.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
 
     class Meta:
@@ -156,16 +275,27 @@ class CustomerOrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'subtotal', 'tax', 'total')
 
 
-class CustomerOrderSerializer(serializers.ModelSerializer):
-    items = CustomerOrderItemSerializer(many=True, read_only=True)
-    client_name = serializers.CharField(source='client.name', read_only=True)
+class CustomerOrderItemNestedSerializer(CustomerOrderItemSerializer):
+    class Meta(CustomerOrderItemSerializer.Meta):
+        read_only_fields = CustomerOrderItemSerializer.Meta.read_only_fields + ('order',)
+
+
+class CustomerOrderSerializer(WritableItemsMixin, serializers.ModelSerializer):
+    items = CustomerOrderItemNestedSerializer(many=True, required=False)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    item_parent_field = 'order'
 
     class Meta:
         model = CustomerOrder
         fields = '__all__'
         read_only_fields = ('id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at', 'created_by')
 
+    def _write_items(self, document, items_data):
+        super()._write_items(document, items_data)
+        # Lines written after the order was saved: reserve them if it already is confirmed
+        if document.status in RESERVING_STATUSES:
+            reserve_order(document)
+
 
 # ============================================================================
 # Supplier Orders Serializers
@@ -180,10 +310,15 @@ class SupplierOrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'subtotal', 'tax', 'total')
 
 
-class SupplierOrderSerializer(serializers.ModelSerializer):
-    items = SupplierOrderItemSerializer(many=True, read_only=True)
-    supplier_name = serializers.CharField(source='supplier.name', read_only=True)
+class SupplierOrderItemNestedSerializer(SupplierOrderItemSerializer):
+    class Meta(SupplierOrderItemSerializer.Meta):
+        read_only_fields = SupplierOrderItemSerializer.Meta.read_only_fields + ('order',)
+
+
+class SupplierOrderSerializer(WritableItemsMixin, serializers.ModelSerializer):
+    items = SupplierOrderItemNestedSerializer(many=True, required=False)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    item_parent_field = 'order'
 
     class Meta:
         model = SupplierOrder
@@ -214,3 +349,13 @@ class DashboardMetricSerializer(serializers.ModelSerializer):
         model = DashboardMetric
         fields = '__all__'
         read_only_fields = ('id', 'created_at', 'updated_at')
+
+
+# ============================================================================
+# Delta Sync Serializers
+# ============================================================================
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tombstone
+        fields = ('id', 'model', 'object_id', 'deleted_at')
@@ -11,6 +11,8 @@ router.register(r'products', views.ProductViewSet, basename='product')
 
 router.register(r'invoices', views.InvoiceViewSet, basename='invoice')
 router.register(r'invoice-items', views.InvoiceItemViewSet, basename='invoiceitem')
+router.register(r'billing-runs', views.BillingRunViewSet, basename='billingrun')
+router.register(r'recurring-invoices', views.RecurringInvoiceViewSet, basename='recurringinvoice')
 
 router.register(r'proforma-invoices', views.ProformaInvoiceViewSet, basename='proformainvoice')
 router.register(r'proforma-items', views.ProformaItemViewSet, basename='proformaitem')
@@ -26,8 +28,16 @@ router.register(r'supplier-order-items', views.SupplierOrderItemViewSet, basenam
 
 router.register(r'payments', views.PaymentViewSet, basename='payment')
 
+router.register(r'tombstones', views.TombstoneViewSet, basename='tombstone')
+
 urlpatterns = [
     path('', include(router.urls)),
+    path('batch/', views.batch, name='batch'),
+    path('search/', views.search, name='search'),
+    path('autocomplete/<str:source>/', views.autocomplete_lookup, name='autocomplete'),
     path('dashboard/overview/', views.dashboard_overview, name='dashboard-overview'),
+    path('dashboard/overview/async/', views.dashboard_overview_async, name='dashboard-overview-async'),
     path('analytics/sales/', views.sales_statistics, name='sales-statistics'),
+    path('analytics/sales/async/', views.sales_statistics_async, name='sales-statistics-async'),
+    path('reports/aging/', views.receivables_aging_report, name='receivables-aging'),
 ]
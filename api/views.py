@@ -1,29 +1,51 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import serializers, viewsets, filters, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
+from asgiref.sync import sync_to_async
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q
 from django.utils import timezone
-from django.http import FileResponse
-from datetime import timedelta
+from django.http import FileResponse, Http404, JsonResponse
+from functools import wraps
 from accounts.models import UserProfile
 from clients.models import Client
 from suppliers.models import Supplier
-from products.models import Product
-from invoices.models import Invoice, InvoiceItem
+from products.models import Product, StockMovement
+from invoices.billing import run_billing, start_billing_run
+from invoices.models import ArchivedInvoice, BillingRun, Invoice, InvoiceItem, RecurringInvoice
 from proforma.models import ProformaInvoice, ProformaItem
 from delivery.models import DeliveryNote, DeliveryItem
 from orders.models import CustomerOrder, CustomerOrderItem, SupplierOrder, SupplierOrderItem
+from orders.reservations import InsufficientStock
 from payments.models import Payment
-from core.models import DashboardMetric
+from core.models import DashboardMetric, Tombstone
+from core.autocomplete import SOURCES as AUTOCOMPLETE_SOURCES, autocomplete
+from core.conversions import (
+    convert_delivery_notes_to_invoices, convert_orders_to_delivery_notes, convert_proformas_to_invoices
+)
+from core.global_search import global_search
+from core.routers import reporting_view
+from core.metrics import (
+    run_serially, run_concurrently, overview_queries, sales_statistics_queries,
+    receivables_aging, parse_period_days
+)
 
 from .serializers import (
     UserProfileSerializer, ClientSerializer, SupplierSerializer, ProductSerializer,
-    InvoiceSerializer, InvoiceItemSerializer, ProformaInvoiceSerializer, ProformaItemSerializer,
+    InvoiceSerializer, InvoiceItemSerializer, ArchivedInvoiceSerializer, BillingRunSerializer,
+    RecurringInvoiceSerializer, ProformaInvoiceSerializer, ProformaItemSerializer,
     DeliveryNoteSerializer, DeliveryItemSerializer, CustomerOrderSerializer, CustomerOrderItemSerializer,
-    SupplierOrderSerializer, SupplierOrderItemSerializer, PaymentSerializer, DashboardMetricSerializer
+    SupplierOrderSerializer, SupplierOrderItemSerializer, PaymentSerializer, DashboardMetricSerializer,
+    TombstoneSerializer
 )
+from .filters import FullTextSearchFilter
+from .mixins import BulkConvertMixin, BulkUpsertMixin, ChangeFeedMixin
+from .batch import BatchError, parse_operations, run_batch
 from .exports import (
     generate_invoice_pdf, generate_invoice_excel, generate_invoices_list_excel,
     generate_proforma_pdf
@@ -34,7 +56,7 @@ from .exports import (
 # User & Authentication ViewSets
 # ============================================================================
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for user profiles
     """
@@ -60,17 +82,19 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 # Client ViewSet
 # ============================================================================
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(ChangeFeedMixin, BulkUpsertMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing clients
     """
     queryset = Client.objects.filter(is_active=True).order_by('-created_at')
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'city', 'country']
     search_fields = ['name', 'company', 'email', 'phone', 'tax_id']
     ordering_fields = ['name', 'created_at']
+    # Synced records are matched on the sender's key, which knows nothing of our ids
+    bulk_unique_field = 'external_reference'
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -80,17 +104,19 @@ class ClientViewSet(viewsets.ModelViewSet):
 # Supplier ViewSet
 # ============================================================================
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(ChangeFeedMixin, BulkUpsertMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing suppliers
     """
     queryset = Supplier.objects.filter(is_active=True).order_by('-created_at')
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'city', 'country']
     search_fields = ['name', 'company', 'email', 'phone', 'tax_id']
     ordering_fields = ['name', 'created_at']
+    # Synced records are matched on the sender's key, which knows nothing of our ids
+    bulk_unique_field = 'external_reference'
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -100,27 +126,41 @@ class SupplierViewSet(viewsets.ModelViewSet):
 # Product ViewSet
 # ============================================================================
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ChangeFeedMixin, BulkUpsertMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing products
     """
     queryset = Product.objects.filter(is_active=True).order_by('name')
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'category']
     search_fields = ['name', 'sku', 'reference', 'description']
     ordering_fields = ['name', 'unit_price', 'quantity_in_stock']
+    bulk_unique_field = 'sku'
+    # Stock of existing products only moves through the ledger (products.stock) and reservations
+    bulk_excluded_update_fields = BulkUpsertMixin.bulk_excluded_update_fields + (
+        'quantity_in_stock', 'quantity_reserved',
+    )
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def bulk_created(self, rows):
+        # The bulk path skips Product.save(), which records the opening stock
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(product_id=row['id'], kind=StockMovement.ADJUSTMENT,
+                              quantity=row['quantity_in_stock'], reference='Opening balance')
+                for row in rows if row.get('quantity_in_stock')
+            ],
+            batch_size=1000,
+        )
+
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Get products with low stock"""
-        low_stock_products = self.queryset.filter(
-            quantity_in_stock__lte=F('reorder_level')
-        )
+        low_stock_products = self.queryset.filter(is_low_stock=True)
         serializer = self.get_serializer(low_stock_products, many=True)
         return Response(serializer.data)
 
@@ -129,7 +169,7 @@ class ProductViewSet(viewsets.ModelViewSet):
 # Invoice ViewSets
 # ============================================================================
 
-class InvoiceItemViewSet(viewsets.ModelViewSet):
+class InvoiceItemViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for invoice line items
     """
@@ -140,29 +180,41 @@ class InvoiceItemViewSet(viewsets.ModelViewSet):
     filterset_fields = ['invoice']
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing invoices
     """
     queryset = Invoice.objects.all().order_by('-invoice_date')
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'client', 'invoice_date']
-    search_fields = ['invoice_number', 'client__name', 'description']
-    ordering_fields = ['invoice_date', 'total', 'created_at']
+    search_fields = ['invoice_number', 'client_name', 'description']
+    ordering_fields = ['invoice_date', 'client_name', 'total', 'created_at']
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def get_object_or_archived(self):
+        """The live invoice, or its copy once moved to the archive (read-only)"""
+        try:
+            return self.get_object()
+        except Http404:
+            return get_object_or_404(
+                ArchivedInvoice.objects.select_related('client', 'created_by'),
+                pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field],
+            )
+
+    def retrieve(self, request, *args, **kwargs):
+        invoice = self.get_object_or_archived()
+        if invoice.is_archived:
+            return Response(ArchivedInvoiceSerializer(invoice, context=self.get_serializer_context()).data)
+        return Response(self.get_serializer(invoice).data)
+
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue invoices"""
-        today = timezone.now().date()
-        overdue_invoices = self.queryset.filter(
-            due_date__lt=today,
-            status__in=['sent', 'partial']
-        )
+        overdue_invoices = self.queryset.filter(status='overdue')
         page = self.paginate_queryset(overdue_invoices)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -182,7 +234,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def export_pdf(self, request, pk=None):
         """Export invoice as PDF"""
-        invoice = self.get_object()
+        invoice = self.get_object_or_archived()
         pdf_buffer = generate_invoice_pdf(invoice)
         return FileResponse(
             pdf_buffer,
@@ -194,7 +246,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def export_excel(self, request, pk=None):
         """Export invoice as Excel"""
-        invoice = self.get_object()
+        invoice = self.get_object_or_archived()
         excel_buffer = generate_invoice_excel(invoice)
         return FileResponse(
             excel_buffer,
@@ -204,6 +256,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=False, methods=['get'])
+    @reporting_view
     def export_all_excel(self, request):
         """Export all invoices as Excel"""
         invoices = self.filter_queryset(self.get_queryset())
@@ -216,11 +269,51 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         )
 
 
+class BillingRunViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Billing runs; POST a period to invoice its uninvoiced delivery notes, one invoice per client.
+    Runs in the request without worker processes; large periods belong to ``manage.py run_billing``.
+    """
+    queryset = BillingRun.objects.all().order_by('-period_start')
+    serializer_class = BillingRunSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request):
+        """Run, or resume, the billing of a period"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        run = start_billing_run(
+            data['period_start'], data['period_end'], data.get('invoice_date'), user=request.user,
+        )
+        # In-process: the command (run_billing) is the place for the process pool,
+        # not a web worker that already runs thread pools
+        for _ in run_billing(run, workers=1):
+            pass
+        run.refresh_from_db()
+        return Response(self.get_serializer(run).data, status=status.HTTP_201_CREATED)
+
+
+class RecurringInvoiceViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for recurring invoice templates, issued by the generate_recurring_invoices command
+    """
+    queryset = RecurringInvoice.objects.select_related('client').prefetch_related('items').order_by('next_run')
+    serializer_class = RecurringInvoiceSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['client', 'frequency', 'is_active']
+    ordering_fields = ['next_run', 'start_date', 'total', 'created_at']
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+
 # ============================================================================
 # Proforma Invoice ViewSets
 # ============================================================================
 
-class ProformaItemViewSet(viewsets.ModelViewSet):
+class ProformaItemViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for proforma invoice line items
     """
@@ -231,27 +324,31 @@ class ProformaItemViewSet(viewsets.ModelViewSet):
     filterset_fields = ['proforma']
 
 
-class ProformaInvoiceViewSet(viewsets.ModelViewSet):
+class ProformaInvoiceViewSet(ChangeFeedMixin, BulkConvertMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing proforma invoices
     """
     queryset = ProformaInvoice.objects.all().order_by('-issue_date')
     serializer_class = ProformaInvoiceSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'client', 'issue_date']
-    search_fields = ['proforma_number', 'client__name', 'description']
-    ordering_fields = ['issue_date', 'total', 'created_at']
+    search_fields = ['proforma_number', 'client_name', 'description']
+    ordering_fields = ['issue_date', 'client_name', 'total', 'created_at']
+    convert_number_field = 'invoice_number'
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def convert_documents(self, queryset):
+        return convert_proformas_to_invoices(queryset, timezone.localdate(), user=self.request.user)
+
 
 # ============================================================================
 # Delivery Notes ViewSets
 # ============================================================================
 
-class DeliveryItemViewSet(viewsets.ModelViewSet):
+class DeliveryItemViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for delivery note line items
     """
@@ -261,28 +358,44 @@ class DeliveryItemViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['delivery_note']
 
+    def perform_create(self, serializer):
+        try:
+            serializer.save()
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'quantity_delivered': [str(exc)]})
+
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'quantity_delivered': [str(exc)]})
+
 
-class DeliveryNoteViewSet(viewsets.ModelViewSet):
+class DeliveryNoteViewSet(ChangeFeedMixin, BulkConvertMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing delivery notes
     """
     queryset = DeliveryNote.objects.all().order_by('-delivery_date')
     serializer_class = DeliveryNoteSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['client', 'delivery_date']
-    search_fields = ['delivery_number', 'client__name', 'description']
-    ordering_fields = ['delivery_date', 'created_at']
+    search_fields = ['delivery_number', 'client_name', 'description']
+    ordering_fields = ['delivery_date', 'client_name', 'created_at']
+    convert_number_field = 'invoice_number'
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def convert_documents(self, queryset):
+        return convert_delivery_notes_to_invoices(queryset, timezone.localdate(), user=self.request.user)
+
 
 # ============================================================================
 # Customer Orders ViewSets
 # ============================================================================
 
-class CustomerOrderItemViewSet(viewsets.ModelViewSet):
+class CustomerOrderItemViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for customer order line items
     """
@@ -293,27 +406,40 @@ class CustomerOrderItemViewSet(viewsets.ModelViewSet):
     filterset_fields = ['order']
 
 
-class CustomerOrderViewSet(viewsets.ModelViewSet):
+class CustomerOrderViewSet(ChangeFeedMixin, BulkConvertMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing customer orders
     """
     queryset = CustomerOrder.objects.all().order_by('-order_date')
     serializer_class = CustomerOrderSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'client', 'order_date']
-    search_fields = ['order_number', 'client__name', 'description']
-    ordering_fields = ['order_date', 'total', 'created_at']
+    search_fields = ['order_number', 'client_name', 'description']
+    ordering_fields = ['order_date', 'client_name', 'total', 'created_at']
+    convert_number_field = 'delivery_number'
 
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        try:
+            serializer.save(created_by=self.request.user)
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'status': [str(exc)]})
+
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'status': [str(exc)]})
+
+    def convert_documents(self, queryset):
+        return convert_orders_to_delivery_notes(queryset, timezone.localdate(), user=self.request.user)
 
 
 # ============================================================================
 # Supplier Orders ViewSets
 # ============================================================================
 
-class SupplierOrderItemViewSet(viewsets.ModelViewSet):
+class SupplierOrderItemViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for supplier order line items
     """
@@ -324,17 +450,17 @@ class SupplierOrderItemViewSet(viewsets.ModelViewSet):
     filterset_fields = ['order']
 
 
-class SupplierOrderViewSet(viewsets.ModelViewSet):
+class SupplierOrderViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing supplier orders
     """
     queryset = SupplierOrder.objects.all().order_by('-order_date')
     serializer_class = SupplierOrderSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'supplier', 'order_date']
-    search_fields = ['purchase_order_number', 'supplier__name', 'description']
-    ordering_fields = ['order_date', 'total', 'created_at']
+    search_fields = ['purchase_order_number', 'supplier_name', 'description']
+    ordering_fields = ['order_date', 'supplier_name', 'total', 'created_at']
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -344,7 +470,7 @@ class SupplierOrderViewSet(viewsets.ModelViewSet):
 # Payment ViewSet
 # ============================================================================
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing payments
     """
@@ -359,82 +485,192 @@ class PaymentViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
+# ============================================================================
+# Delta Sync
+# ============================================================================
+
+class TombstoneViewSet(ChangeFeedMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Deleted objects, filtered with ?model=<app_label.model>&updated_since=<timestamp>
+    """
+    queryset = Tombstone.objects.all()
+    serializer_class = TombstoneSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['model']
+    change_feed_field = 'deleted_at'
+
+
+# ============================================================================
+# Batch
+# ============================================================================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """
+    Run several API calls in one round trip.
+
+    Body: {"requests": [{"method": "GET", "path": "clients/?search=x", "body": {...}}, ...],
+    "parallel": false}. Sub-requests reuse this request's authentication and
+    are dispatched in-process; with "parallel": true (reads only) they run
+    concurrently. Returns {"responses": [{"status": ..., "body": ...}, ...]}.
+    """
+    try:
+        operations, parallel = parse_operations(request.data)
+    except BatchError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'responses': run_batch(request, operations, parallel)})
+
+
+# ============================================================================
+# Autocomplete
+# ============================================================================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def autocomplete_lookup(request, source):
+    """Prefix then fuzzy matches for lazy-loading selects: ?q=<text>&limit=<n>"""
+    if source not in AUTOCOMPLETE_SOURCES:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    results = autocomplete(source, request.query_params.get('q', ''), limit)
+    return Response({'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """Search every entity type at once: ?q=<text>&limit=<n per type>"""
+    try:
+        limit = min(max(int(request.query_params.get('limit', 5)), 1), 20)
+    except ValueError:
+        limit = 5
+    query = request.query_params.get('q', '')
+    exact, groups = global_search(query, limit)
+    return Response({'query': query, 'exact': exact, 'groups': groups})
+
+
 # ============================================================================
 # Dashboard Analytics
 # ============================================================================
 
+MONEY_METRICS = ('total_invoices', 'total_paid', 'month_invoiced', 'month_paid')
+
+
+def format_overview(metrics):
+    return {
+        name: float(value) if name in MONEY_METRICS else value
+        for name, value in metrics.items()
+    }
+
+
+def format_sales_statistics(metrics):
+    return [{'month': month, 'total': float(total)} for (_, month), total in metrics.items()]
+
+
+def authenticate_api_request(request):
+    """Run the DRF authentication classes against a plain Django request"""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except AuthenticationFailed:
+        return None
+    return user if user and user.is_authenticated else None
+
+
+def async_api_view(view):
+    """Authenticate an async view the way IsAuthenticated DRF views are"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        user = await sync_to_async(authenticate_api_request)(request)
+        if user is None:
+            response = JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'}, status=401
+            )
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reporting_view
 def dashboard_overview(request):
     """Get dashboard overview with key metrics"""
     today = timezone.now().date()
-    start_of_month = today.replace(day=1)
-
-    # Calculate metrics
-    total_invoices = Invoice.objects.aggregate(Sum('total'))['total__sum'] or 0
-    total_paid = Invoice.objects.aggregate(Sum('paid_amount'))['paid_amount__sum'] or 0
-    pending_invoices = Invoice.objects.filter(status__in=['sent', 'partial']).count()
-    overdue_invoices = Invoice.objects.filter(
-        due_date__lt=today,
-        status__in=['sent', 'partial']
-    ).count()
-
-    # Monthly metrics
-    month_invoiced = Invoice.objects.filter(
-        invoice_date__gte=start_of_month
-    ).aggregate(Sum('total'))['total__sum'] or 0
-
-    month_paid = Payment.objects.filter(
-        payment_date__gte=start_of_month
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-    # Client metrics
-    total_clients = Client.objects.filter(is_active=True).count()
-    new_clients_this_month = Client.objects.filter(
-        created_at__gte=start_of_month
-    ).count()
-
-    # Product metrics
-    low_stock_products = Product.objects.filter(
-        quantity_in_stock__lte=F('reorder_level')
-    ).count()
-
-    return Response({
-        'total_invoices': float(total_invoices),
-        'total_paid': float(total_paid),
-        'pending_invoices': pending_invoices,
-        'overdue_invoices': overdue_invoices,
-        'month_invoiced': float(month_invoiced),
-        'month_paid': float(month_paid),
-        'total_clients': total_clients,
-        'new_clients_this_month': new_clients_this_month,
-        'low_stock_products': low_stock_products,
-    })
+    return Response(format_overview(run_serially(overview_queries(today))))
+
+
+@async_api_view
+@reporting_view
+async def dashboard_overview_async(request):
+    """Dashboard overview with the aggregates computed concurrently"""
+    today = timezone.now().date()
+    return JsonResponse(format_overview(await run_concurrently(overview_queries(today))))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reporting_view
 def sales_statistics(request):
     """Get sales statistics for the past 12 months"""
     today = timezone.now().date()
+    return Response(format_sales_statistics(run_serially(sales_statistics_queries(today))))
 
-    # Generate statistics for last 12 months
-    statistics = []
-    for i in range(11, -1, -1):
-        month_start = today - timedelta(days=today.day + i*30)
-        month_start = month_start.replace(day=1)
 
-        next_month = month_start + timedelta(days=31)
-        next_month = next_month.replace(day=1)
+@async_api_view
+@reporting_view
+async def sales_statistics_async(request):
+    """Sales statistics with the 12 monthly totals computed concurrently"""
+    today = timezone.now().date()
+    return JsonResponse(
+        format_sales_statistics(await run_concurrently(sales_statistics_queries(today))),
+        safe=False
+    )
 
-        monthly_total = Invoice.objects.filter(
-            invoice_date__gte=month_start,
-            invoice_date__lt=next_month
-        ).aggregate(Sum('total'))['total__sum'] or 0
 
-        statistics.append({
-            'month': month_start.strftime('%B %Y'),
-            'total': float(monthly_total),
-        })
+# ============================================================================
+# Reports
+# ============================================================================
+
+def _money(value):
+    return float(value) if value is not None else None
+
+
+def format_aging(report):
+    decimal_fields = [bucket['key'] for bucket in report['buckets']] + ['total', 'sales', 'dso']
+
+    def format_row(row):
+        return {
+            name: _money(value) if name in decimal_fields else value
+            for name, value in row.items()
+        }
 
-    return Response(statistics)
+    return {
+        'as_of': report['as_of'],
+        'period_days': report['period_days'],
+        'buckets': report['buckets'],
+        'clients': [format_row(row) for row in report['clients']],
+        'totals': format_row(report['totals']),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@reporting_view
+def receivables_aging_report(request):
+    """Open receivables by days past due, per client, with DSO over ?days= (default 90)"""
+    today = timezone.now().date()
+    period_days = parse_period_days(request.query_params.get('days'))
+    return Response(format_aging(receivables_aging(today, period_days)))
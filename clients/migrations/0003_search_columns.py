@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-19 02:41
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copy of core.search.normalize_text as of this migration
+def normalize_text(value):
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value).casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+SEARCH_COLUMNS = ('name', 'company', 'email')
+
+
+def fill_search_columns(apps, schema_editor):
+    Client = apps.get_model('clients', 'Client')
+    batch = []
+    for obj in Client.objects.only(*SEARCH_COLUMNS).iterator(chunk_size=1000):
+        for name in SEARCH_COLUMNS:
+            setattr(obj, f'{name}_search', normalize_text(getattr(obj, name)))
+        batch.append(obj)
+        if len(batch) == 1000:
+            Client.objects.bulk_update(batch, [f'{name}_search' for name in SEARCH_COLUMNS])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, [f'{name}_search' for name in SEARCH_COLUMNS])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_clients_cli_updated_bf75f6_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='company_search',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='email_search',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='name_search',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_search_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_search_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['created_at'], name='clients_cli_created_4ff9ec_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0005_uuid7_primary_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='external_reference',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True, verbose_name='External Reference'),
+        ),
+    ]
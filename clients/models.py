@@ -4,13 +4,16 @@ from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-import uuid
 
+from core.search import SearchColumnsMixin, SearchColumnsQuerySet
+from core.ids import uuid7
 
-class Client(models.Model):
+
+class Client(SearchColumnsMixin, models.Model):
     """Client/Customer model"""
+    search_columns = ('name', 'company', 'email')
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=255, db_index=True, verbose_name=_('Client Name'))
     company = models.CharField(max_length=255, blank=True, verbose_name=_('Company'))
     email = models.EmailField(blank=True, db_index=True)
@@ -21,6 +24,9 @@ class Client(models.Model):
     postal_code = models.CharField(max_length=20)
     country = models.CharField(max_length=100)
     tax_id = models.CharField(max_length=50, blank=True, verbose_name=_('Tax ID'))
+    # Key of the record in the system it is synced from (see BulkUpsertMixin); NULL when not synced
+    external_reference = models.CharField(max_length=100, unique=True, null=True, blank=True,
+                                          verbose_name=_('External Reference'))
     website = models.URLField(blank=True)
     contact_person = models.CharField(max_length=255, blank=True)
     payment_terms = models.CharField(max_length=100, blank=True, verbose_name=_('Payment Terms'))
@@ -35,6 +41,13 @@ class Client(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Lowercased, accent-stripped copies for search (see core.search)
+    name_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+    company_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+    email_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+
+    objects = SearchColumnsQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
         verbose_name = _('Client')
@@ -42,6 +55,8 @@ class Client(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['email']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
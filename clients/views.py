@@ -3,6 +3,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q, Sum
 from django.contrib import messages
+from core.search import search_filter
+from invoices.archive import archived_totals
 from .models import Client
 from .forms import ClientForm
 
@@ -25,12 +27,7 @@ class ClientListView(LoginRequiredMixin, ListView):
         # Search functionality
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(tax_id__icontains=search) |
-                Q(company__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['name', 'email', 'tax_id', 'company'])
 
         return queryset.order_by('name')
 
@@ -56,9 +53,12 @@ class ClientDetailView(LoginRequiredMixin, DetailView):
 
         # 3. Calculer les statistiques sur le QuerySet complet (all_invoices)
         # et non pas sur le slice (recent_invoices)
+        # Les factures archivées comptent via leurs totaux cumulés
         context['stats'] = {
-            'total_invoiced': all_invoices.aggregate(total=Sum('total'))['total'] or 0,
-            'total_paid': all_invoices.filter(status='paid').aggregate(total=Sum('total'))['total'] or 0,
+            'total_invoiced': (all_invoices.aggregate(total=Sum('total'))['total'] or 0)
+            + archived_totals(client=self.object)['total'],
+            'total_paid': (all_invoices.filter(status='paid').aggregate(total=Sum('total'))['total'] or 0)
+            + archived_totals(client=self.object, statuses=['paid'])['total'],
             'pending_invoices': all_invoices.filter(status='sent').count(),
         }
 
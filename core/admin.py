@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DashboardMetric
+from .models import DashboardMetric, StatusChange
 
 
 @admin.register(DashboardMetric)
@@ -7,3 +7,10 @@ class DashboardMetricAdmin(admin.ModelAdmin):
     list_display = ('date', 'total_invoiced', 'total_paid', 'total_orders', 'new_clients')
     list_filter = ('date',)
     readonly_fields = ('date', 'created_at', 'updated_at')
+
+
+@admin.register(StatusChange)
+class StatusChangeAdmin(admin.ModelAdmin):
+    list_display = ('model', 'object_id', 'from_status', 'to_status', 'changed_at')
+    list_filter = ('model', 'to_status', 'changed_at')
+    search_fields = ('object_id',)
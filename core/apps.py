@@ -1,6 +1,30 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .signals import connect_tombstones
+        connect_tombstones()
+
+        from .autocomplete import connect_autocomplete
+        connect_autocomplete()
+
+        from .snapshots import connect_snapshots
+        connect_snapshots()
+
+        from products.stock import connect_stock
+        connect_stock()
+
+        from orders.reservations import connect_reservations
+        connect_reservations()
+
+        from .search import install_search_indexes_after_migrate
+        post_migrate.connect(install_search_indexes_after_migrate, sender=self)
+
+        from .routers import install_write_tracking
+        connection_created.connect(install_write_tracking, dispatch_uid='core_write_tracking')
@@ -0,0 +1,218 @@
+# ============================================================================
+# core/autocomplete.py - Index d'autocomplétion en mémoire
+# ============================================================================
+"""
+Compact in-memory indexes behind the autocomplete endpoint.
+
+Each source loads its active rows once into three structures: a sorted
+list of ``(word, row)`` pairs searched with :mod:`bisect` for prefix
+matches, a trigram posting list for fuzzy matches, and the display rows.
+Words are normalized with :func:`core.search.normalize_text`, so matching
+ignores case and accents.
+
+A version number kept in the cache is bumped whenever a source model is
+saved or deleted (or written through the bulk API); each process rebuilds
+its copy lazily on the next lookup once the version has moved, or after
+``AUTOCOMPLETE_MAX_AGE`` seconds to catch writes that bypass signals.
+"""
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from .search import normalize_text
+
+WORD_RE = re.compile(r'\w+')
+# Share of the query trigrams a row must contain to be a fuzzy match
+MIN_TRIGRAM_SCORE = 0.5
+
+
+def _client_row(obj):
+    label = f"{obj['name']} - {obj['company']}" if obj['company'] else obj['name']
+    return label, (obj['name'], obj['company'], obj['email']), {}
+
+
+def _supplier_row(obj):
+    return _client_row(obj)
+
+
+def _product_row(obj):
+    label = f"{obj['name']} ({obj['sku']}) - {obj['unit_price']} €"
+    data = {'name': obj['name'], 'price': str(obj['unit_price']), 'tax': str(obj['tax_rate'])}
+    return label, (obj['name'], obj['sku'], obj['reference']), data
+
+
+# name: (model label, loaded fields, row builder)
+SOURCES = {
+    'clients': ('clients.Client', ('id', 'name', 'company', 'email'), _client_row),
+    'suppliers': ('suppliers.Supplier', ('id', 'name', 'company', 'email'), _supplier_row),
+    'products': ('products.Product', ('id', 'name', 'sku', 'reference', 'unit_price', 'tax_rate'), _product_row),
+}
+
+
+def _trigrams(words):
+    """Trigrams of each word padded like pg_trgm: '  w', ' wo', ..., 'rd '"""
+    trigrams = set()
+    for word in words:
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def _version_key(name):
+    return f'autocomplete:{name}:version'
+
+
+class IndexSnapshot:
+    """Immutable prefix and trigram index over the active rows of one model"""
+
+    def __init__(self, rows=(), texts=(), words=(), postings=None):
+        self.rows = rows
+        self.texts = texts
+        self.words = words
+        self.postings = postings or {}
+
+    @classmethod
+    def build(cls, name):
+        label, fields, make_row = SOURCES[name]
+        model = apps.get_model(label)
+        rows, texts, words, postings = [], [], [], {}
+        queryset = model._default_manager.filter(is_active=True).order_by().values(*fields)
+        for position, obj in enumerate(queryset.iterator(chunk_size=2000)):
+            text_label, searchable, data = make_row(obj)
+            rows.append((str(obj['id']), text_label, data))
+            text = normalize_text(' '.join(value for value in searchable if value))
+            texts.append(text)
+            text_words = set(WORD_RE.findall(text))
+            words.extend((word, position) for word in text_words)
+            for trigram in _trigrams(text_words):
+                postings.setdefault(trigram, array('I')).append(position)
+        words.sort()
+        return cls(rows, texts, words, postings)
+
+    def prefix_range(self, term):
+        return (
+            bisect_left(self.words, (term,)),
+            bisect_left(self.words, (term + '\U0010ffff',)),
+        )
+
+    def prefix_matches(self, terms, limit):
+        """Rows having a word starting with every term, shortest texts first"""
+        # Walk the most selective term, check the others on each candidate
+        ranges = {term: self.prefix_range(term) for term in terms}
+        rarest = min(terms, key=lambda term: ranges[term][1] - ranges[term][0])
+        others = [term for term in terms if term != rarest]
+        candidates = set()
+        for index in range(*ranges[rarest]):
+            position = self.words[index][1]
+            if others:
+                text_words = WORD_RE.findall(self.texts[position])
+                if not all(any(w.startswith(term) for w in text_words) for term in others):
+                    continue
+            candidates.add(position)
+        return heapq.nsmallest(limit, candidates, key=lambda position: (len(self.texts[position]), position))
+
+    def trigram_matches(self, query, exclude):
+        """Rows sharing most of the query trigrams, best and shortest first"""
+        query_trigrams = _trigrams(WORD_RE.findall(query))
+        counts = Counter()
+        for trigram in query_trigrams:
+            counts.update(self.postings.get(trigram, ()))
+        threshold = MIN_TRIGRAM_SCORE * len(query_trigrams)
+        scored = [
+            (-shared, len(self.texts[position]), position)
+            for position, shared in counts.items()
+            if shared >= threshold and position not in exclude
+        ]
+        scored.sort()
+        return [position for *_, position in scored]
+
+    def search(self, query, limit):
+        terms = WORD_RE.findall(query)
+        if not terms:
+            return []
+        positions = self.prefix_matches(terms, limit)
+        if len(positions) < limit and len(query) >= 3:
+            positions += self.trigram_matches(query, set(positions))[:limit - len(positions)]
+        return [
+            {'id': row_id, 'text': text_label, 'data': data}
+            for row_id, text_label, data in (self.rows[position] for position in positions)
+        ]
+
+
+class AutocompleteIndex:
+    """Per-process index of one source, rebuilt when its cached version moves"""
+
+    def __init__(self, name):
+        self.name = name
+        self.version = None
+        self.built_at = 0
+        self.snapshot = IndexSnapshot()
+        self.lock = threading.Lock()
+
+    def is_stale(self, version):
+        max_age = getattr(settings, 'AUTOCOMPLETE_MAX_AGE', 300)
+        return version != self.version or time.monotonic() - self.built_at > max_age
+
+    def refresh(self):
+        version = cache.get_or_set(_version_key(self.name), 1, None)
+        if not self.is_stale(version):
+            return
+        with self.lock:
+            if self.is_stale(version):
+                self.snapshot = IndexSnapshot.build(self.name)
+                self.version, self.built_at = version, time.monotonic()
+
+    def search(self, query, limit=20):
+        self.refresh()
+        return self.snapshot.search(normalize_text(query).strip(), limit)
+
+
+_indexes = {name: AutocompleteIndex(name) for name in SOURCES}
+
+
+def autocomplete(name, query, limit=20):
+    """Search one source; raises KeyError for an unknown source"""
+    return _indexes[name].search(query, limit)
+
+
+def invalidate(name):
+    """Make every process rebuild the index of a source on its next lookup"""
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def invalidate_model(model):
+    for name, (label, _, _) in SOURCES.items():
+        if model._meta.label == label:
+            invalidate(name)
+
+
+def _invalidate_on_change(sender, update_fields=None, **kwargs):
+    # Saves limited to fields the index does not show (e.g. stock levels) keep it valid
+    if update_fields:
+        indexed = {
+            field for label, fields, _ in SOURCES.values()
+            if label == sender._meta.label for field in fields
+        }
+        if not indexed.intersection(update_fields) and 'is_active' not in update_fields:
+            return
+    invalidate_model(sender)
+
+
+def connect_autocomplete():
+    for name, (label, _, _) in SOURCES.items():
+        model = apps.get_model(label)
+        post_save.connect(_invalidate_on_change, sender=model, dispatch_uid=f'autocomplete_save_{name}')
+        post_delete.connect(_invalidate_on_change, sender=model, dispatch_uid=f'autocomplete_delete_{name}')
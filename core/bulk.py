@@ -0,0 +1,107 @@
+# ============================================================================
+# core/bulk.py - Insertion en masse sans instances de modèle
+# ============================================================================
+"""
+``INSERT ... ON CONFLICT`` from plain dicts of field values.
+
+:func:`upsert_rows` does what ``bulk_create(update_conflicts=True)`` does
+for the bulk endpoints, without building a model instance per row and
+without the ORM's per-value compilation: the columns missing from the
+rows are prepared once per call (defaults, ``auto_now`` timestamps), only
+the values the rows carry are prepared per row, and the statement is
+built once per batch size. On the bulk endpoints this is most of the cost
+of a row once it is validated.
+
+Like ``bulk_create``, it sends no signals and skips ``save()``; the
+``<field>_search`` shadow columns of :class:`~core.search.SearchColumnsMixin`
+models are filled here.
+"""
+from django.db import connections
+from django.db.models import Model
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .search import normalize_text, search_column
+
+
+def _insert_fields(model):
+    return [field for field in model._meta.concrete_fields if not field.generated]
+
+
+def _prepare(field, connection):
+    """Function turning a Python value of ``field`` into its database value"""
+    prep = field.get_db_prep_save
+    if field.is_relation:
+        return lambda value: prep(value.pk if isinstance(value, Model) else value, connection)
+    return lambda value: prep(value, connection)
+
+
+def upsert_rows(model, rows, unique_field, update_fields, using):
+    """
+    Insert ``rows`` (dicts with the same keys, by field name) or, for those
+    whose ``unique_field`` exists, update ``update_fields`` (nothing when
+    empty). Rows get their missing values set, primary key included.
+    """
+    if not rows:
+        return
+    connection = connections[using]
+    ops, qn = connection.ops, connection.ops.quote_name
+    fields = _insert_fields(model)
+    given = set(rows[0])
+    now = timezone.now()
+    shadows = {
+        search_column(model, name): name for name in getattr(model, 'search_columns', ())
+    }
+
+    # Values the rows do not give: constant, except callable defaults (ids)
+    per_row, constants = [], {}
+    for field in fields:
+        if field.name in given or field.name in shadows:
+            continue
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            constants[field.name] = now
+        elif field.has_default() and callable(field.default):
+            per_row.append(field)
+        else:
+            constants[field.name] = field.get_default()
+    for row in rows:
+        for field in per_row:
+            row[field.name] = field.get_default()
+        for shadow, name in shadows.items():
+            row[shadow] = normalize_text(row[name] if name in row else constants.get(name))
+    prepared = {name: _prepare(model._meta.get_field(name), connection)(value) for name, value in constants.items()}
+
+    columns = [field for field in fields if field.name not in constants]
+    preps = [_prepare(field, connection) for field in columns]
+    names = [field.name for field in columns]
+    constant_values = [prepared[field.name] for field in fields if field.name in constants]
+    all_columns = columns + [field for field in fields if field.name in constants]
+
+    update_columns = [model._meta.get_field(name).column for name in update_fields]
+    update_columns += [
+        model._meta.get_field(shadow).column for shadow, name in shadows.items() if name in update_fields
+    ]
+    on_conflict = OnConflict.UPDATE if update_columns else OnConflict.IGNORE
+    suffix = ops.on_conflict_suffix_sql(
+        all_columns, on_conflict, update_columns, [model._meta.get_field(unique_field).column],
+    )
+    prefix = '%s %s (%s) ' % (
+        ops.insert_statement(on_conflict=on_conflict), qn(model._meta.db_table),
+        ', '.join(qn(field.column) for field in all_columns),
+    )
+    placeholders = ['%s'] * len(all_columns)
+    batch_size = max(ops.bulk_batch_size(all_columns, rows), 1)
+
+    statements = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            if len(batch) not in statements:
+                statements[len(batch)] = prefix + ops.bulk_insert_sql(all_columns, [placeholders] * len(batch)) + (
+                    f' {suffix}' if suffix else ''
+                )
+            params = []
+            for row in batch:
+                params.extend(prep(row[name]) for prep, name in zip(preps, names))
+                params.extend(constant_values)
+            cursor.execute(statements[len(batch)], params)
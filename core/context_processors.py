@@ -19,16 +19,8 @@ def user_notifications(request):
 
     from invoices.models import Invoice
     from products.models import Product
-    from django.db.models import F
-
-    today = timezone.now().date()
 
     return {
-        'overdue_invoices_count': Invoice.objects.filter(
-            due_date__lt=today,
-            status__in=['sent', 'partial']
-        ).count(),
-        'low_stock_count': Product.objects.filter(
-            quantity_in_stock__lte=F('reorder_level')
-        ).count(),
+        'overdue_invoices_count': Invoice.objects.filter(status='overdue').count(),
+        'low_stock_count': Product.objects.filter(is_low_stock=True).count(),
     }
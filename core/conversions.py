@@ -0,0 +1,187 @@
+# ============================================================================
+# core/conversions.py - Conversion de documents (proforma, commande, BL, facture)
+# ============================================================================
+"""
+Document conversion: accepted proforma -> invoice, customer order ->
+delivery note, delivery note -> invoice.
+
+Each function takes a queryset of source documents, skips those that
+cannot or should no longer be converted (wrong status, already
+converted), and creates one target document per source with all its
+lines. Targets and lines are inserted with ``bulk_create`` and their
+numbers are allocated up front, totals are computed in memory once per
+document instead of once per saved line, and the whole selection is
+converted in one transaction. Each returns the ``(source, target)``
+pairs created.
+
+Targets point back at their source: ``Invoice.proforma``,
+``DeliveryNote.customer_order`` and ``DeliveryNote.invoice``.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.utils import timezone
+
+from delivery.models import DeliveryItem, DeliveryNote
+from invoices.models import ArchivedInvoice, Invoice, InvoiceItem
+from orders.models import CustomerOrderItem
+
+from .utils import next_numbers
+
+CONVERTIBLE_PROFORMA_STATUSES = ('accepted',)
+CONVERTIBLE_ORDER_STATUSES = ('confirmed', 'partial', 'completed')
+# Due date of converted invoices
+PAYMENT_DAYS = 30
+
+
+def next_invoice_numbers(count):
+    return next_numbers(
+        'INV', count,
+        (Invoice.objects, 'invoice_number'), (ArchivedInvoice.objects, 'invoice_number'),
+    )
+
+
+def set_totals(document, items):
+    """Compute the lines' amounts and the document's totals, without saving"""
+    for item in items:
+        item.calculate_amounts()
+    document.subtotal = sum((item.subtotal for item in items), Decimal('0'))
+    document.tax_amount = sum((item.tax for item in items), Decimal('0'))
+    document.total = document.subtotal + document.tax_amount
+
+
+def convert_proformas_to_invoices(proformas, today, user=None):
+    """One draft invoice per accepted proforma not yet invoiced"""
+    with transaction.atomic():
+        proformas = list(
+            proformas.filter(
+                status__in=CONVERTIBLE_PROFORMA_STATUSES,
+                invoices__isnull=True, archived_invoices__isnull=True,
+            ).order_by('created_at').prefetch_related('items')
+        )
+        pairs, items = [], []
+        for number, proforma in zip(next_invoice_numbers(len(proformas)), proformas):
+            invoice = Invoice(
+                invoice_number=number, client_id=proforma.client_id, proforma=proforma,
+                invoice_date=today, due_date=today + timedelta(days=PAYMENT_DAYS), status='draft',
+                description=proforma.description, notes=proforma.notes, created_by=user,
+            )
+            lines = [
+                InvoiceItem(
+                    invoice=invoice, product_id=line.product_id, description=line.description,
+                    quantity=line.quantity, unit_price=line.unit_price, tax_rate=line.tax_rate,
+                )
+                for line in proforma.items.all()
+            ]
+            set_totals(invoice, lines)
+            pairs.append((proforma, invoice))
+            items.extend(lines)
+
+        Invoice.objects.bulk_create([invoice for _, invoice in pairs], batch_size=500)
+        InvoiceItem.objects.bulk_create(items, batch_size=1000)
+    return pairs
+
+
+def convert_orders_to_delivery_notes(orders, today, user=None):
+    """One delivery note shipping every line of each confirmed order without a delivery note yet"""
+    with transaction.atomic():
+        orders = list(
+            orders.filter(status__in=CONVERTIBLE_ORDER_STATUSES, delivery_notes__isnull=True)
+            .order_by('created_at').prefetch_related('items')
+        )
+        numbers = next_numbers('BL', len(orders), (DeliveryNote.objects, 'delivery_number'))
+        pairs, items = [], []
+        for number, order in zip(numbers, orders):
+            note = DeliveryNote(
+                delivery_number=number, client_id=order.client_id, customer_order=order,
+                delivery_date=today, expected_delivery=order.delivery_date,
+                description=order.description, notes=order.notes, created_by=user,
+            )
+            pairs.append((order, note))
+            items.extend(
+                DeliveryItem(
+                    delivery_note=note, product_id=line.product_id, description=line.description,
+                    quantity_ordered=line.quantity, quantity_delivered=line.quantity,
+                    unit_price=line.unit_price,
+                )
+                for line in order.items.all()
+            )
+
+        DeliveryNote.objects.bulk_create([note for _, note in pairs], batch_size=500)
+        # Moves the stock out and consumes the orders' reservations
+        DeliveryItem.objects.bulk_create(items, batch_size=1000)
+    return pairs
+
+
+def delivered_items():
+    """Prefetch of the delivered lines of delivery notes, with their product's tax rate"""
+    return Prefetch(
+        'items', queryset=DeliveryItem.objects.filter(quantity_delivered__gt=0).annotate(
+            product_tax_rate=F('product__tax_rate'),
+        ),
+    )
+
+
+def order_tax_rates(notes):
+    """``{(order_id, product_id): tax_rate}`` of the customer orders the notes deliver"""
+    order_ids = {note.customer_order_id for note in notes if note.customer_order_id}
+    if not order_ids:
+        return {}
+    return {
+        (order_id, product_id): tax_rate
+        for order_id, product_id, tax_rate in CustomerOrderItem.objects.filter(
+            order_id__in=order_ids, product__isnull=False,
+        ).values_list('order_id', 'product_id', 'tax_rate')
+    }
+
+
+def delivery_invoice_items(invoice, notes, tax_rates):
+    """
+    Unsaved invoice lines for the delivered quantities of ``notes``, fetched
+    with :func:`delivered_items`. The tax rate is the one of the delivered
+    order line, else the product's.
+    """
+    default_tax_rate = InvoiceItem._meta.get_field('tax_rate').default
+    items = []
+    for note in notes:
+        for line in note.items.all():
+            tax_rate = tax_rates.get((note.customer_order_id, line.product_id))
+            if tax_rate is None:
+                tax_rate = line.product_tax_rate if line.product_tax_rate is not None else default_tax_rate
+            items.append(InvoiceItem(
+                invoice=invoice, product_id=line.product_id, description=line.description,
+                quantity=line.quantity_delivered, unit_price=line.unit_price, tax_rate=tax_rate,
+            ))
+    return items
+
+
+def convert_delivery_notes_to_invoices(notes, today, user=None):
+    """One draft invoice per delivery note not yet invoiced, for its delivered quantities"""
+    with transaction.atomic():
+        notes = [
+            note for note in notes.filter(invoice__isnull=True, archived_invoice__isnull=True)
+            .order_by('created_at').prefetch_related(delivered_items())
+            if note.items.all()
+        ]
+        tax_rates = order_tax_rates(notes)
+        now = timezone.now()
+        pairs, items = [], []
+        for number, note in zip(next_invoice_numbers(len(notes)), notes):
+            invoice = Invoice(
+                invoice_number=number, client_id=note.client_id,
+                invoice_date=today, due_date=today + timedelta(days=PAYMENT_DAYS), status='draft',
+                description=note.description, notes=note.notes, created_by=user,
+            )
+            lines = delivery_invoice_items(invoice, [note], tax_rates)
+            set_totals(invoice, lines)
+            note.invoice = invoice
+            note.updated_at = now
+            pairs.append((note, invoice))
+            items.extend(lines)
+
+        Invoice.objects.bulk_create([invoice for _, invoice in pairs], batch_size=500)
+        InvoiceItem.objects.bulk_create(items, batch_size=1000)
+        DeliveryNote.objects.bulk_update(notes, ['invoice', 'updated_at'], batch_size=500)
+    return pairs
@@ -11,6 +11,7 @@ from django.db.models import Q
 from decimal import Decimal
 from io import BytesIO
 
+from invoices.archive import get_invoice_or_404
 from invoices.models import Invoice, InvoiceItem
 from clients.models import Client
 from suppliers.models import Supplier
@@ -20,6 +21,7 @@ from proforma.models import ProformaInvoice, ProformaItem
 from delivery.models import DeliveryNote, DeliveryItem
 from orders.models import CustomerOrder, CustomerOrderItem, SupplierOrder, SupplierOrderItem
 
+from core.search import search_filter
 from api.exports import (
     generate_invoice_pdf, generate_invoice_excel,
     generate_proforma_pdf, generate_proforma_excel
@@ -48,8 +50,7 @@ def invoice_create(request):
         messages.success(request, f'Facture {invoice.invoice_number} créée avec succès!')
         return redirect('core:invoice_detail', pk=invoice.pk)
 
-    clients = Client.objects.filter(is_active=True)
-    return render(request, 'invoices/create.html', {'clients': clients})
+    return render(request, 'invoices/create.html')
 
 
 @login_required(login_url='accounts:login')
@@ -107,17 +108,13 @@ def invoice_add_item(request, pk):
         messages.success(request, f'{product.name} ajouté à la facture!')
         return redirect('core:invoice_detail', pk=invoice.pk)
 
-    products = Product.objects.filter(is_active=True)
-    return render(request, 'invoices/add_item.html', {
-        'invoice': invoice,
-        'products': products
-    })
+    return render(request, 'invoices/add_item.html', {'invoice': invoice})
 
 
 @login_required(login_url='accounts:login')
 def invoice_export_pdf(request, pk):
     """Exporter une facture en PDF"""
-    invoice = get_object_or_404(Invoice, pk=pk)
+    invoice = get_invoice_or_404(pk)
     pdf_buffer = generate_invoice_pdf(invoice)
 
     response = HttpResponse(pdf_buffer, content_type='application/pdf')
@@ -128,7 +125,7 @@ def invoice_export_pdf(request, pk):
 @login_required(login_url='accounts:login')
 def invoice_export_excel(request, pk):
     """Exporter une facture en Excel"""
-    invoice = get_object_or_404(Invoice, pk=pk)
+    invoice = get_invoice_or_404(pk)
     excel_buffer = generate_invoice_excel(invoice)
 
     response = HttpResponse(
@@ -148,10 +145,7 @@ def proforma_list(request):
 
     search = request.GET.get('search')
     if search:
-        proformas = proformas.filter(
-            Q(number__icontains=search) |
-            Q(client__name__icontains=search)
-        )
+        proformas = search_filter(proformas, search, ['proforma_number', 'client_name'])
 
     return render(request, 'proforma/list.html', {'proformas': proformas})
 
@@ -175,8 +169,7 @@ def proforma_create(request):
         messages.success(request, 'Proforma créée!')
         return redirect('core:proforma_detail', pk=proforma.pk)
 
-    clients = Client.objects.filter(is_active=True)
-    return render(request, 'proforma/create.html', {'clients': clients})
+    return render(request, 'proforma/create.html')
 
 
 # ==================== DELIVERY NOTES ====================
@@ -188,10 +181,7 @@ def delivery_list(request):
 
     search = request.GET.get('search')
     if search:
-        deliveries = deliveries.filter(
-            Q(number__icontains=search) |
-            Q(client__name__icontains=search)
-        )
+        deliveries = search_filter(deliveries, search, ['delivery_number', 'client_name'])
 
     return render(request, 'delivery/list.html', {'deliveries': deliveries})
 
@@ -222,13 +212,9 @@ def delivery_create(request):
         messages.success(request, 'Bon de livraison créé!')
         return redirect('core:delivery_detail', pk=delivery.pk)
 
-    clients = Client.objects.filter(is_active=True)
-    invoices = Invoice.objects.filter(status__in=['sent', 'partial'])
+    invoices = Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES)
 
-    return render(request, 'delivery/create.html', {
-        'clients': clients,
-        'invoices': invoices
-    })
+    return render(request, 'delivery/create.html', {'invoices': invoices})
 
 
 # ==================== CUSTOMER ORDERS ====================
@@ -242,10 +228,7 @@ def customer_order_list(request):
     status_filter = request.GET.get('status')
 
     if search:
-        orders = orders.filter(
-            Q(number__icontains=search) |
-            Q(client__name__icontains=search)
-        )
+        orders = search_filter(orders, search, ['order_number', 'client_name'])
 
     if status_filter:
         orders = orders.filter(status=status_filter)
@@ -280,8 +263,7 @@ def customer_order_create(request):
         messages.success(request, 'Commande créée!')
         return redirect('core:customer_order_detail', pk=order.pk)
 
-    clients = Client.objects.filter(is_active=True)
-    return render(request, 'orders/customer_create.html', {'clients': clients})
+    return render(request, 'orders/customer_create.html')
 
 
 # ==================== CLIENTS ====================
@@ -478,7 +460,7 @@ def payment_create(request):
         messages.success(request, f'Paiement de {payment.amount} € enregistré!')
         return redirect('core:payment_list')
 
-    invoices = Invoice.objects.filter(status__in=['sent', 'partial']).order_by('-created_at')
+    invoices = Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES).order_by('-created_at')
     return render(request, 'payments/create.html', {'invoices': invoices})
 
 
@@ -490,10 +472,7 @@ def payment_list(request):
     payments = Payment.objects.all().order_by('-payment_date')
 
     if search := request.GET.get('search'):
-        payments = payments.filter(
-            Q(invoice__invoice_number__icontains=search) |
-            Q(reference_number__icontains=search)
-        )
+        payments = search_filter(payments, search, ['invoice__invoice_number', 'reference'])
 
     return render(request, 'payments/list.html', {'payments': payments})
 
@@ -504,9 +483,6 @@ def supplier_list(request):
     suppliers = Supplier.objects.filter(is_active=True).order_by('name')
 
     if search := request.GET.get('search'):
-        suppliers = suppliers.filter(
-            Q(name__icontains=search) |
-            Q(email__icontains=search)
-        )
+        suppliers = search_filter(suppliers, search, ['name', 'email'])
 
     return render(request, 'suppliers/list.html', {'suppliers': suppliers})
@@ -0,0 +1,191 @@
+# ============================================================================
+# core/global_search.py - Recherche globale sur tous les types de documents
+# ============================================================================
+"""
+One search box over every entity type.
+
+Queries that look like a document number ("INV-00042", "42", "W-0012")
+are first resolved with exact lookups on the unique number columns; only
+when none of them matches does the search fall back to the full-text
+search of :mod:`core.search`, preceded for named entities by a prefix
+range scan on their normalized ``name_search`` column. In both passes the
+per-type queries run concurrently in the shared query pool, and each
+type keeps its best ``limit`` results.
+"""
+import re
+
+from django.apps import apps
+from django.urls import reverse
+
+from .metrics import run_in_parallel
+from .search import normalize_text, prefix_q, search_filter
+
+NUMBER_RE = re.compile(r'^[A-Za-z]{0,4}[-/]?\d[\d/-]*$')
+
+SEARCH_TYPES = [
+    {
+        'key': 'invoices', 'label': 'Factures', 'model': 'invoices.Invoice',
+        'numbers': ('invoice_number',), 'number_prefix': 'INV',
+        'fields': ('invoice_number', 'client_name'), 'related': (),
+        'title': lambda obj: obj.invoice_number, 'subtitle': lambda obj: obj.client_name,
+        'url': 'core:invoice_detail',
+    },
+    {
+        'key': 'proforma', 'label': 'Proformas', 'model': 'proforma.ProformaInvoice',
+        'numbers': ('proforma_number',), 'number_prefix': 'PRO',
+        'fields': ('proforma_number', 'client_name'), 'related': (),
+        'title': lambda obj: obj.proforma_number, 'subtitle': lambda obj: obj.client_name,
+        'url': 'core:proforma_detail',
+    },
+    {
+        'key': 'delivery_notes', 'label': 'Bons de livraison', 'model': 'delivery.DeliveryNote',
+        'numbers': ('delivery_number',), 'number_prefix': 'BL',
+        'fields': ('delivery_number', 'client_name'), 'related': (),
+        'title': lambda obj: obj.delivery_number, 'subtitle': lambda obj: obj.client_name,
+        'url': 'core:delivery_detail',
+    },
+    {
+        'key': 'customer_orders', 'label': 'Commandes clients', 'model': 'orders.CustomerOrder',
+        'numbers': ('order_number',), 'number_prefix': 'CMD',
+        'fields': ('order_number', 'client_name'), 'related': (),
+        'title': lambda obj: obj.order_number, 'subtitle': lambda obj: obj.client_name,
+        'url': 'core:customer_order_detail',
+    },
+    {
+        'key': 'supplier_orders', 'label': 'Commandes fournisseurs', 'model': 'orders.SupplierOrder',
+        'numbers': ('purchase_order_number',), 'number_prefix': 'PO',
+        'fields': ('purchase_order_number', 'supplier_name'), 'related': (),
+        'title': lambda obj: obj.purchase_order_number, 'subtitle': lambda obj: obj.supplier_name,
+        'url': 'orders:supplier_detail',
+    },
+    {
+        'key': 'payments', 'label': 'Paiements', 'model': 'payments.Payment',
+        # reference is only matched exactly: a LIKE scan of every payment is too slow
+        'numbers': ('reference', 'invoice__invoice_number'), 'number_prefix': 'INV',
+        'fields': ('invoice__invoice_number',), 'related': ('invoice',),
+        'title': lambda obj: obj.reference or obj.invoice.invoice_number,
+        'subtitle': lambda obj: f'{obj.amount} € - {obj.invoice.invoice_number}',
+        'url': 'payments:detail',
+    },
+    {
+        'key': 'clients', 'label': 'Clients', 'model': 'clients.Client',
+        'numbers': (), 'number_prefix': None,
+        'fields': ('name', 'company', 'email'), 'related': (), 'prefix': 'name_search',
+        'title': lambda obj: obj.name, 'subtitle': lambda obj: obj.company or obj.email,
+        'url': 'core:client_detail',
+    },
+    {
+        'key': 'suppliers', 'label': 'Fournisseurs', 'model': 'suppliers.Supplier',
+        'numbers': (), 'number_prefix': None,
+        'fields': ('name', 'company', 'email'), 'related': (), 'prefix': 'name_search',
+        'title': lambda obj: obj.name, 'subtitle': lambda obj: obj.company or obj.email,
+        'url': 'suppliers:detail',
+    },
+    {
+        'key': 'products', 'label': 'Produits', 'model': 'products.Product',
+        'numbers': ('sku', 'reference'), 'number_prefix': None,
+        'fields': ('name', 'sku', 'reference'), 'related': (), 'prefix': 'name_search',
+        'title': lambda obj: obj.name, 'subtitle': lambda obj: obj.sku,
+        'url': 'core:product_detail',
+    },
+]
+
+
+def looks_like_number(query):
+    return bool(NUMBER_RE.match(query))
+
+
+def number_candidates(query, prefix):
+    """Spellings of a document number: as typed, uppercased, and 42 -> INV-00042"""
+    candidates = {query, query.upper()}
+    if prefix and query.isdigit():
+        candidates.add(f'{prefix}-{int(query):05d}')
+    return sorted(candidates)
+
+
+def _queryset(spec):
+    return apps.get_model(spec['model'])._default_manager.select_related(*spec['related'])
+
+
+def _exact_matches(spec, candidates, limit):
+    # One lookup per number column: an OR across a join would bypass the indexes
+    found = {}
+    for field in spec['numbers']:
+        for obj in _queryset(spec).filter(**{f'{field}__in': candidates})[:limit]:
+            found.setdefault(obj.pk, obj)
+    return list(found.values())[:limit]
+
+
+def exact_queries(query, limit):
+    return {
+        spec['key']: (
+            lambda spec=spec: _exact_matches(spec, number_candidates(query, spec['number_prefix']), limit)
+        )
+        for spec in SEARCH_TYPES if spec['numbers']
+    }
+
+
+def _fuzzy_matches(spec, query, limit):
+    found = {}
+    # Names starting with the query first: a range scan on the indexed shadow column
+    if spec.get('prefix'):
+        prefixed = _queryset(spec).filter(prefix_q(spec['prefix'], normalize_text(query)))
+        for obj in prefixed.order_by(spec['prefix'])[:limit]:
+            found[obj.pk] = obj
+    # Unordered so the scan stops early; over-fetch so ranking can surface the closest matches
+    if len(found) < limit:
+        for obj in search_filter(_queryset(spec), query, spec['fields']).order_by()[:limit * 4]:
+            found.setdefault(obj.pk, obj)
+    return list(found.values())
+
+
+def fuzzy_queries(query, limit):
+    return {
+        spec['key']: (lambda spec=spec: _fuzzy_matches(spec, query, limit))
+        for spec in SEARCH_TYPES
+    }
+
+
+def score(query, title, subtitle):
+    """3: exact title, 2: title prefix, 1.5: word prefix, 1: other match"""
+    title, subtitle = normalize_text(title), normalize_text(subtitle)
+    if title == query:
+        return 3
+    if title.startswith(query):
+        return 2
+    if any(word.startswith(query) for word in f'{title} {subtitle}'.split()):
+        return 1.5
+    return 1
+
+
+def format_results(query, objects, limit, exact=False):
+    normalized = normalize_text(query)
+    groups = []
+    for spec in SEARCH_TYPES:
+        results = []
+        for obj in objects.get(spec['key'], ()):
+            title, subtitle = str(spec['title'](obj)), str(spec['subtitle'](obj) or '')
+            results.append({
+                'id': str(obj.pk),
+                'title': title,
+                'subtitle': subtitle,
+                'url': reverse(spec['url'], args=[obj.pk]),
+                'score': 3 if exact else score(normalized, title, subtitle),
+            })
+        if results:
+            results.sort(key=lambda result: -result['score'])
+            groups.append({'type': spec['key'], 'label': spec['label'], 'results': results[:limit]})
+    groups.sort(key=lambda group: -group['results'][0]['score'])
+    return groups
+
+
+def global_search(query, limit=5):
+    """Search every entity type; returns (exact, groups)"""
+    query = query.strip()
+    if not query:
+        return False, []
+    if looks_like_number(query):
+        objects = run_in_parallel(exact_queries(query, limit))
+        if any(objects.values()):
+            return True, format_results(query, objects, limit, exact=True)
+    return False, format_results(query, run_in_parallel(fuzzy_queries(query, limit)), limit)
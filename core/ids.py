@@ -0,0 +1,46 @@
+# ============================================================================
+# core/ids.py - Identifiants UUID ordonnés dans le temps (version 7)
+# ============================================================================
+"""
+Time-ordered UUIDs for primary keys.
+
+:func:`uuid7` follows RFC 9562: the 48 high bits hold the Unix time in
+milliseconds, so new keys are appended at the end of the primary key index
+instead of landing on random pages, and ordering by ``pk`` is ordering by
+creation time. The 12 bits after the version hold a counter, randomly
+seeded every millisecond, keeping ids generated by one process within the
+same millisecond increasing; the last 62 bits are random.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+COUNTER_MAX = 0xFFF
+
+
+def uuid7():
+    """A new version 7 UUID, greater than the previous one from this process"""
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Leave room for the counter to grow within the millisecond
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            # Same millisecond, or the clock went back
+            _counter += 1
+            if _counter > COUNTER_MAX:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    random_bits = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | random_bits
+    return uuid.UUID(int=value)
+
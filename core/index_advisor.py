@@ -0,0 +1,112 @@
+# ============================================================================
+# core/index_advisor.py - Rejeu des requêtes critiques et plans d'exécution
+# ============================================================================
+"""
+Replays the application's hot queries and inspects their query plans.
+
+Each entry of :func:`hot_queries` is a zero-argument callable running the
+same ORM code as the view it comes from. :func:`analyze` runs it, records
+every statement it sends to the database, then asks the database for the
+plan of each statement and flags full table scans and temporary sorts.
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def hot_queries(today):
+    """``{name: callable}`` of the filters hit by dashboards, lists and reports"""
+    from clients.models import Client
+    from invoices.models import Invoice
+    from payments.models import Payment
+    from products.models import Product
+
+    from .metrics import dashboard_queries, overview_queries, receivables_aging
+
+    start_of_month = today.replace(day=1)
+    client = Client.objects.order_by().values_list('pk', flat=True).first()
+    overview = overview_queries(today)
+    dashboard = dashboard_queries(today)
+
+    return {
+        'open invoices past due': lambda: Invoice.objects.filter(
+            status__in=Invoice.OPEN_STATUSES, due_date__lt=today
+        ).count(),
+        'overdue invoices': overview['overdue_invoices'],
+        'client invoices by date': lambda: list(
+            Invoice.objects.filter(client_id=client).order_by('-created_at')[:10]
+        ),
+        'recent invoices': dashboard['recent_invoices'],
+        'recent payments': dashboard['recent_payments'],
+        'invoiced this month': overview['month_invoiced'],
+        'paid this month': overview['month_paid'],
+        'payments since date': lambda: list(
+            Payment.objects.filter(payment_date__gte=start_of_month).order_by('-payment_date')[:20]
+        ),
+        'new clients this month': overview['new_clients_this_month'],
+        'low stock count': overview['low_stock_products'],
+        'low stock list': lambda: list(
+            Product.objects.filter(is_low_stock=True).order_by('name')[:20]
+        ),
+        'receivables aging': lambda: receivables_aging(today),
+    }
+
+
+@contextmanager
+def recording(connection):
+    """Collect the (sql, params) of every statement run on ``connection``"""
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield statements
+
+
+def plan_issues(connection, detail):
+    """Problems spotted in one line of a query plan"""
+    issues = []
+    if connection.vendor == 'sqlite':
+        if detail.startswith('SCAN ') and ' USING ' not in detail:
+            issues.append('full scan')
+        if 'USE TEMP B-TREE' in detail:
+            issues.append('temporary sort')
+    elif 'Seq Scan' in detail:
+        issues.append('full scan')
+    elif detail.lstrip().startswith('Sort '):
+        issues.append('sort')
+    return issues
+
+
+def explain(connection, sql, params):
+    """Plan lines of one statement"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        rows = cursor.fetchall()
+    # SQLite returns (id, parent, notused, detail), other backends one text column
+    return [row[-1] for row in rows]
+
+
+def analyze(queries, using=DEFAULT_DB_ALIAS, repeat=3):
+    """Time each query (best of ``repeat``) and collect the plans of its statements"""
+    connection = connections[using]
+    results = []
+    for name, query in queries.items():
+        with recording(connection) as statements:
+            query()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - start)
+
+        plans = []
+        for sql, params in statements:
+            lines = explain(connection, sql, params)
+            issues = sorted({issue for line in lines for issue in plan_issues(connection, line)})
+            plans.append({'sql': sql, 'plan': lines, 'issues': issues})
+        results.append({'name': name, 'seconds': min(timings), 'statements': plans})
+    return results
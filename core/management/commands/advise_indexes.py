@@ -0,0 +1,52 @@
+# ============================================================================
+# core/management/commands/advise_indexes.py
+# ============================================================================
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.index_advisor import analyze, hot_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the application's hot queries, print their timings and query "
+        "plans, and report the ones doing full table scans or temporary sorts. "
+        "Writes made by the replayed code are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Reference date (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per query (best is kept)')
+        parser.add_argument('--plans', action='store_true', help='Print every plan, not only problems')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            today = timezone.now().date()
+
+        with transaction.atomic():
+            results = analyze(hot_queries(today), repeat=max(options['repeat'], 1))
+            transaction.set_rollback(True)
+
+        flagged = 0
+        self.stdout.write(f"{'query':<28} {'ms':>9}  issues")
+        for result in results:
+            issues = sorted({issue for plan in result['statements'] for issue in plan['issues']})
+            flagged += bool(issues)
+            self.stdout.write(
+                f"{result['name']:<28} {result['seconds'] * 1000:>9.1f}  {', '.join(issues) or '-'}"
+            )
+            for plan in result['statements']:
+                if options['plans'] or plan['issues']:
+                    for line in plan['plan']:
+                        self.stdout.write(f"    {line}")
+
+        style = self.style.WARNING if flagged else self.style.SUCCESS
+        self.stdout.write(style(f"{flagged} of {len(results)} hot queries need attention."))
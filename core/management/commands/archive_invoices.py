@@ -0,0 +1,47 @@
+# ============================================================================
+# core/management/commands/archive_invoices.py
+# ============================================================================
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from invoices.archive import CHUNK_SIZE, archivable_invoices, archive_cutoff, archive_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Move paid and cancelled invoices older than --years, with their lines "
+        "and payments, to the archive tables, one transaction per chunk. "
+        "Archived invoices stay readable through the detail and export pages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=3, help='Minimum age in years (at least 1)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Invoices per transaction')
+        parser.add_argument('--date', help='Reference date (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the archivable invoices')
+
+    def handle(self, *args, **options):
+        if options['years'] < 1:
+            raise CommandError('--years must be at least 1.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            today = timezone.now().date()
+
+        cutoff = archive_cutoff(today, options['years'])
+        if options['dry_run']:
+            count = archivable_invoices(cutoff).count()
+            self.stdout.write(f"{count} invoices closed before {cutoff} would be archived.")
+            return
+
+        archived = 0
+        for archived in archive_invoices(cutoff, options['chunk_size']):
+            self.stdout.write(f"{archived} archived...")
+        self.stdout.write(self.style.SUCCESS(f"{archived} invoices closed before {cutoff} archived."))
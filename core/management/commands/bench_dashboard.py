@@ -0,0 +1,54 @@
+# ============================================================================
+# core/management/commands/bench_dashboard.py
+# ============================================================================
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+ENDPOINTS = [
+    ('overview', '/api/v1/dashboard/overview/', '/api/v1/dashboard/overview/async/'),
+    ('sales', '/api/v1/analytics/sales/', '/api/v1/analytics/sales/async/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the sync and async dashboard endpoints of a running server and "
+        "report p50/p99 latency. Start the server first, e.g. "
+        "'uvicorn invoice_project.asgi:application --workers 1'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--token', required=True, help='API token of an existing user')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=10)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'endpoint':<10} {'path':<6} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8}")
+        for name, sync_path, async_path in ENDPOINTS:
+            for label, path in (('sync', sync_path), ('async', async_path)):
+                latencies, elapsed = self.load(options['base_url'] + path, options)
+                p50 = statistics.median(latencies) * 1000
+                p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+                self.stdout.write(
+                    f"{name:<10} {label:<6} {p50:>9.1f} {p99:>9.1f} {len(latencies) / elapsed:>8.1f}"
+                )
+
+    def load(self, url, options):
+        headers = {'Authorization': f"Token {options['token']}"}
+
+        def fetch(_):
+            start = time.perf_counter()
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                response.read()
+            return time.perf_counter() - start
+
+        fetch(None)  # warm-up
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            latencies = list(pool.map(fetch, range(options['requests'])))
+        return latencies, time.perf_counter() - start
@@ -0,0 +1,161 @@
+# ============================================================================
+# core/management/commands/bench_reservations.py
+# ============================================================================
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.db.models import F, Sum
+
+from clients.models import Client
+from orders.models import CustomerOrder, CustomerOrderItem
+from orders.reservations import InsufficientStock
+from products.models import Product
+from suppliers.models import Supplier
+
+ALIAS = 'bench_reservations'
+
+
+class Command(BaseCommand):
+    help = (
+        "Confirm many customer orders competing for a few scarce products from "
+        "concurrent threads, in a scratch SQLite database with the production "
+        "profile, then check that no product is oversold and report confirmations "
+        "per second. The database itself is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--orders', type=int, default=2000)
+        parser.add_argument('--products', type=int, default=20)
+        parser.add_argument('--stock', type=int, default=100, help='Initial stock of each product')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('bench_reservations runs on a scratch SQLite database.')
+
+        with tempfile.TemporaryDirectory() as directory:
+            connections.settings[ALIAS] = {
+                **connections.settings['default'],
+                'NAME': os.path.join(directory, 'bench.sqlite3'),
+                'OPTIONS': dict(settings.SQLITE_PRODUCTION_OPTIONS),
+                'CONN_MAX_AGE': 0,
+            }
+            try:
+                order_ids = self.populate(options)
+                stats = self.run(order_ids, options['threads'])
+                self.report(stats, options)
+            finally:
+                connections[ALIAS].close()
+                del connections.settings[ALIAS]
+
+    def populate(self, options):
+        with connections[ALIAS].schema_editor() as editor:
+            # Referenced tables must exist, even for NULL foreign keys
+            for model in (User, Supplier, Client, Product, CustomerOrder, CustomerOrderItem):
+                editor.create_model(model)
+
+        client = Client.objects.using(ALIAS).create(
+            name='Bench', address='-', city='-', postal_code='-', country='-',
+        )
+        products = Product.objects.using(ALIAS).bulk_create([
+            Product(name=f'Bench {n}', sku=f'BENCH-{n}', unit_price=Decimal('1'),
+                    quantity_in_stock=options['stock'])
+            for n in range(options['products'])
+        ])
+        orders = CustomerOrder.objects.using(ALIAS).bulk_create([
+            CustomerOrder(client_id=client.pk, order_number=f'BENCH-{n:06d}', order_date=date.today())
+            for n in range(options['orders'])
+        ])
+        items = []
+        for order in orders:
+            for product in random.sample(products, min(3, len(products))):
+                item = CustomerOrderItem(
+                    order_id=order.pk, product_id=product.pk, description=product.name,
+                    quantity=Decimal(random.randint(1, 5)), unit_price=Decimal('1'),
+                )
+                item.calculate_amounts()
+                items.append(item)
+        CustomerOrderItem.objects.using(ALIAS).bulk_create(items, batch_size=1000)
+        order_ids = [order.pk for order in orders]
+        random.shuffle(order_ids)
+        return order_ids
+
+    def run(self, order_ids, threads):
+        lock = threading.Lock()
+        stats = Counter()
+        done_at = []
+        queue = iter(order_ids)
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        pk = next(queue, None)
+                    if pk is None:
+                        return
+                    order = CustomerOrder.objects.using(ALIAS).get(pk=pk)
+                    order.status = 'confirmed'
+                    try:
+                        order.save(using=ALIAS)
+                        outcome = 'confirmed'
+                    except InsufficientStock:
+                        outcome = 'refused'
+                    except OperationalError:
+                        outcome = 'locked'
+                    with lock:
+                        stats[outcome] += 1
+                        done_at.append(time.perf_counter())
+            finally:
+                connections[ALIAS].close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for future in [pool.submit(worker) for _ in range(threads)]:
+                future.result()
+        stats['elapsed'] = time.perf_counter() - start
+        # Orders handled in each tenth of the run, to see whether throughput holds up
+        stats['slices'] = Counter(
+            min(int((moment - start) / stats['elapsed'] * 10), 9) for moment in done_at
+        )
+        return stats
+
+    def report(self, stats, options):
+        products = Product.objects.using(ALIAS)
+        oversold = products.filter(quantity_reserved__gt=F('quantity_in_stock')).count()
+        lines = CustomerOrderItem.objects.using(ALIAS)
+        reserved = products.aggregate(total=Sum('quantity_reserved'))['total'] or 0
+        held = lines.aggregate(total=Sum('quantity_reserved'))['total'] or 0
+        confirmed = CustomerOrder.objects.using(ALIAS).filter(status='confirmed').count()
+
+        slice_rates = [stats['slices'][n] / (stats['elapsed'] / 10) for n in range(10)]
+        self.stdout.write(
+            f"{options['orders']} orders, {options['threads']} threads, "
+            f"{options['products']} products x {options['stock']} units"
+        )
+        self.stdout.write(
+            f"confirmed {stats['confirmed']}, refused {stats['refused']}, locked {stats['locked']} "
+            f"in {stats['elapsed']:.2f}s ({options['orders'] / stats['elapsed']:.0f} orders/s)"
+        )
+        self.stdout.write(
+            "orders/s per tenth of the run: min {:.0f}, median {:.0f}, max {:.0f}".format(
+                min(slice_rates), statistics.median(slice_rates), max(slice_rates)
+            )
+        )
+        self.stdout.write(
+            f"oversold products: {oversold}; reserved on products {reserved}, on order lines {held}; "
+            f"confirmed orders in database: {confirmed}"
+        )
+        if oversold or reserved != held or confirmed != stats['confirmed']:
+            raise CommandError('Reservations are inconsistent.')
@@ -0,0 +1,133 @@
+# ============================================================================
+# core/management/commands/bench_sqlite.py
+# ============================================================================
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import Count, Sum
+
+from invoices.models import Invoice
+
+PROFILES = ('development', 'production')
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent readers and writers against a copy of the database with "
+        "the development and production SQLite profiles, and report throughput "
+        "and 'database is locked' errors for each. The database itself is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per profile')
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--profile', choices=PROFILES, action='append',
+                            help='Profile to run (repeatable), defaults to both')
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES['default']
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('bench_sqlite only applies to the SQLite backend.')
+        invoice_ids = list(Invoice.objects.values_list('pk', flat=True)[:10000])
+        if not invoice_ids:
+            raise CommandError('The database has no invoices to work on.')
+
+        self.stdout.write(
+            f"{'profile':<12} {'reads/s':>9} {'writes/s':>9} {'read p99 (ms)':>14} {'locked':>7}"
+        )
+        for profile in options['profile'] or PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                alias = f'bench_{profile}'
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.copy_database(source['NAME'], path, profile)
+                self.add_alias(alias, path, profile)
+                try:
+                    stats = self.run(alias, invoice_ids, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+            self.stdout.write(
+                f"{profile:<12} {stats['reads'] / options['duration']:>9.1f} "
+                f"{stats['writes'] / options['duration']:>9.1f} "
+                f"{stats['read_p99'] * 1000:>14.1f} {stats['locked']:>7}"
+            )
+
+    def copy_database(self, source, path, profile):
+        src, dst = sqlite3.connect(source), sqlite3.connect(path)
+        try:
+            src.backup(dst)
+            # The journal mode is stored in the file: reset it for the baseline
+            dst.execute('PRAGMA journal_mode = %s' % ('WAL' if profile == 'production' else 'DELETE'))
+        finally:
+            src.close()
+            dst.close()
+
+    def add_alias(self, alias, path, profile):
+        # Start from the fully configured default alias, with the profile's options
+        config = {**connections.settings['default'], 'NAME': path, 'OPTIONS': {}, 'CONN_MAX_AGE': 0}
+        if profile == 'production':
+            config['OPTIONS'] = dict(settings.SQLITE_PRODUCTION_OPTIONS)
+        connections.settings[alias] = config
+
+    def run(self, alias, invoice_ids, options):
+        stop = time.monotonic() + options['duration']
+        lock = threading.Lock()
+        stats = {'reads': 0, 'writes': 0, 'locked': 0, 'latencies': []}
+
+        def record(key, latency=None):
+            with lock:
+                stats[key] += 1
+                if latency is not None:
+                    stats['latencies'].append(latency)
+
+        def reader():
+            # Report-style aggregate plus a list page, as the exports and dashboards do
+            invoices = Invoice.objects.using(alias)
+            try:
+                while time.monotonic() < stop:
+                    start = time.perf_counter()
+                    try:
+                        invoices.values('status').annotate(count=Count('pk'), total=Sum('total')).count()
+                        list(invoices.order_by('-invoice_date')[:50])
+                    except OperationalError:
+                        record('locked')
+                        continue
+                    record('reads', time.perf_counter() - start)
+            finally:
+                connections[alias].close()
+
+        def writer():
+            # Read then write in one transaction, like invoice entry
+            invoices = Invoice.objects.using(alias)
+            try:
+                while time.monotonic() < stop:
+                    pk = random.choice(invoice_ids)
+                    try:
+                        with transaction.atomic(using=alias):
+                            notes = invoices.filter(pk=pk).values_list('notes', flat=True).first() or ''
+                            invoices.filter(pk=pk).update(notes=notes[-200:] + '.')
+                    except OperationalError:
+                        record('locked')
+                        continue
+                    record('writes')
+            finally:
+                connections[alias].close()
+
+        workers = [reader] * options['readers'] + [writer] * options['writers']
+        with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+            for future in [pool.submit(worker) for worker in workers]:
+                future.result()
+
+        latencies = stats['latencies']
+        stats['read_p99'] = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else 0
+        return stats
@@ -0,0 +1,82 @@
+# ============================================================================
+# core/management/commands/bench_uuid.py
+# ============================================================================
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.ids import uuid7
+from payments.models import Payment
+
+GENERATORS = {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk insert rows keyed by uuid4 and by uuid7 into a scratch SQLite copy "
+        "of the payments table and its indexes, and report insert throughput and "
+        "the size of the primary key index for each. The database is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'keys':<6} {'rows/s':>10} {'pk index (KiB)':>15} {'pages':>7} {'fill %':>7}"
+        )
+        for name, generate in GENERATORS.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                stats = self.run(path, generate, options['rows'], options['batch_size'])
+            self.stdout.write(
+                f"{name:<6} {stats['rows_per_second']:>10.0f} {stats['index_bytes'] / 1024:>15.0f} "
+                f"{stats['index_pages']:>7} {stats['fill'] * 100:>7.1f}"
+            )
+
+    def run(self, path, generate, rows, batch_size):
+        db = sqlite3.connect(path)
+        try:
+            # Same table and indexes as the real one; foreign keys are not enforced
+            with connections['default'].schema_editor(collect_sql=True) as editor:
+                editor.create_model(Payment)
+            db.executescript('\n'.join(editor.collected_sql))
+            table = Payment._meta.db_table
+
+            insert = (
+                f'INSERT INTO "{table}" (id, invoice_id, payment_date, amount, method, reference, '
+                f'notes, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+            )
+            invoice_id = uuid.uuid4().hex
+            start = time.perf_counter()
+            for offset in range(0, rows, batch_size):
+                batch = [
+                    (generate().hex, invoice_id, '2025-01-01', '10.00', 'cash', '', '',
+                     '2025-01-01 00:00:00', '2025-01-01 00:00:00')
+                    for _ in range(min(batch_size, rows - offset))
+                ]
+                with db:
+                    db.executemany(insert, batch)
+            elapsed = time.perf_counter() - start
+
+            index = db.execute(
+                "SELECT name FROM sqlite_schema WHERE type = 'index' AND tbl_name = ? "
+                "AND name LIKE 'sqlite_autoindex_%'", (table,)
+            ).fetchone()[0]
+            pages, used, size = db.execute(
+                'SELECT COUNT(*), SUM(pgsize - unused), SUM(pgsize) FROM dbstat WHERE name = ?', (index,)
+            ).fetchone()
+        finally:
+            db.close()
+        return {
+            'rows_per_second': rows / elapsed,
+            'index_bytes': size,
+            'index_pages': pages,
+            'fill': used / size,
+        }
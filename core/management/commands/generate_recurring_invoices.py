@@ -0,0 +1,42 @@
+# ============================================================================
+# core/management/commands/generate_recurring_invoices.py
+# ============================================================================
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from invoices.recurring import CHUNK_SIZE, due_templates, generate_recurring_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Issue the invoices of every recurring invoice due by --date, catching up "
+        "on missed periods, and move each template to its next run. Meant to run "
+        "daily, e.g. from cron: '30 0 * * * python manage.py generate_recurring_invoices'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Reference date (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Templates per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the due templates')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            today = timezone.localdate()
+
+        if options['dry_run']:
+            self.stdout.write(f"{due_templates(today).count()} recurring invoices due by {today}.")
+            return
+
+        issued = 0
+        for issued in generate_recurring_invoices(today, options['chunk_size']):
+            self.stdout.write(f"{issued} invoices...")
+        self.stdout.write(self.style.SUCCESS(f"{issued} recurring invoices issued for {today}."))
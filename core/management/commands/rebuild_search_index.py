@@ -0,0 +1,31 @@
+# ============================================================================
+# core/management/commands/rebuild_search_index.py
+# ============================================================================
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.search import install_search_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the SQLite full-text search tables and triggers and reindex "
+        "every row. Run it after a VACUUM, which may renumber table rowids, or "
+        "pass --vacuum to compact the database and reindex in one step."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM the database before reindexing')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write('Database vacuumed')
+        installed = install_search_indexes(options['database'], rebuild=True)
+        if not installed:
+            self.stdout.write('Full-text search is not available on this database; LIKE search is used.')
+        for label in installed:
+            self.stdout.write(f'{label}: reindexed')
@@ -0,0 +1,63 @@
+# ============================================================================
+# core/management/commands/run_billing.py
+# ============================================================================
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from invoices.billing import PARTITION_SIZE, clients_to_bill, run_billing, start_billing_run
+
+
+class Command(BaseCommand):
+    help = (
+        "Invoice every client for its delivery notes of a period not yet invoiced, "
+        "one invoice per client, partitions of clients being billed in parallel "
+        "worker processes with one transaction each. Running a period again "
+        "resumes it: notes already invoiced are skipped. Defaults to last month, "
+        "e.g. from cron: '0 2 1 * * python manage.py run_billing'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First delivery date (YYYY-MM-DD), defaults to the first of last month')
+        parser.add_argument('--end', help='Last delivery date (YYYY-MM-DD), defaults to the end of last month')
+        parser.add_argument('--invoice-date', help='Date of the invoices (YYYY-MM-DD), defaults to --end')
+        parser.add_argument('--workers', type=int, default=settings.BILLING_WORKERS,
+                            help='Worker processes')
+        parser.add_argument('--partition-size', type=int, default=PARTITION_SIZE,
+                            help='Clients per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the clients to bill')
+
+    def parse_date(self, value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"Invalid date: {value}")
+
+    def handle(self, *args, **options):
+        this_month = timezone.localdate().replace(day=1)
+        end = self.parse_date(options['end']) if options['end'] else this_month - timedelta(days=1)
+        start = self.parse_date(options['start']) if options['start'] else end.replace(day=1)
+        invoice_date = self.parse_date(options['invoice_date']) if options['invoice_date'] else None
+        if start > end:
+            raise CommandError('--start must not be after --end.')
+        if options['workers'] < 1 or options['partition_size'] < 1:
+            raise CommandError('--workers and --partition-size must be at least 1.')
+
+        if options['dry_run']:
+            count = len(clients_to_bill(start, end))
+            self.stdout.write(f"{count} clients to bill for {start} - {end}.")
+            return
+
+        started = time.perf_counter()
+        run = start_billing_run(start, end, invoice_date)
+        invoiced = 0
+        for invoiced in run_billing(run, options['workers'], options['partition_size']):
+            self.stdout.write(f"{invoiced} invoices...")
+        run.refresh_from_db()
+        self.stdout.write(self.style.SUCCESS(
+            f"{invoiced} invoices created for {start} - {end} in {time.perf_counter() - started:.1f}s "
+            f"({run.invoice_count} invoices, {run.line_count} lines over the whole run)."
+        ))
@@ -0,0 +1,33 @@
+# ============================================================================
+# core/management/commands/snapshot_stock.py
+# ============================================================================
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from products.stock import take_stock_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the stock level of every product at the end of a day, used by "
+        "products.stock.stock_at to answer 'stock at date' with a short scan of "
+        "the movements since the nearest snapshot. Meant to run daily, e.g. from "
+        "cron: '15 0 * * * python manage.py snapshot_stock'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to snapshot (YYYY-MM-DD), defaults to yesterday')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                day = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            day = timezone.localdate() - timedelta(days=1)
+
+        count = take_stock_snapshot(day)
+        self.stdout.write(f"{count} products snapshotted for {day}")
@@ -0,0 +1,54 @@
+# ============================================================================
+# core/management/commands/suggest_reorders.py
+# ============================================================================
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from products.reorder import COVER_DAYS, HISTORY_DAYS, create_draft_orders, suggest_reorders
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute reorder quantities for every active product from its sales velocity, "
+        "lead time and stock position, and create one draft supplier order per supplier. "
+        "Products without a preferred supplier, and never bought before, are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Reference date (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--history-days', type=int, default=HISTORY_DAYS,
+                            help='Days of sales used for the velocity')
+        parser.add_argument('--cover-days', type=int, default=COVER_DAYS,
+                            help='Days of demand to order beyond the reorder point')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the suggestions')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            today = timezone.localdate()
+        if options['history_days'] < 1 or options['cover_days'] < 0:
+            raise CommandError('--history-days must be at least 1 and --cover-days positive')
+
+        start = time.perf_counter()
+        suggestions = suggest_reorders(today, options['history_days'], options['cover_days'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{len(suggestions)} products to reorder ({elapsed:.2f}s)")
+
+        if options['dry_run']:
+            for suggestion in suggestions[:50]:
+                self.stdout.write(
+                    f"{suggestion['product_id']}  qty {suggestion['quantity']:>6}  "
+                    f"velocity {suggestion['velocity']:>8}/day  reorder point {suggestion['reorder_point']:>8}  "
+                    f"position {suggestion['stock_position']:>6}"
+                )
+            return
+
+        orders = create_draft_orders(suggestions, today)
+        self.stdout.write(f"{len(orders)} draft supplier orders created")
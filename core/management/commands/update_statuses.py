@@ -0,0 +1,34 @@
+# ============================================================================
+# core/management/commands/update_statuses.py
+# ============================================================================
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.transitions import apply_transitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark past-due invoices as overdue and past-expiry proformas as expired, "
+        "one bulk UPDATE per transition, and record each change in StatusChange. "
+        "Meant to run daily, e.g. from cron: '5 0 * * * python manage.py update_statuses'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Reference date (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would change')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            today = timezone.now().date()
+
+        verb = 'would move' if options['dry_run'] else 'moved'
+        for label, from_status, to_status, count in apply_transitions(today, options['dry_run']):
+            self.stdout.write(f"{label}: {count} {verb} {from_status} -> {to_status}")
@@ -0,0 +1,268 @@
+# ============================================================================
+# core/metrics.py - Requêtes d'agrégats du tableau de bord
+# ============================================================================
+"""
+Dashboard aggregates expressed as independent zero-argument queries.
+
+Each builder returns a ``{name: callable}`` mapping. Sync views evaluate
+it with :func:`run_serially`; async views fan it out with
+:func:`run_concurrently`, which runs every query in a bounded thread pool
+so the independent aggregates hit the database at the same time.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'DASHBOARD_QUERY_WORKERS', 8),
+    thread_name_prefix='dashboard-query',
+)
+
+
+def _run_query(query):
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+def run_serially(queries):
+    """Evaluate queries one after the other in the current thread"""
+    return {name: query() for name, query in queries.items()}
+
+
+def run_in_parallel(queries):
+    """Evaluate queries concurrently in the bounded pool from synchronous code"""
+    # Each query runs in a copy of the caller's context (database routing state)
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, _run_query, query)
+        for name, query in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+async def run_concurrently(queries):
+    """Evaluate queries concurrently in the bounded dashboard thread pool"""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(_executor, contextvars.copy_context().run, _run_query, query)
+        for query in queries.values()
+    ))
+    return dict(zip(queries.keys(), results))
+
+
+def overview_queries(today):
+    """Queries behind the API dashboard overview"""
+    from invoices.archive import archived_totals
+    from invoices.models import Invoice
+    from clients.models import Client
+    from products.models import Product
+    from payments.models import Payment
+
+    start_of_month = today.replace(day=1)
+
+    return {
+        # Archived invoices count through their rollup
+        'total_invoices': lambda: (
+            (Invoice.objects.aggregate(Sum('total'))['total__sum'] or 0)
+            + archived_totals()['total']
+        ),
+        'total_paid': lambda: (
+            (Invoice.objects.aggregate(Sum('paid_amount'))['paid_amount__sum'] or 0)
+            + archived_totals()['paid_amount']
+        ),
+        'pending_invoices': lambda: Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES).count(),
+        'overdue_invoices': lambda: Invoice.objects.filter(status='overdue').count(),
+        'month_invoiced': lambda: Invoice.objects.filter(
+            invoice_date__gte=start_of_month
+        ).aggregate(Sum('total'))['total__sum'] or 0,
+        'month_paid': lambda: Payment.objects.filter(
+            payment_date__gte=start_of_month
+        ).aggregate(Sum('amount'))['amount__sum'] or 0,
+        'total_clients': lambda: Client.objects.filter(is_active=True).count(),
+        'new_clients_this_month': lambda: Client.objects.filter(
+            created_at__gte=start_of_month
+        ).count(),
+        'low_stock_products': lambda: Product.objects.filter(is_low_stock=True).count(),
+    }
+
+
+def sales_statistics_queries(today):
+    """One revenue query per month over the past 12 months, keyed by (position, label)"""
+    from invoices.models import Invoice
+
+    def monthly_total(month_start, next_month):
+        return lambda: Invoice.objects.filter(
+            invoice_date__gte=month_start,
+            invoice_date__lt=next_month
+        ).aggregate(Sum('total'))['total__sum'] or 0
+
+    queries = {}
+    for i in range(11, -1, -1):
+        month_start = today - timedelta(days=today.day + i*30)
+        month_start = month_start.replace(day=1)
+
+        next_month = month_start + timedelta(days=31)
+        next_month = next_month.replace(day=1)
+
+        queries[(i, month_start.strftime('%B %Y'))] = monthly_total(month_start, next_month)
+    return queries
+
+
+def dashboard_queries(today):
+    """Queries behind the HTML dashboard; querysets are evaluated to lists"""
+    from invoices.archive import archived_totals
+    from invoices.models import Invoice
+    from clients.models import Client
+    from suppliers.models import Supplier
+    from products.models import Product
+    from payments.models import Payment
+    from orders.models import CustomerOrder, SupplierOrder
+
+    return {
+        # Invoice metrics
+        'total_invoiced': lambda: (Invoice.objects.filter(
+            status__in=['sent', 'overdue', 'paid']
+        ).aggregate(total=Sum('total'))['total'] or 0) + archived_totals(statuses=['paid'])['total'],
+        'total_paid': lambda: (Invoice.objects.filter(
+            status='paid'
+        ).aggregate(total=Sum('total'))['total'] or 0) + archived_totals(statuses=['paid'])['total'],
+        'pending_count': lambda: Invoice.objects.filter(status='sent').count(),
+        'overdue_count': lambda: Invoice.objects.filter(status='overdue').count(),
+
+        # Client & Supplier metrics
+        'total_clients': lambda: Client.objects.filter(is_active=True).count(),
+        'total_suppliers': lambda: Supplier.objects.filter(is_active=True).count(),
+
+        # Product metrics
+        'total_products': lambda: Product.objects.count(),
+        'low_stock_products': lambda: Product.objects.filter(is_low_stock=True).count(),
+
+        # Orders metrics
+        'pending_orders': lambda: CustomerOrder.objects.filter(status='pending').count(),
+        'pending_supplier_orders': lambda: SupplierOrder.objects.filter(status='pending').count(),
+
+        # Recent data
+        'recent_invoices': lambda: list(
+            Invoice.objects.order_by('-created_at')[:5]
+        ),
+        'recent_payments': lambda: list(
+            Payment.objects.select_related('invoice').order_by('-created_at')[:5]
+        ),
+        'low_stock_items': lambda: list(
+            Product.objects.filter(is_low_stock=True)[:5]
+        ),
+    }
+
+
+# ============================================================================
+# Receivables aging
+# ============================================================================
+
+# (key, label, lower bound in days past due, upper bound) - None means open-ended
+AGING_BUCKETS = (
+    ('current', 'Non échu', None, 0),
+    ('days_1_30', '1-30 jours', 1, 30),
+    ('days_31_60', '31-60 jours', 31, 60),
+    ('days_61_90', '61-90 jours', 61, 90),
+    ('days_90_plus', '+90 jours', 91, None),
+)
+
+
+def parse_period_days(value, default=90):
+    """Read the DSO period from a query parameter, clamped to 1-365 days"""
+    try:
+        return min(max(int(value), 1), 365)
+    except (TypeError, ValueError):
+        return default
+
+
+def _bucket_sum(today, outstanding, lower, upper):
+    """SUM(CASE WHEN due_date in the bucket THEN outstanding ELSE 0 END)"""
+    conditions = {}
+    if upper is not None:
+        conditions['due_date__gte'] = today - timedelta(days=upper)
+    if lower is not None:
+        conditions['due_date__lte'] = today - timedelta(days=lower)
+    return Sum(Case(
+        When(then=outstanding, **conditions),
+        default=Value(Decimal('0')),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    ))
+
+
+def receivables_aging(today, period_days=90):
+    """
+    Open receivables bucketed by days past ``due_date``, per client and in total.
+
+    The buckets are computed in a single GROUP BY over the open invoices
+    (served by the ``(status, due_date)`` index); a second GROUP BY over
+    the last ``period_days`` of sales gives the days sales outstanding.
+    """
+    from invoices.models import Invoice
+
+    outstanding = F('total') - F('paid_amount')
+    buckets = {
+        key: _bucket_sum(today, outstanding, lower, upper)
+        for key, _, lower, upper in AGING_BUCKETS
+    }
+    rows = (
+        Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES)
+        .values('client_id', 'client__name')
+        .annotate(invoice_count=Count('id'), **buckets)
+        .order_by()
+    )
+
+    period_start = today - timedelta(days=period_days)
+    sales = dict(
+        Invoice.objects.filter(invoice_date__gt=period_start, invoice_date__lte=today)
+        .exclude(status__in=['draft', 'cancelled'])
+        .values('client_id')
+        .annotate(sales=Sum('total'))
+        .order_by()
+        .values_list('client_id', 'sales')
+    )
+
+    def dso(outstanding_total, period_sales):
+        if not period_sales:
+            return None
+        return round(outstanding_total / period_sales * period_days, 1)
+
+    keys = [key for key, *_ in AGING_BUCKETS]
+    totals = dict.fromkeys(keys + ['total'], Decimal('0'))
+    totals['invoice_count'] = 0
+    clients = []
+    for row in rows:
+        client = {
+            'client_id': row['client_id'],
+            'client_name': row['client__name'],
+            'invoice_count': row['invoice_count'],
+        }
+        client.update((key, row[key]) for key in keys)
+        client['total'] = sum(row[key] for key in keys)
+        client['sales'] = sales.get(row['client_id']) or Decimal('0')
+        client['dso'] = dso(client['total'], client['sales'])
+        if not client['total']:
+            continue
+        clients.append(client)
+        for key in keys + ['total', 'invoice_count']:
+            totals[key] += client[key]
+
+    # Period sales of clients without open invoices still count in the overall DSO
+    totals['sales'] = sum(sales.values(), Decimal('0'))
+    totals['dso'] = dso(totals['total'], totals['sales'])
+    clients.sort(key=lambda client: client['total'], reverse=True)
+
+    return {
+        'as_of': today,
+        'period_days': period_days,
+        'buckets': [{'key': key, 'label': label} for key, label, *_ in AGING_BUCKETS],
+        'clients': clients,
+        'totals': totals,
+    }
@@ -0,0 +1,27 @@
+# ============================================================================
+# core/middleware.py - Middlewares du projet
+# ============================================================================
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .routers import routing_scope
+
+
+class DatabaseRoutingMiddleware:
+    """Per-request routing state: a request that writes reads from the primary"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with routing_scope():
+            return await self.get_response(request)
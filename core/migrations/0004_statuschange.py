@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=64)),
+                ('from_status', models.CharField(max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('changed_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Status Change',
+                'verbose_name_plural': 'Status Changes',
+                'ordering': ['-changed_at'],
+                'indexes': [models.Index(fields=['model', 'object_id'], name='core_status_model_7544be_idx')],
+            },
+        ),
+    ]
@@ -48,11 +48,8 @@ class SearchMixin:
         search = self.request.GET.get('search')
 
         if search and self.search_fields:
-            from django.db.models import Q
-            query = Q()
-            for field in self.search_fields:
-                query |= Q(**{f"{field}__icontains": search})
-            queryset = queryset.filter(query)
+            from .search import search_filter
+            queryset = search_filter(queryset, search, self.search_fields)
 
         return queryset
 
@@ -24,3 +24,44 @@ class DashboardMetric(models.Model):
 
     def __str__(self):
         return f"Metrics for {self.date}"
+
+
+class Tombstone(models.Model):
+    """Record of a deleted object, consumed by delta-sync clients"""
+
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        verbose_name = _('Tombstone')
+        verbose_name_plural = _('Tombstones')
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+            models.Index(fields=['model', 'deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+
+class StatusChange(models.Model):
+    """Audit trail of automatic status transitions"""
+
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    changed_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-changed_at']
+        verbose_name = _('Status Change')
+        verbose_name_plural = _('Status Changes')
+        indexes = [
+            models.Index(fields=['model', 'object_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}: {self.from_status} -> {self.to_status}"
@@ -0,0 +1,133 @@
+# ============================================================================
+# core/routers.py - Lectures des rapports sur la base de reporting (réplica)
+# ============================================================================
+"""
+Database router sending report reads to a replica.
+
+Reads made inside :func:`reporting_reads` (or a view wrapped with
+:func:`reporting_view` / :class:`ReportingReadsMixin`) go to the alias named
+by ``settings.REPORTING_DATABASE`` when it is configured. Every other read,
+and every write, uses the default database.
+
+:class:`core.middleware.DatabaseRoutingMiddleware` gives each request its own
+routing state. Once the request writes, its later reads stay on the primary,
+so a view never reads back stale data from a lagging replica. Writes are
+detected on the statements actually run on the primary connection, as the
+router's ``db_for_write`` is also consulted when merely assigning relations.
+"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# A mutable dict so that writes made from worker threads, which run in a
+# copy of the request context, still pin the request to the primary
+_state = ContextVar('db_routing_state', default=None)
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def reporting_alias():
+    """The configured reporting alias, or None"""
+    alias = getattr(settings, 'REPORTING_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def routing_scope():
+    """Fresh routing state, e.g. for one request"""
+    token = _state.set({'reporting': 0, 'pinned': False})
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def reporting_reads():
+    """Send reads to the reporting database until exit or the first write"""
+    if _state.get() is None:
+        with routing_scope(), reporting_reads():
+            yield
+        return
+    state = _state.get()
+    state['reporting'] += 1
+    try:
+        yield
+    finally:
+        state['reporting'] -= 1
+
+
+def reporting_view(view):
+    """Decorator running a sync or async view inside :func:`reporting_reads`"""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            with reporting_reads():
+                return await view(*args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with reporting_reads():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+class ReportingReadsMixin:
+    """Class-based view variant of :func:`reporting_view`"""
+
+    def dispatch(self, request, *args, **kwargs):
+        handler = super().dispatch
+        if self.view_is_async:
+            async def run():
+                with reporting_reads():
+                    return await handler(request, *args, **kwargs)
+            return run()
+        with reporting_reads():
+            response = handler(request, *args, **kwargs)
+            # Template responses evaluate their lazy querysets when rendered
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            return response
+
+
+def _pin_on_write(execute, sql, params, many, context):
+    state = _state.get()
+    if state is not None and not state['pinned'] and sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+        state['pinned'] = True
+    return execute(sql, params, many, context)
+
+
+def install_write_tracking(sender, connection, **kwargs):
+    """connection_created receiver watching the primary for writes"""
+    if connection.alias == DEFAULT_DB_ALIAS and _pin_on_write not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_pin_on_write)
+
+
+class ReportingRouter:
+    """Reporting reads to the replica, everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        alias = reporting_alias()
+        if alias and state and state['reporting'] and not state['pinned']:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, reporting_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary
+        if db == reporting_alias():
+            return False
+        return None
@@ -0,0 +1,286 @@
+# ============================================================================
+# core/search.py - Recherche plein texte (SQLite FTS5, repli sur LIKE)
+# ============================================================================
+"""
+Full-text search shared by list views, function views and the API.
+
+On SQLite every model of ``SEARCH_INDEXES`` gets an external-content FTS5
+table (``<db_table>_fts``, trigram tokenizer) kept in sync by INSERT,
+UPDATE and DELETE triggers, so bulk writes and ``update()`` are indexed
+too. The tables and triggers are (re)installed after every ``migrate``;
+if a migration rebuilt a base table, its index is rebuilt as well.
+
+The FTS tables are keyed on the base tables' implicit rowid, as the
+primary keys are UUIDs. VACUUM may renumber those rowids, which leaves
+the indexes pointing at the wrong rows: compact the database with
+``manage.py rebuild_search_index --vacuum``, which rebuilds them right
+after, or run that command after any other VACUUM.
+
+:func:`search_q` turns search terms and a list of field paths into a Q
+object. Each term must match at least one field; indexed fields are
+matched through FTS5, the others - and terms shorter than the trigram
+size - with ``icontains``, which is also the fallback on other backends.
+
+Models using :class:`SearchColumnsMixin` keep ``<field>_search`` shadow
+columns holding :func:`normalize_text` of their searchable fields. Those
+fields are matched on the indexed shadow column instead, with a normalized
+term, so searches ignore case and accents and short terms become index
+range scans on the column prefix.
+"""
+import unicodedata
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import models
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_INDEXES = {
+    'clients.Client': ('name_search', 'company_search', 'email_search', 'phone', 'tax_id'),
+    'suppliers.Supplier': ('name_search', 'company_search', 'email_search', 'phone', 'tax_id'),
+    'products.Product': ('name_search', 'sku', 'reference', 'description'),
+    'invoices.Invoice': ('invoice_number', 'client_name', 'description'),
+}
+
+# The trigram tokenizer cannot match shorter terms
+MIN_TERM_LENGTH = 3
+
+# Labels of the indexes usable on each database alias
+_available = {}
+
+
+def normalize_text(value):
+    """Lowercase and strip accents: 'Société Générale' -> 'societe generale'"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value).casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def search_column(model, name):
+    """Name of the shadow column of a field, or None"""
+    if name in getattr(model, 'search_columns', ()):
+        return f'{name}_search'
+    return None
+
+
+def prefix_q(field, term):
+    """Index range scan for values starting with an already normalized term"""
+    return Q(**{f'{field}__gte': term, f'{field}__lt': term + '\U0010ffff'})
+
+
+class SearchColumnsMixin:
+    """Keeps a ``<field>_search`` column equal to normalize_text(<field>)"""
+    search_columns = ()
+
+    def fill_search_columns(self):
+        for name in self.search_columns:
+            setattr(self, f'{name}_search', normalize_text(getattr(self, name)))
+
+    @classmethod
+    def with_search_columns(cls, fields):
+        """Field names plus the shadow columns of those among them"""
+        fields = list(fields)
+        return fields + [
+            f'{name}_search' for name in cls.search_columns
+            if name in fields and f'{name}_search' not in fields
+        ]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.fill_search_columns()
+        if update_fields is not None:
+            update_fields = self.with_search_columns(update_fields)
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class SearchColumnsQuerySet(models.QuerySet):
+    """Fills the shadow columns on the bulk paths, which bypass save()"""
+
+    def bulk_create(self, objs, *args, update_fields=None, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.fill_search_columns()
+        if update_fields:
+            update_fields = self.model.with_search_columns(update_fields)
+        return super().bulk_create(objs, *args, update_fields=update_fields, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.fill_search_columns()
+        return super().bulk_update(objs, self.model.with_search_columns(fields), *args, **kwargs)
+
+    def update(self, **kwargs):
+        # Expressions cannot be normalized here; the next save() repairs those rows
+        for name in self.model.search_columns:
+            value = kwargs.get(name)
+            if name in kwargs and not hasattr(value, 'resolve_expression'):
+                kwargs.setdefault(f'{name}_search', normalize_text(value))
+        return super().update(**kwargs)
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def _index_columns(model):
+    return [model._meta.get_field(name).column for name in SEARCH_INDEXES[model._meta.label]]
+
+
+def _trigger_sql(model, qn):
+    table, fts = qn(model._meta.db_table), qn(fts_table(model))
+    columns = _index_columns(model)
+    names = ', '.join(qn(column) for column in columns)
+    new_values = ', '.join(f'new.{qn(column)}' for column in columns)
+    old_values = ', '.join(f'old.{qn(column)}' for column in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new_values});"
+    prefix = fts_table(model)
+    return {
+        f'{prefix}_ai': f"CREATE TRIGGER {qn(prefix + '_ai')} AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f'{prefix}_ad': f"CREATE TRIGGER {qn(prefix + '_ad')} AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f'{prefix}_au': (
+            f"CREATE TRIGGER {qn(prefix + '_au')} AFTER UPDATE OF {names} ON {table} "
+            f"BEGIN {delete_old} {insert_new} END"
+        ),
+    }
+
+
+def install_search_indexes(using=DEFAULT_DB_ALIAS, rebuild=False):
+    """Create missing FTS tables and triggers; rebuild the indexes that need it"""
+    connection = connections[using]
+    _available.pop(using, None)
+    if connection.vendor != 'sqlite':
+        return []
+
+    qn = connection.ops.quote_name
+    installed = []
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {row[0] for row in cursor.fetchall()}
+
+        for label in SEARCH_INDEXES:
+            model = apps.get_model(label)
+            table, fts = model._meta.db_table, fts_table(model)
+            if table not in tables:
+                continue
+            columns = _index_columns(model)
+            trigger_sql = _trigger_sql(model, qn)
+            needs_rebuild = rebuild
+
+            if fts in tables:
+                cursor.execute(f'PRAGMA table_info({qn(fts)})')
+                if [row[1] for row in cursor.fetchall()] != columns:
+                    cursor.execute(f'DROP TABLE {qn(fts)}')
+                    tables.discard(fts)
+            if fts not in tables:
+                try:
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE {qn(fts)} USING fts5("
+                        f"{', '.join(qn(column) for column in columns)}, "
+                        f"content={qn(table)}, tokenize='trigram')"
+                    )
+                except OperationalError:
+                    # SQLite built without FTS5 or older than 3.34: LIKE fallback
+                    return installed
+                needs_rebuild = True
+
+            # Triggers are dropped whenever a migration remakes the base table
+            if not needs_rebuild and not set(trigger_sql) <= triggers:
+                needs_rebuild = True
+            if needs_rebuild:
+                for name, sql in trigger_sql.items():
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {qn(name)}')
+                    cursor.execute(sql)
+                cursor.execute(f"INSERT INTO {qn(fts)}({qn(fts)}) VALUES ('rebuild')")
+            installed.append(label)
+    return installed
+
+
+def install_search_indexes_after_migrate(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    install_search_indexes(using)
+
+
+def available_indexes(using=DEFAULT_DB_ALIAS):
+    """Labels of the models whose FTS index exists on this database"""
+    if using not in _available:
+        connection = connections[using]
+        labels = set()
+        if connection.vendor == 'sqlite':
+            tables = set(connection.introspection.table_names())
+            labels = {
+                label for label in SEARCH_INDEXES
+                if fts_table(apps.get_model(label)) in tables
+            }
+        _available[using] = labels
+    return _available[using]
+
+
+def _resolve(model, path):
+    """Split a field path into (lookup prefix, model owning the field, field name)"""
+    *relations, name = path.split('__')
+    prefix = ''
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+        prefix += f'{relation}__'
+    return prefix, model, name
+
+
+def _fts_q(prefix, model, names, term, connection):
+    qn = connection.ops.quote_name
+    table, fts = qn(model._meta.db_table), qn(fts_table(model))
+    columns = ' '.join(model._meta.get_field(name).column for name in names)
+    match = '{%s} : "%s"' % (columns, term.replace('"', '""'))
+    sql = (
+        f'SELECT {table}.{qn(model._meta.pk.column)} FROM {table} '
+        f'WHERE {table}.rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)'
+    )
+    return Q(**{f'{prefix}pk__in': RawSQL(sql, [match])})
+
+
+def search_q(model, terms, fields, using=DEFAULT_DB_ALIAS):
+    """Q object matching rows where every term is found in one of ``fields``"""
+    indexed = available_indexes(using)
+    connection = connections[using]
+
+    groups = {}
+    for path in fields:
+        prefix, owner, name = _resolve(model, path)
+        groups.setdefault((prefix, owner), []).append(name)
+
+    query = Q()
+    for term in terms:
+        normalized = normalize_text(term)
+        term_q = Q()
+        for (prefix, owner), names in groups.items():
+            fts_columns = SEARCH_INDEXES.get(owner._meta.label, ()) if (
+                owner._meta.label in indexed and len(term) >= MIN_TERM_LENGTH
+            ) else ()
+            # Shadow columns hold normalized text, the other fields are matched as typed
+            shadow = {name: search_column(owner, name) for name in names}
+            normalized_fts = [shadow[name] for name in names if shadow[name] in fts_columns]
+            raw_fts = [name for name in names if not shadow[name] and name in fts_columns]
+            if normalized_fts:
+                term_q |= _fts_q(prefix, owner, normalized_fts, normalized, connection)
+            if raw_fts:
+                term_q |= _fts_q(prefix, owner, raw_fts, term, connection)
+            for name in names:
+                if shadow[name] in normalized_fts or name in raw_fts:
+                    continue
+                if not shadow[name]:
+                    term_q |= Q(**{f'{prefix}{name}__icontains': term})
+                elif len(term) < MIN_TERM_LENGTH:
+                    term_q |= prefix_q(f'{prefix}{shadow[name]}', normalized)
+                else:
+                    term_q |= Q(**{f'{prefix}{shadow[name]}__contains': normalized})
+        query &= term_q
+    return query
+
+
+def search_filter(queryset, search, fields):
+    """Filter a queryset with a free-text search string over ``fields``"""
+    terms = search.split()
+    if not terms or not fields:
+        return queryset
+    return queryset.filter(search_q(queryset.model, terms, fields, using=queryset.db))
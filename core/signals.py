@@ -0,0 +1,43 @@
+# ============================================================================
+# core/signals.py - Tombstones pour la synchronisation incrémentale
+# ============================================================================
+from django.apps import apps
+from django.db.models.signals import post_delete
+
+from .models import Tombstone
+
+# Models exposed through the API change feed
+TRACKED_MODELS = [
+    'accounts.UserProfile',
+    'clients.Client',
+    'suppliers.Supplier',
+    'products.Product',
+    'invoices.Invoice',
+    'invoices.InvoiceItem',
+    'proforma.ProformaInvoice',
+    'proforma.ProformaItem',
+    'delivery.DeliveryNote',
+    'delivery.DeliveryItem',
+    'orders.CustomerOrder',
+    'orders.CustomerOrderItem',
+    'orders.SupplierOrder',
+    'orders.SupplierOrderItem',
+    'payments.Payment',
+]
+
+
+def record_tombstone(sender, instance, using, **kwargs):
+    """Keep a trace of deleted objects so removals propagate to synced clients"""
+    Tombstone.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_id=str(instance.pk),
+    )
+
+
+def connect_tombstones():
+    for label in TRACKED_MODELS:
+        post_delete.connect(
+            record_tombstone,
+            sender=apps.get_model(label),
+            dispatch_uid=f'tombstone_{label}',
+        )
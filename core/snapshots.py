@@ -0,0 +1,123 @@
+# ============================================================================
+# core/snapshots.py - Nom et identifiant fiscal du tiers copiés sur les documents
+# ============================================================================
+"""
+Client and supplier snapshot columns on documents.
+
+Documents using :class:`PartySnapshotMixin` copy the name (and tax id) of
+their client or supplier into their own columns, so lists can show, search
+and sort by party name without joining the party table, and reprints show
+the party as it was when the document was issued.
+
+A snapshot follows its party while the document is still open (a draft,
+or an undelivered delivery note): it is refreshed on every save of the
+document, and in bulk by :func:`refresh_party_snapshots` when the party
+is renamed. Issued documents keep the name they were issued under.
+"""
+from django.apps import apps
+from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+# Documents carrying a snapshot, by party model
+SNAPSHOT_MODELS = {
+    'clients.Client': [
+        'invoices.Invoice',
+        'proforma.ProformaInvoice',
+        'delivery.DeliveryNote',
+        'orders.CustomerOrder',
+    ],
+    'suppliers.Supplier': [
+        'orders.SupplierOrder',
+    ],
+}
+
+
+class PartySnapshotMixin:
+    """Copies ``snapshot_fields`` of the ``party_field`` relation onto the document"""
+    party_field = 'client'
+    # {document column: party attribute}
+    snapshot_fields = {'client_name': 'name', 'client_tax_id': 'tax_id'}
+    # Statuses in which the snapshot still follows the party
+    snapshot_open_statuses = ('draft',)
+
+    @classmethod
+    def snapshot_open_q(cls):
+        return models.Q(status__in=cls.snapshot_open_statuses)
+
+    def snapshot_is_open(self):
+        return self.status in self.snapshot_open_statuses
+
+    def fill_party_snapshot(self, party=None):
+        party = party or getattr(self, self.party_field)
+        for column, attribute in self.snapshot_fields.items():
+            setattr(self, column, getattr(party, attribute))
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if self._state.adding or self.snapshot_is_open():
+            self.fill_party_snapshot()
+            if update_fields is not None:
+                update_fields = list(update_fields) + [
+                    column for column in self.snapshot_fields if column not in update_fields
+                ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class PartySnapshotQuerySet(models.QuerySet):
+    """Fills the snapshot columns on bulk_create, which bypasses save()"""
+
+    def bulk_create(self, objs, *args, update_fields=None, **kwargs):
+        objs = list(objs)
+        field = self.model._meta.get_field(self.model.party_field)
+        parties = field.related_model._default_manager.using(self.db).in_bulk(
+            {getattr(obj, field.attname) for obj in objs}
+        )
+        for obj in objs:
+            party = parties.get(getattr(obj, field.attname))
+            if party is not None:
+                obj.fill_party_snapshot(party)
+        if update_fields:
+            update_fields = list(update_fields) + [
+                column for column in self.model.snapshot_fields if column not in update_fields
+            ]
+        return super().bulk_create(objs, *args, update_fields=update_fields, **kwargs)
+
+
+def refresh_party_snapshots(party_model, party_ids=None):
+    """Copy the current name of the given parties onto their open documents"""
+    labels = SNAPSHOT_MODELS.get(party_model._meta.label, [])
+    if not labels:
+        return 0
+    refreshed = 0
+    now = timezone.now()
+    for label in labels:
+        document = apps.get_model(label)
+        # One UPDATE per document table, with the values read from the party row
+        party = party_model._default_manager.filter(pk=OuterRef(document.party_field))
+        values = {
+            column: Subquery(party.values(attribute)[:1])
+            for column, attribute in document.snapshot_fields.items()
+        }
+        stale = models.Q()
+        for column, value in values.items():
+            stale |= ~models.Q(**{column: value})
+        documents = document._default_manager.filter(document.snapshot_open_q(), stale)
+        if party_ids is not None:
+            documents = documents.filter(**{f'{document.party_field}__in': list(party_ids)})
+        # updated_at lets delta-sync clients pick the new name up
+        refreshed += documents.update(updated_at=now, **values)
+    return refreshed
+
+
+def _refresh_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields and not {'name', 'tax_id'}.intersection(update_fields):
+        return
+    refresh_party_snapshots(sender, [instance.pk])
+
+
+def connect_snapshots():
+    for label in SNAPSHOT_MODELS:
+        post_save.connect(_refresh_on_save, sender=apps.get_model(label), dispatch_uid=f'snapshot_{label}')
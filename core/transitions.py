@@ -0,0 +1,73 @@
+# ============================================================================
+# core/transitions.py - Transitions de statut planifiées (retard, expiration)
+# ============================================================================
+"""
+Date-driven status transitions applied in bulk.
+
+Each rule moves every matching row with a single UPDATE, which also stamps
+``updated_at`` so the change reaches delta-sync clients. Within the same
+transaction the rows carrying that stamp are read back and recorded as
+:class:`~core.models.StatusChange` audit rows.
+"""
+from itertools import islice
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import StatusChange
+
+AUDIT_BATCH_SIZE = 1000
+
+
+def transition_rules(today):
+    """(model label, from status, to status, condition) for every scheduled transition"""
+    return [
+        ('invoices.Invoice', 'sent', 'overdue', Q(due_date__lt=today)),
+        ('invoices.Invoice', 'partial', 'overdue', Q(due_date__lt=today)),
+        # Due date moved back after the invoice went overdue
+        ('invoices.Invoice', 'overdue', 'partial', Q(due_date__gte=today, paid_amount__gt=0)),
+        ('invoices.Invoice', 'overdue', 'sent', Q(due_date__gte=today, paid_amount=0)),
+        ('proforma.ProformaInvoice', 'sent', 'expired', Q(expiry_date__lt=today)),
+    ]
+
+
+def apply_transition(label, from_status, to_status, condition, dry_run=False):
+    """Move matching rows to ``to_status`` and audit them; return the row count"""
+    model = apps.get_model(label)
+    queryset = model._default_manager.filter(condition, status=from_status)
+    if dry_run:
+        return queryset.count()
+
+    now = timezone.now()
+    with transaction.atomic():
+        count = queryset.update(status=to_status, updated_at=now)
+        if not count:
+            return 0
+
+        changed = (
+            model._default_manager.filter(status=to_status, updated_at=now)
+            .values_list('pk', flat=True)
+            .iterator(chunk_size=AUDIT_BATCH_SIZE)
+        )
+        while batch := list(islice(changed, AUDIT_BATCH_SIZE)):
+            StatusChange.objects.bulk_create([
+                StatusChange(
+                    model=model._meta.label_lower,
+                    object_id=str(pk),
+                    from_status=from_status,
+                    to_status=to_status,
+                    changed_at=now,
+                )
+                for pk in batch
+            ])
+    return count
+
+
+def apply_transitions(today, dry_run=False):
+    """Apply every scheduled transition in order and return the per-rule counts"""
+    return [
+        (label, from_status, to_status, apply_transition(label, from_status, to_status, condition, dry_run))
+        for label, from_status, to_status, condition in transition_rules(today)
+    ]
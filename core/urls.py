@@ -14,7 +14,10 @@ app_name = 'core'
 urlpatterns = [
     # Dashboard & Reports
     path('', views.DashboardView.as_view(), name='dashboard'),
+    path('dashboard/async/', views.DashboardAsyncView.as_view(), name='dashboard_async'),
     path('reports/', views.ReportsView.as_view(), name='reports'),
+    path('reports/aging/', views.AgingReportView.as_view(), name='aging_report'),
+    path('search/', views.GlobalSearchView.as_view(), name='search'),
 
     # ===== INVOICES =====
     path('invoices/', InvoiceListView.as_view(), name='invoice_list'),
@@ -27,6 +27,23 @@ def generate_next_number(model, field_name, prefix=''):
     return str(next_num)
 
 
+def next_numbers(prefix, count, *sources):
+    """
+    ``count`` consecutive numbers like ``PREFIX-00042`` following the last one
+    used, for documents inserted with bulk_create (which bypasses the
+    numbering in ``save()``). ``sources`` are ``(queryset, field_name)``
+    pairs, e.g. the live and archived invoices.
+    """
+    last_num = 0
+    for queryset, field_name in sources:
+        last = queryset.order_by('-created_at').values_list(field_name, flat=True).first()
+        try:
+            last_num = max(last_num, int(last.split('-')[-1]) if last else 0)
+        except ValueError:
+            last_num = max(last_num, queryset.count())
+    return [f"{prefix}-{last_num + offset:05d}" for offset in range(1, count + 1)]
+
+
 def format_currency(value, currency='€'):
     """Format decimal value as currency"""
     if isinstance(value, Decimal):
@@ -1,14 +1,23 @@
 # ============================================================================
 # core/views.py - Vues centrales (Dashboard, Reports)
 # ============================================================================
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render, resolve_url
+from asgiref.sync import sync_to_async
 from django.db.models import Sum, Count, F, Q
 from django.utils import timezone
 from datetime import timedelta
 
+from .metrics import (
+    run_serially, run_concurrently, dashboard_queries, receivables_aging, parse_period_days
+)
+from .global_search import global_search
+from .routers import ReportingReadsMixin
 
-class DashboardView(LoginRequiredMixin, TemplateView):
+
+class DashboardView(LoginRequiredMixin, ReportingReadsMixin, TemplateView):
     """Main dashboard with KPIs and recent activity"""
     template_name = 'dashboard.html'
     login_url = 'accounts:login'
@@ -17,59 +26,36 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         today = timezone.now().date()
 
-        # Import models here to avoid circular imports
-        from invoices.models import Invoice
-        from clients.models import Client
-        from suppliers.models import Supplier
-        from products.models import Product
-        from payments.models import Payment
-        from orders.models import CustomerOrder, SupplierOrder
-
-        # Invoice metrics
-        context['total_invoiced'] = Invoice.objects.filter(
-            status__in=['sent', 'paid']
-        ).aggregate(total=Sum('total'))['total'] or 0
+        context.update(run_serially(dashboard_queries(today)))
 
-        context['total_paid'] = Invoice.objects.filter(
-            status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
+        # User profile
+        if hasattr(self.request.user, 'userprofile'):
+            context['user_profile'] = self.request.user.userprofile
 
-        context['pending_count'] = Invoice.objects.filter(status='sent').count()
+        return context
 
-        context['overdue_count'] = Invoice.objects.filter(
-            status__in=['sent', 'partial'],
-            due_date__lt=today
-        ).count()
 
-        # Client & Supplier metrics
-        context['total_clients'] = Client.objects.filter(is_active=True).count()
-        context['total_suppliers'] = Supplier.objects.filter(is_active=True).count()
+class DashboardAsyncView(ReportingReadsMixin, View):
+    """Dashboard served under ASGI, with the KPI queries run concurrently"""
+    template_name = 'dashboard.html'
+    login_url = 'accounts:login'
 
-        # Product metrics
-        context['total_products'] = Product.objects.count()
-        context['low_stock_products'] = Product.objects.filter(
-            quantity_in_stock__lte=F('reorder_level')
-        ).count()
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), resolve_url(self.login_url))
 
-        # Orders metrics
-        context['pending_orders'] = CustomerOrder.objects.filter(status='pending').count()
-        context['pending_supplier_orders'] = SupplierOrder.objects.filter(status='pending').count()
+        today = timezone.now().date()
+        context = {'view': self}
+        context.update(await run_concurrently(dashboard_queries(today)))
 
-        # Recent data
-        context['recent_invoices'] = Invoice.objects.select_related('client').order_by('-created_at')[:5]
-        context['recent_payments'] = Payment.objects.select_related('invoice').order_by('-created_at')[:5]
-        context['low_stock_items'] = Product.objects.filter(
-            quantity_in_stock__lte=F('reorder_level')
-        )[:5]
+        if await sync_to_async(hasattr)(user, 'userprofile'):
+            context['user_profile'] = user.userprofile
 
-        # User profile
-        if hasattr(self.request.user, 'userprofile'):
-            context['user_profile'] = self.request.user.userprofile
-
-        return context
+        return await sync_to_async(render)(request, self.template_name, context)
 
 
-class ReportsView(LoginRequiredMixin, TemplateView):
+class ReportsView(LoginRequiredMixin, ReportingReadsMixin, TemplateView):
     """Reports and statistics page"""
     template_name = 'reports.html'
     login_url = 'accounts:login'
@@ -97,3 +83,29 @@ class ReportsView(LoginRequiredMixin, TemplateView):
         ).count()
 
         return context
+
+
+class AgingReportView(LoginRequiredMixin, ReportingReadsMixin, TemplateView):
+    """Receivables aging by client with days sales outstanding"""
+    template_name = 'reports_aging.html'
+    login_url = 'accounts:login'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        today = timezone.now().date()
+        period_days = parse_period_days(self.request.GET.get('days'))
+        context['report'] = receivables_aging(today, period_days)
+        return context
+
+
+class GlobalSearchView(LoginRequiredMixin, TemplateView):
+    """Results of the header search box, grouped by entity type"""
+    template_name = 'search.html'
+    login_url = 'accounts:login'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['exact'], context['groups'] = global_search(query, limit=10)
+        return context
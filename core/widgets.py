@@ -0,0 +1,43 @@
+# ============================================================================
+# core/widgets.py - Widgets de formulaire partagés
+# ============================================================================
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Select that only renders the current value and loads the other
+    options on demand from the autocomplete endpoint (see base.html).
+    """
+
+    def __init__(self, source, attrs=None):
+        self.source = source
+        super().__init__(attrs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse('autocomplete', args=[self.source])
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if v not in ('', None)]
+        all_choices = self.choices
+        choices = [('', '---------')]
+        queryset = getattr(all_choices, 'queryset', None)
+        if selected and queryset is not None:
+            # A re-rendered invalid form can carry any submitted string
+            valid = []
+            for pk in selected:
+                try:
+                    valid.append(queryset.model._meta.pk.to_python(pk))
+                except ValidationError:
+                    continue
+            if valid:
+                choices += [(obj.pk, str(obj)) for obj in queryset.filter(pk__in=valid)]
+        self.choices = choices
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
@@ -15,6 +15,6 @@ class DeliveryItemInline(admin.TabularInline):
 class DeliveryNoteAdmin(admin.ModelAdmin):
     list_display = ('delivery_number', 'client', 'delivery_date', 'actual_delivery')
     list_filter = ('delivery_date', 'created_at')
-    search_fields = ('delivery_number', 'client__name', 'description')
+    search_fields = ('delivery_number', 'client_name', 'description')
     readonly_fields = ('id', 'created_at', 'updated_at')
     inlines = [DeliveryItemInline]
@@ -2,6 +2,7 @@
 # delivery/forms.py
 # ============================================================================
 from django import forms
+from core.widgets import AutocompleteSelect
 from .models import DeliveryNote, DeliveryItem
 
 
@@ -13,7 +14,7 @@ class DeliveryNoteForm(forms.ModelForm):
         fields = ['client', 'invoice', 'delivery_date', 'expected_delivery',
                   'actual_delivery', 'description', 'notes']
         widgets = {
-            'client': forms.Select(attrs={
+            'client': AutocompleteSelect('clients', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'invoice': forms.Select(attrs={
@@ -49,7 +50,7 @@ class DeliveryItemForm(forms.ModelForm):
         model = DeliveryItem
         fields = ['product', 'description', 'quantity_ordered', 'quantity_delivered', 'unit_price']
         widgets = {
-            'product': forms.Select(attrs={
+            'product': AutocompleteSelect('products', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'description': forms.TextInput(attrs={
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 02:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_clients_cli_updated_bf75f6_idx'),
+        ('delivery', '0001_initial'),
+        ('invoices', '0002_invoiceitem_updated_at_and_more'),
+        ('products', '0002_product_products_pr_updated_e6e93b_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliveryitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='deliveryitem',
+            index=models.Index(fields=['updated_at', 'id'], name='delivery_de_updated_df155d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliverynote',
+            index=models.Index(fields=['updated_at', 'id'], name='delivery_de_updated_a29861_idx'),
+        ),
+    ]
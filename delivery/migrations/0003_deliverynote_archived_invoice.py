@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-19 02:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0002_deliveryitem_updated_at_and_more'),
+        ('invoices', '0005_invoice_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverynote',
+            name='archived_invoice',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='delivery_notes', to='invoices.archivedinvoice'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 03:01
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0003_deliverynote_archived_invoice'),
+    ]
+
+    # The default is applied in Python only: skip the table rebuild SQLite
+    # would otherwise do for each AlterField
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='deliverynote',
+                    name='id',
+                    field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
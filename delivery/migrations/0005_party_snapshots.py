@@ -0,0 +1,50 @@
+# Generated by Django 6.0 on 2026-10-19 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+SNAPSHOTS = [
+    ('delivery', 'DeliveryNote', 'clients', 'Client', 'client', {'client_name': 'name', 'client_tax_id': 'tax_id'}),
+]
+
+
+def fill_snapshots(apps, schema_editor):
+    # One correlated UPDATE per table
+    for app, model, party_app, party_model, party_field, fields in SNAPSHOTS:
+        Document = apps.get_model(app, model)
+        Party = apps.get_model(party_app, party_model)
+        party = Party.objects.filter(pk=OuterRef(party_field))
+        Document.objects.update(**{
+            column: Subquery(party.values(attribute)[:1])
+            for column, attribute in fields.items()
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0005_uuid7_primary_key'),
+        ('delivery', '0004_uuid7_primary_key'),
+        ('invoices', '0006_uuid7_primary_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverynote',
+            name='client_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='deliverynote',
+            name='client_tax_id',
+            field=models.CharField(blank=True, default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(fill_snapshots, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='deliverynote',
+            index=models.Index(fields=['client_name'], name='delivery_de_client__267dea_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-19 03:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0005_party_snapshots'),
+        ('orders', '0005_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverynote',
+            name='customer_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='delivery_notes', to='orders.customerorder'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0005_uuid7_primary_key'),
+        ('delivery', '0006_deliverynote_customer_order'),
+        ('invoices', '0009_billing_run'),
+        ('orders', '0005_stock_reservations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deliverynote',
+            index=models.Index(condition=models.Q(('archived_invoice__isnull', True), ('invoice__isnull', True)), fields=['delivery_date', 'client'], name='delivery_uninvoiced_idx'),
+        ),
+    ]
@@ -2,16 +2,28 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-import uuid
+from core.ids import uuid7
+from core.snapshots import PartySnapshotMixin, PartySnapshotQuerySet
+from products.models import StockMovement
+from products.stock import StockLineMixin, StockLineQuerySet
 
 
-class DeliveryNote(models.Model):
+class DeliveryNote(PartySnapshotMixin, models.Model):
     """Delivery Note model"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     delivery_number = models.CharField(max_length=100, unique=True, db_index=True)
     client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='delivery_notes')
+    # Snapshot of the client, see core.snapshots
+    client_name = models.CharField(max_length=255, blank=True, default='', editable=False)
+    client_tax_id = models.CharField(max_length=50, blank=True, default='', editable=False)
     invoice = models.ForeignKey('invoices.Invoice', on_delete=models.SET_NULL, null=True, blank=True, related_name='delivery_notes')
+    # Delivering the lines consumes the order's stock reservations
+    customer_order = models.ForeignKey('orders.CustomerOrder', on_delete=models.SET_NULL, null=True, blank=True,
+                                       related_name='delivery_notes')
+    # Set instead of ``invoice`` once the invoice has been archived
+    archived_invoice = models.ForeignKey('invoices.ArchivedInvoice', on_delete=models.SET_NULL, null=True,
+                                         blank=True, editable=False, related_name='delivery_notes')
 
     delivery_date = models.DateField(db_index=True)
     expected_delivery = models.DateField(null=True, blank=True)
@@ -24,10 +36,21 @@ class DeliveryNote(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PartySnapshotQuerySet.as_manager()
+
     class Meta:
         ordering = ['-delivery_date']
         verbose_name = _('Delivery Note')
         verbose_name_plural = _('Delivery Notes')
+        indexes = [
+            models.Index(fields=['client_name']),
+            models.Index(fields=['updated_at', 'id']),
+            # Partial index: notes still to be billed, see invoices.billing
+            models.Index(
+                fields=['delivery_date', 'client'], name='delivery_uninvoiced_idx',
+                condition=models.Q(invoice__isnull=True, archived_invoice__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Delivery {self.delivery_number}"
@@ -35,6 +58,14 @@ class DeliveryNote(models.Model):
     def get_absolute_url(self):
         return reverse('delivery:detail', kwargs={'pk': self.pk})
 
+    # No status: the snapshot follows the client until the goods are delivered
+    @classmethod
+    def snapshot_open_q(cls):
+        return models.Q(actual_delivery__isnull=True)
+
+    def snapshot_is_open(self):
+        return self.actual_delivery is None
+
     def save(self, *args, **kwargs):
         if not self.delivery_number:
             last_delivery = DeliveryNote.objects.order_by('-created_at').first()
@@ -49,8 +80,11 @@ class DeliveryNote(models.Model):
         super().save(*args, **kwargs)
 
 
-class DeliveryItem(models.Model):
+class DeliveryItem(StockLineMixin, models.Model):
     """Delivery Note line items"""
+    stock_quantity_field = 'quantity_delivered'
+    stock_direction = -1
+    stock_kind = StockMovement.DELIVERY
 
     delivery_note = models.ForeignKey(DeliveryNote, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey('products.Product', on_delete=models.SET_NULL, null=True, blank=True)
@@ -58,10 +92,29 @@ class DeliveryItem(models.Model):
     quantity_ordered = models.DecimalField(max_digits=10, decimal_places=2)
     quantity_delivered = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StockLineQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Delivery Item')
         verbose_name_plural = _('Delivery Items')
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.description} - {self.delivery_note.delivery_number}"
+
+    def stock_reference(self):
+        return self.delivery_note.delivery_number
+
+    def stock_keeps_reserved(self):
+        # Without an order there is no reservation to consume: leave the orders' units in stock
+        return not self.delivery_note.customer_order_id
+
+    def stock_moved(self, product_id, quantity):
+        order_id = self.delivery_note.customer_order_id
+        if order_id and quantity < 0:
+            from orders.reservations import consume_reservation
+            consume_reservation(order_id, product_id, -quantity, using=self._state.db or 'default')
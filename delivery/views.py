@@ -3,6 +3,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q
 from django.contrib import messages
+from core.search import search_filter
 from .models import DeliveryNote, DeliveryItem
 from .forms import DeliveryNoteForm, DeliveryItemForm
 
@@ -20,10 +21,7 @@ class DeliveryNoteListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(delivery_number__icontains=search) |
-                Q(client__name__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['delivery_number', 'client_name'])
 
         return queryset
 
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -64,6 +65,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.DatabaseRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -101,6 +103,76 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile, enabled with DJANGO_DB_PROFILE=production.
+# WAL lets readers run while a writer commits, busy_timeout makes writers wait
+# for the lock instead of failing with "database is locked", and IMMEDIATE
+# transactions take the write lock at BEGIN, so a transaction that reads then
+# writes cannot fail on the lock upgrade. Compare with 'manage.py bench_sqlite'.
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'development')
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # in KiB
+    'busy_timeout': 5000,  # in ms
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_PRODUCTION_OPTIONS = {
+    'init_command': ';'.join(f'PRAGMA {name} = {value}' for name, value in SQLITE_PRODUCTION_PRAGMAS.items()),
+    'transaction_mode': 'IMMEDIATE',
+}
+
+if DB_PROFILE == 'production':
+    DATABASES['default'].update({
+        'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+        # Persistent connections, checked before reuse
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# Reporting database (see core/routers.py): reports, list exports and
+# dashboards read from this alias when it is defined in DATABASES, except in
+# a request that has already written. DJANGO_REPLICA_DB points it at a second
+# SQLite file to try it locally; the copy must be kept in sync externally.
+REPORTING_DATABASE = 'replica'
+
+if os.environ.get('DJANGO_REPLICA_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DJANGO_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReportingRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Use a shared backend (Redis, Memcached) when running several processes so
+# that token revocations and user changes invalidate every worker's cache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+# Authentication
+# Session and token lookups resolve the user (and profile) through the cache.
+
+AUTHENTICATION_BACKENDS = [
+    'accounts.authentication.CachedModelBackend',
+]
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Seconds a resolved token or user stays cached (upper bound on staleness
+# when a change is made from another process with a per-process cache)
+AUTH_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -155,7 +227,7 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -166,11 +238,22 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.AcceptHeaderVersioning',
 }
 
+# Batch endpoint (/api/v1/batch/)
+API_BATCH_MAX_REQUESTS = 50
+API_BATCH_WORKERS = 4
+
+# Bulk conversion actions (/api/v1/<documents>/convert/)
+API_CONVERT_MAX_DOCUMENTS = 1000
+
+# Billing runs (invoices/billing.py): worker processes billing partitions of
+# clients in parallel
+BILLING_WORKERS = 4
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
@@ -190,3 +273,15 @@ LOGOUT_REDIRECT_URL = 'core:login'
 
 # Default Primary Key Type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Dashboard
+# Size of the thread pool used by the async dashboard views to run
+# independent aggregate queries concurrently (see core/metrics.py).
+DASHBOARD_QUERY_WORKERS = 8
+
+# Autocomplete
+# Seconds before a process rebuilds its in-memory autocomplete index even
+# without a change notification (writes that bypass signals, or a
+# per-process cache that cannot see other processes' notifications).
+AUTOCOMPLETE_MAX_AGE = 300
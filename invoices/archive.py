@@ -0,0 +1,158 @@
+# ============================================================================
+# invoices/archive.py - Archivage des factures clôturées anciennes
+# ============================================================================
+"""
+Moves old paid and cancelled invoices out of the live tables.
+
+An invoice is archived with its lines and payments: each chunk copies the
+rows into :class:`ArchivedInvoice`, :class:`ArchivedInvoiceItem` and
+:class:`~payments.models.ArchivedPayment`, adds them to the
+:class:`InvoiceArchiveTotal` rollup, points delivery notes at the archived
+copy, then deletes the live rows, all in one transaction. The deletions
+leave tombstones, so delta-sync clients drop the invoices like any other
+removal.
+
+Only invoices untouched since the cutoff are picked: a payment saves its
+invoice, so the archived payments all predate the cutoff too and the
+payment and monthly figures need no archive contribution. Totals over
+every invoice use :func:`archived_totals`.
+"""
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.http import Http404
+from django.utils import timezone
+
+from .models import ArchivedInvoice, ArchivedInvoiceItem, Invoice, InvoiceArchiveTotal, InvoiceItem
+
+CHUNK_SIZE = 500
+
+
+def archive_cutoff(today, years):
+    """Invoices dated and last updated before this date are archivable"""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # 29 February
+        return today.replace(year=today.year - years, day=28)
+
+
+def archivable_invoices(cutoff):
+    """Closed invoices dated and last modified before ``cutoff``"""
+    cutoff_at = timezone.make_aware(datetime.combine(cutoff, time.min))
+    return Invoice.objects.filter(
+        status__in=Invoice.CLOSED_STATUSES,
+        invoice_date__lt=cutoff,
+        updated_at__lt=cutoff_at,
+    ).order_by()
+
+
+def _copy(instance, model, **values):
+    """Unsaved ``model`` row with the concrete field values of ``instance``"""
+    for field in instance._meta.concrete_fields:
+        values.setdefault(field.attname, getattr(instance, field.attname))
+    return model(**values)
+
+
+def _add_to_rollup(invoices):
+    rollup = defaultdict(lambda: [0, Decimal('0'), Decimal('0')])
+    for invoice in invoices:
+        row = rollup[invoice.client_id, invoice.status]
+        row[0] += 1
+        row[1] += invoice.total
+        row[2] += invoice.paid_amount
+
+    existing = {
+        (row.client_id, row.status): row
+        for row in InvoiceArchiveTotal.objects.filter(
+            client_id__in={client_id for client_id, _ in rollup}
+        )
+    }
+    changed, created = [], []
+    for key, (count, total, paid_amount) in rollup.items():
+        row = existing.get(key)
+        if row is None:
+            created.append(InvoiceArchiveTotal(
+                client_id=key[0], status=key[1],
+                invoice_count=count, total=total, paid_amount=paid_amount,
+            ))
+            continue
+        row.invoice_count += count
+        row.total += total
+        row.paid_amount += paid_amount
+        changed.append(row)
+    InvoiceArchiveTotal.objects.bulk_update(changed, ['invoice_count', 'total', 'paid_amount'])
+    InvoiceArchiveTotal.objects.bulk_create(created)
+
+
+def archive_chunk(invoice_ids, cutoff):
+    """Archive the given invoices that still qualify; return how many were moved"""
+    from delivery.models import DeliveryNote
+    from payments.models import ArchivedPayment, Payment
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Re-check under the transaction: an invoice may have changed since it was listed
+        invoices = list(archivable_invoices(cutoff).filter(pk__in=invoice_ids))
+        if not invoices:
+            return 0
+        ids = [invoice.pk for invoice in invoices]
+
+        ArchivedInvoice.objects.bulk_create(
+            [_copy(invoice, ArchivedInvoice, archived_at=now) for invoice in invoices]
+        )
+        ArchivedInvoiceItem.objects.bulk_create(
+            [_copy(item, ArchivedInvoiceItem) for item in InvoiceItem.objects.filter(invoice_id__in=ids)]
+        )
+        ArchivedPayment.objects.bulk_create(
+            [_copy(payment, ArchivedPayment) for payment in Payment.objects.filter(invoice_id__in=ids)]
+        )
+        _add_to_rollup(invoices)
+
+        DeliveryNote.objects.filter(invoice_id__in=ids).update(
+            archived_invoice=F('invoice'), invoice=None, updated_at=now
+        )
+        # Cascades to the live items and payments
+        Invoice.objects.filter(pk__in=ids).delete()
+    return len(invoices)
+
+
+def archive_invoices(cutoff, chunk_size=CHUNK_SIZE):
+    """Archive every archivable invoice, one transaction per chunk; yield running totals"""
+    archived = 0
+    while True:
+        ids = list(archivable_invoices(cutoff).values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return
+        moved = archive_chunk(ids, cutoff)
+        if not moved:
+            return
+        archived += moved
+        yield archived
+
+
+def archived_totals(client=None, statuses=None):
+    """``{'invoice_count', 'total', 'paid_amount'}`` of the archived invoices"""
+    rows = InvoiceArchiveTotal.objects.all()
+    if client is not None:
+        rows = rows.filter(client=client)
+    if statuses is not None:
+        rows = rows.filter(status__in=statuses)
+    totals = rows.aggregate(
+        invoice_count=Sum('invoice_count'), total=Sum('total'), paid_amount=Sum('paid_amount')
+    )
+    return {
+        'invoice_count': totals['invoice_count'] or 0,
+        'total': totals['total'] or Decimal('0'),
+        'paid_amount': totals['paid_amount'] or Decimal('0'),
+    }
+
+
+def get_invoice_or_404(pk):
+    """The live invoice ``pk``, or its archived copy"""
+    invoice = Invoice.objects.filter(pk=pk).first() or ArchivedInvoice.objects.filter(pk=pk).first()
+    if invoice is None:
+        raise Http404('No invoice matches the given query.')
+    return invoice
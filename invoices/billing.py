@@ -0,0 +1,197 @@
+# ============================================================================
+# invoices/billing.py - Facturation périodique des bons de livraison
+# ============================================================================
+"""
+Periodic billing of delivery notes.
+
+A billing run invoices, for a period, every client with delivery notes
+not yet invoiced: one draft invoice per client holding the delivered
+lines of all those notes, which then point at the invoice.
+
+Clients are split into partitions of ``partition_size`` and each
+partition is billed in its own transaction, by a pool of worker
+processes when ``workers`` is above 1. The lines are read and the
+invoices built outside the transaction; inside it, the invoice numbers
+are allocated, invoices and lines are bulk-inserted and the notes are
+linked to their client's invoice with one UPDATE conditioned on the
+notes still being uninvoiced. If another run got to some of them first,
+the partition is rolled back and rebuilt from what is left.
+
+Runs are idempotent: billed notes are never picked again, so running a
+period again bills only what the previous runs did not get to (a failed
+partition, or notes delivered since). Progress is kept on the period's
+:class:`~invoices.models.BillingRun`, updated in each partition's
+transaction.
+
+Worker processes are only used where the partitions' transactions cannot
+fail on the write lock: on SQLite that takes the production profile's
+IMMEDIATE transactions, which serialize the partitions' writes (numbers
+are then safe to allocate in parallel, and only the building of the
+invoices runs concurrently). With deferred transactions the partitions
+are billed in-process, one after the other.
+"""
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Case, Exists, F, OuterRef, Value, When
+from django.utils import timezone
+
+from core.conversions import (
+    PAYMENT_DAYS, delivered_items, delivery_invoice_items, next_invoice_numbers, order_tax_rates, set_totals
+)
+from delivery.models import DeliveryItem, DeliveryNote
+
+from .models import BillingRun, Invoice, InvoiceItem
+
+PARTITION_SIZE = 200
+ATTEMPTS = 3
+
+
+class BillingError(Exception):
+    """A partition could not be billed"""
+
+
+class StalePartition(Exception):
+    """Some notes of the partition were invoiced by someone else meanwhile"""
+
+
+def billable_notes(start, end):
+    """Uninvoiced delivery notes of the period with at least one delivered line"""
+    return DeliveryNote.objects.filter(
+        delivery_date__gte=start, delivery_date__lte=end,
+        invoice__isnull=True, archived_invoice__isnull=True,
+    ).filter(Exists(DeliveryItem.objects.filter(delivery_note=OuterRef('pk'), quantity_delivered__gt=0)))
+
+
+def clients_to_bill(start, end):
+    return list(billable_notes(start, end).order_by('client_id').values_list('client_id', flat=True).distinct())
+
+
+def _build(run, client_ids):
+    """``[(invoice, notes, lines)]`` for the clients, unsaved"""
+    notes = list(
+        billable_notes(run.period_start, run.period_end).filter(client_id__in=client_ids)
+        .order_by('delivery_date', 'created_at').prefetch_related(delivered_items())
+    )
+    tax_rates = order_tax_rates(notes)
+    by_client = defaultdict(list)
+    for note in notes:
+        by_client[note.client_id].append(note)
+
+    built = []
+    for client_id, client_notes in by_client.items():
+        invoice = Invoice(
+            client_id=client_id, invoice_date=run.invoice_date,
+            due_date=run.invoice_date + timedelta(days=PAYMENT_DAYS), status='draft',
+            description=f"Deliveries from {run.period_start} to {run.period_end}",
+            notes='Delivery notes: ' + ', '.join(note.delivery_number for note in client_notes),
+            created_by_id=run.created_by_id,
+        )
+        lines = delivery_invoice_items(invoice, client_notes, tax_rates)
+        set_totals(invoice, lines)
+        built.append((invoice, client_notes, lines))
+    return built
+
+
+def _save(run, built):
+    now = timezone.now()
+    with transaction.atomic():
+        # Read under the transaction, after any partition that committed before it
+        for number, (invoice, _, _) in zip(next_invoice_numbers(len(built)), built):
+            invoice.invoice_number = number
+        Invoice.objects.bulk_create([invoice for invoice, _, _ in built], batch_size=500)
+        lines = [line for _, _, invoice_lines in built for line in invoice_lines]
+        InvoiceItem.objects.bulk_create(lines, batch_size=1000)
+        note_ids = [note.pk for _, notes, _ in built for note in notes]
+        linked = DeliveryNote.objects.filter(
+            pk__in=note_ids, invoice__isnull=True, archived_invoice__isnull=True,
+        ).update(
+            invoice=Case(*[When(client_id=invoice.client_id, then=Value(invoice.pk)) for invoice, _, _ in built]),
+            updated_at=now,
+        )
+        if linked != len(note_ids):
+            raise StalePartition
+        BillingRun.objects.filter(pk=run.pk).update(
+            invoice_count=F('invoice_count') + len(built), line_count=F('line_count') + len(lines),
+            updated_at=now,
+        )
+    return len(built), len(lines)
+
+
+def bill_partition(run_id, client_ids):
+    """Invoice the clients' uninvoiced notes in one transaction; returns ``(invoices, lines)``"""
+    run = BillingRun.objects.get(pk=run_id)
+    for _ in range(ATTEMPTS):
+        built = _build(run, client_ids)
+        if not built:
+            return 0, 0
+        try:
+            return _save(run, built)
+        except (StalePartition, IntegrityError):
+            continue
+    raise BillingError(f"{len(client_ids)} clients could not be billed after {ATTEMPTS} attempts.")
+
+
+def start_billing_run(start, end, invoice_date=None, user=None):
+    """The period's run, created or reopened to resume it"""
+    run, created = BillingRun.objects.get_or_create(
+        period_start=start, period_end=end,
+        defaults={'invoice_date': invoice_date or end, 'created_by': user},
+    )
+    if not created:
+        run.status = 'running'
+        run.error = ''
+        run.finished_at = None
+        run.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+    return run
+
+
+def _can_fork(alias='default'):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return False
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return True
+    # An in-memory database is not shared with child processes, and deferred
+    # transactions fail with "database is locked" when upgrading to write
+    return (
+        not connection.is_in_memory_db()
+        and connection.settings_dict.get('OPTIONS', {}).get('transaction_mode') == 'IMMEDIATE'
+    )
+
+
+def _bill(run, partitions, workers):
+    if workers <= 1 or len(partitions) <= 1 or not _can_fork():
+        for client_ids in partitions:
+            yield bill_partition(run.pk, client_ids)
+        return
+
+    # Children open their own connections instead of sharing the parent's
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(bill_partition, run.pk, client_ids) for client_ids in partitions]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_billing(run, workers=None, partition_size=PARTITION_SIZE):
+    """Bill the run's period, one transaction per partition of clients; yield running invoice counts"""
+    workers = workers or settings.BILLING_WORKERS
+    client_ids = clients_to_bill(run.period_start, run.period_end)
+    partitions = [client_ids[i:i + partition_size] for i in range(0, len(client_ids), partition_size)]
+
+    invoiced = 0
+    try:
+        for invoices, _ in _bill(run, partitions, workers):
+            invoiced += invoices
+            yield invoiced
+    except Exception as exc:
+        BillingRun.objects.filter(pk=run.pk).update(status='failed', error=str(exc), updated_at=timezone.now())
+        raise
+    now = timezone.now()
+    BillingRun.objects.filter(pk=run.pk).update(status='completed', finished_at=now, updated_at=now)
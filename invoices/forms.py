@@ -1,4 +1,5 @@
 from django import forms
+from core.widgets import AutocompleteSelect
 from .models import Invoice, InvoiceItem
 
 
@@ -9,7 +10,7 @@ class InvoiceForm(forms.ModelForm):
         model = Invoice
         fields = ['client', 'invoice_date', 'due_date', 'status', 'description', 'notes']
         widgets = {
-            'client': forms.Select(attrs={
+            'client': AutocompleteSelect('clients', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'invoice_date': forms.DateInput(attrs={
@@ -41,7 +42,7 @@ class InvoiceItemForm(forms.ModelForm):
         model = InvoiceItem
         fields = ['product', 'description', 'quantity', 'unit_price', 'tax_rate']
         widgets = {
-            'product': forms.Select(attrs={
+            'product': AutocompleteSelect('products', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500',
                 'onchange': 'updateItemDetails()'
             }),
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-19 02:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_clients_cli_updated_bf75f6_idx'),
+        ('invoices', '0002_invoiceitem_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_date'], name='invoices_in_status_041490_idx'),
+        ),
+    ]
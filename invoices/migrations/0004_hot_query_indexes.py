@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0004_hot_query_indexes'),
+        ('invoices', '0003_invoice_status_due_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoices_in_client__c4d581_idx',
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['client', '-created_at'], name='invoices_in_client__5bc4ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['-created_at'], name='invoices_in_created_67cbdc_idx'),
+        ),
+    ]
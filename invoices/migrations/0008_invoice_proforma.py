@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 03:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0007_party_snapshots'),
+        ('proforma', '0004_party_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedinvoice',
+            name='proforma',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_invoices', to='proforma.proformainvoice'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='proforma',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='proforma.proformainvoice'),
+        ),
+    ]
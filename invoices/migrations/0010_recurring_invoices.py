@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-19 03:46
+
+import core.ids
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0005_uuid7_primary_key'),
+        ('invoices', '0009_billing_run'),
+        ('products', '0009_stock_reservations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringInvoice',
+            fields=[
+                ('id', models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('frequency', models.CharField(choices=[('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], default='monthly', max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('next_run', models.DateField(blank=True)),
+                ('last_run', models.DateField(blank=True, editable=False, null=True)),
+                ('payment_days', models.PositiveSmallIntegerField(default=30)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('notes', models.TextField(blank=True)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='recurring_invoices', to='clients.client')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurring_invoices_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Recurring Invoice',
+                'verbose_name_plural': 'Recurring Invoices',
+                'ordering': ['next_run'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedinvoice',
+            name='recurring_invoice',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_invoices', to='invoices.recurringinvoice'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='recurring_invoice',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='invoices.recurringinvoice'),
+        ),
+        migrations.CreateModel(
+            name='RecurringInvoiceItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=255)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))])),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0'))])),
+                ('tax_rate', models.DecimalField(decimal_places=2, default=20, max_digits=5, validators=[django.core.validators.MinValueValidator(Decimal('0'))])),
+                ('subtotal', models.DecimalField(decimal_places=2, editable=False, max_digits=12)),
+                ('tax', models.DecimalField(decimal_places=2, editable=False, max_digits=12)),
+                ('total', models.DecimalField(decimal_places=2, editable=False, max_digits=12)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.product')),
+                ('recurring_invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='invoices.recurringinvoice')),
+            ],
+            options={
+                'verbose_name': 'Recurring Invoice Item',
+                'verbose_name_plural': 'Recurring Invoice Items',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recurringinvoice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['next_run'], name='recurring_invoice_due_idx'),
+        ),
+    ]
@@ -4,10 +4,11 @@ from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-import uuid
+from core.ids import uuid7
+from core.snapshots import PartySnapshotMixin, PartySnapshotQuerySet
 
 
-class Invoice(models.Model):
+class Invoice(PartySnapshotMixin, models.Model):
     """Standard invoice"""
 
     STATUS_CHOICES = [
@@ -19,9 +20,25 @@ class Invoice(models.Model):
         ('cancelled', _('Cancelled')),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Issued and not fully paid
+    OPEN_STATUSES = ('sent', 'partial', 'overdue')
+    # Settled for good; old ones are moved to ArchivedInvoice
+    CLOSED_STATUSES = ('paid', 'cancelled')
+
+    is_archived = False
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     invoice_number = models.CharField(max_length=100, unique=True, db_index=True)
     client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='invoices')
+    # Snapshot of the client, see core.snapshots
+    client_name = models.CharField(max_length=255, blank=True, default='', editable=False)
+    client_tax_id = models.CharField(max_length=50, blank=True, default='', editable=False)
+    # Proforma the invoice was converted from, see core.conversions
+    proforma = models.ForeignKey('proforma.ProformaInvoice', on_delete=models.SET_NULL, null=True, blank=True,
+                                 editable=False, related_name='invoices')
+    # Template the invoice was generated from, see invoices.recurring
+    recurring_invoice = models.ForeignKey('RecurringInvoice', on_delete=models.SET_NULL, null=True, blank=True,
+                                          editable=False, related_name='invoices')
 
     invoice_date = models.DateField(db_index=True)
     due_date = models.DateField()
@@ -44,14 +61,20 @@ class Invoice(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     sent_at = models.DateTimeField(null=True, blank=True)
 
+    objects = PartySnapshotQuerySet.as_manager()
+
     class Meta:
         ordering = ['-invoice_date']
         verbose_name = _('Invoice')
         verbose_name_plural = _('Invoices')
         indexes = [
+            models.Index(fields=['client_name']),
             models.Index(fields=['invoice_number']),
-            models.Index(fields=['client']),
+            models.Index(fields=['client', '-created_at']),
             models.Index(fields=['status']),
+            models.Index(fields=['status', 'due_date']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
@@ -71,7 +94,10 @@ class Invoice(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate invoice number if not set
         if not self.invoice_number:
-            last_invoice = Invoice.objects.order_by('-created_at').first()
+            last_invoice = (
+                Invoice.objects.order_by('-created_at').first()
+                or ArchivedInvoice.objects.order_by('-created_at').first()
+            )
             if last_invoice and last_invoice.invoice_number:
                 try:
                     last_num = int(last_invoice.invoice_number.split('-')[-1])
@@ -101,18 +127,269 @@ class InvoiceItem(models.Model):
     total = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Invoice Item')
         verbose_name_plural = _('Invoice Items')
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
-    def save(self, *args, **kwargs):
+    def calculate_amounts(self):
+        """Compute line subtotal, tax and total without saving"""
         self.subtotal = (self.quantity * self.unit_price).quantize(Decimal('0.01'))
         self.tax = (self.subtotal * self.tax_rate / 100).quantize(Decimal('0.01'))
         self.total = (self.subtotal + self.tax).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        self.calculate_amounts()
         super().save(*args, **kwargs)
         # Recalculate invoice totals
         self.invoice.calculate_totals()
 
     def __str__(self):
         return f"{self.description} (Invoice {self.invoice.invoice_number})"
+
+
+# ============================================================================
+# Archive - factures clôturées déplacées hors des tables actives
+# ============================================================================
+
+class ArchivedInvoice(models.Model):
+    """Paid or cancelled invoice moved out of the live table by archive_invoices"""
+
+    is_archived = True
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    invoice_number = models.CharField(max_length=100, unique=True)
+    client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='archived_invoices')
+    client_name = models.CharField(max_length=255, blank=True, default='')
+    client_tax_id = models.CharField(max_length=50, blank=True, default='')
+    proforma = models.ForeignKey('proforma.ProformaInvoice', on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='archived_invoices')
+    recurring_invoice = models.ForeignKey('RecurringInvoice', on_delete=models.SET_NULL, null=True, blank=True,
+                                          related_name='archived_invoices')
+
+    invoice_date = models.DateField()
+    due_date = models.DateField()
+
+    status = models.CharField(max_length=20, choices=Invoice.STATUS_CHOICES)
+    description = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    sent_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-invoice_date']
+        verbose_name = _('Archived Invoice')
+        verbose_name_plural = _('Archived Invoices')
+        indexes = [
+            models.Index(fields=['client', '-created_at']),
+            models.Index(fields=['-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Invoice {self.invoice_number} (archived)"
+
+    def get_absolute_url(self):
+        return reverse('invoices:detail', kwargs={'pk': self.pk})
+
+
+class ArchivedInvoiceItem(models.Model):
+    """Line of an archived invoice, keeping the id it had in InvoiceItem"""
+
+    id = models.BigIntegerField(primary_key=True)
+    invoice = models.ForeignKey(ArchivedInvoice, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey('products.Product', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='+')
+    description = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=20)
+
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2)
+    tax = models.DecimalField(max_digits=12, decimal_places=2)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Archived Invoice Item')
+        verbose_name_plural = _('Archived Invoice Items')
+
+    def __str__(self):
+        return f"{self.description} (Invoice {self.invoice.invoice_number})"
+
+
+class InvoiceArchiveTotal(models.Model):
+    """Running count and amounts of archived invoices per client and status"""
+
+    client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='+')
+    status = models.CharField(max_length=20, choices=Invoice.STATUS_CHOICES)
+    invoice_count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = _('Invoice Archive Total')
+        verbose_name_plural = _('Invoice Archive Totals')
+        constraints = [
+            models.UniqueConstraint(fields=['client', 'status'], name='invoice_archive_total_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.client_id} {self.status}: {self.invoice_count}"
+
+
+# ============================================================================
+# Facturation périodique - une facture par client pour ses bons de livraison
+# ============================================================================
+
+class BillingRun(models.Model):
+    """Progress of the billing of a period's delivery notes, see invoices.billing"""
+
+    STATUS_CHOICES = [
+        ('running', _('Running')),
+        ('completed', _('Completed')),
+        ('failed', _('Failed')),
+    ]
+
+    period_start = models.DateField()
+    period_end = models.DateField()
+    invoice_date = models.DateField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    invoice_count = models.PositiveIntegerField(default=0)
+    line_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='billing_runs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-period_start']
+        verbose_name = _('Billing Run')
+        verbose_name_plural = _('Billing Runs')
+        constraints = [
+            models.UniqueConstraint(fields=['period_start', 'period_end'], name='billing_run_period_unique'),
+        ]
+
+    def __str__(self):
+        return f"Billing {self.period_start} - {self.period_end}"
+
+
+# ============================================================================
+# Factures récurrentes - modèles générés à échéance par invoices.recurring
+# ============================================================================
+
+class RecurringInvoice(models.Model):
+    """Template of an invoice issued to a client on a schedule"""
+
+    FREQUENCY_CHOICES = [
+        ('monthly', _('Monthly')),
+        ('quarterly', _('Quarterly')),
+        ('yearly', _('Yearly')),
+    ]
+    FREQUENCY_MONTHS = {'monthly': 1, 'quarterly': 3, 'yearly': 12}
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='recurring_invoices')
+
+    frequency = models.CharField(max_length=20, choices=FREQUENCY_CHOICES, default='monthly')
+    # First invoice date; later ones fall on the same day of the month when it exists
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_run = models.DateField(blank=True)
+    last_run = models.DateField(null=True, blank=True, editable=False)
+    payment_days = models.PositiveSmallIntegerField(default=30)
+    is_active = models.BooleanField(default=True)
+
+    description = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='recurring_invoices_created')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_run']
+        verbose_name = _('Recurring Invoice')
+        verbose_name_plural = _('Recurring Invoices')
+        indexes = [
+            # Partial index: the generator's due query only looks at active templates
+            models.Index(
+                fields=['next_run'], name='recurring_invoice_due_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Recurring invoice {self.client} ({self.get_frequency_display()})"
+
+    def calculate_totals(self):
+        """Recalculate template totals from its lines"""
+        items = self.items.all()
+        self.subtotal = sum(item.subtotal for item in items)
+        self.tax_amount = sum(item.tax for item in items)
+        self.total = self.subtotal + self.tax_amount
+        self.save()
+
+    def save(self, *args, **kwargs):
+        if not self.next_run:
+            self.next_run = self.start_date
+        super().save(*args, **kwargs)
+
+
+class RecurringInvoiceItem(models.Model):
+    """Line copied onto every invoice generated from a recurring invoice"""
+
+    recurring_invoice = models.ForeignKey(RecurringInvoice, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey('products.Product', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='+')
+    description = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2,
+                                   validators=[MinValueValidator(Decimal('0.01'))])
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2,
+                                     validators=[MinValueValidator(Decimal('0'))])
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=20,
+                                   validators=[MinValueValidator(Decimal('0'))])
+
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
+    tax = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
+    total = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Recurring Invoice Item')
+        verbose_name_plural = _('Recurring Invoice Items')
+
+    def calculate_amounts(self):
+        """Compute line subtotal, tax and total without saving"""
+        self.subtotal = (self.quantity * self.unit_price).quantize(Decimal('0.01'))
+        self.tax = (self.subtotal * self.tax_rate / 100).quantize(Decimal('0.01'))
+        self.total = (self.subtotal + self.tax).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        self.calculate_amounts()
+        super().save(*args, **kwargs)
+        self.recurring_invoice.calculate_totals()
+
+    def __str__(self):
+        return f"{self.description} ({self.recurring_invoice})"
@@ -0,0 +1,127 @@
+# ============================================================================
+# invoices/recurring.py - Génération des factures récurrentes
+# ============================================================================
+"""
+Recurring invoices.
+
+:func:`generate_recurring_invoices` reads the active templates due on or
+before a date, through the partial ``recurring_invoice_due_idx`` index on
+``next_run``, and issues them in chunks, one transaction each: one invoice
+per occurrence due since ``next_run`` (a generator that did not run for a
+while catches up), numbered from a block allocated up front, with invoices
+and lines bulk-inserted. The chunk's ``next_run`` dates are then advanced
+with a single ``UPDATE ... CASE``, and templates past their ``end_date``
+deactivated by the same statement.
+
+That UPDATE only matches templates still due, so when two generators
+overlap the later one's chunk rolls back and is read again, without the
+templates the other one has already issued.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from core.conversions import next_invoice_numbers, set_totals
+
+from .models import Invoice, InvoiceItem, RecurringInvoice
+
+CHUNK_SIZE = 500
+
+
+class StaleTemplates(Exception):
+    """Templates of the chunk were issued by another generator meanwhile"""
+
+
+def add_months(day, months, anchor_day):
+    """``day`` moved by ``months``, on ``anchor_day`` or the last day of a shorter month"""
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(template, today):
+    """Invoice dates of ``template`` due by ``today``, and the run after them"""
+    months = RecurringInvoice.FREQUENCY_MONTHS[template.frequency]
+    dates, run = [], template.next_run
+    while run <= today and (template.end_date is None or run <= template.end_date):
+        dates.append(run)
+        run = add_months(run, months, template.start_date.day)
+    return dates, run
+
+
+def due_templates(today):
+    return RecurringInvoice.objects.filter(is_active=True, next_run__lte=today)
+
+
+def _case(values, output_field, default):
+    """``CASE id WHEN ... THEN value`` for ``{pk: value}``"""
+    return Case(
+        *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+        default=default, output_field=output_field,
+    )
+
+
+def issue_chunk(templates, today):
+    """Issue the due occurrences of ``templates`` (items prefetched) in one transaction"""
+    plans = [(template, *occurrences(template, today)) for template in templates]
+    # Templates without lines only have their dates advanced
+    count = sum(len(dates) for template, dates, _ in plans if template.items.all())
+    with transaction.atomic():
+        numbers = iter(next_invoice_numbers(count))
+        invoices, items = [], []
+        for template, dates, _ in plans:
+            lines = template.items.all()
+            if not lines:
+                continue
+            for day in dates:
+                invoice = Invoice(
+                    invoice_number=next(numbers), client_id=template.client_id, recurring_invoice=template,
+                    invoice_date=day, due_date=day + timedelta(days=template.payment_days), status='draft',
+                    description=template.description, notes=template.notes, created_by_id=template.created_by_id,
+                )
+                invoice_items = [
+                    InvoiceItem(
+                        invoice=invoice, product_id=line.product_id, description=line.description,
+                        quantity=line.quantity, unit_price=line.unit_price, tax_rate=line.tax_rate,
+                    )
+                    for line in lines
+                ]
+                set_totals(invoice, invoice_items)
+                invoices.append(invoice)
+                items.extend(invoice_items)
+        Invoice.objects.bulk_create(invoices, batch_size=500)
+        InvoiceItem.objects.bulk_create(items, batch_size=1000)
+
+        finished = {
+            template.pk: False for template, _, next_run in plans
+            if template.end_date is not None and next_run > template.end_date
+        }
+        last_runs = {template.pk: dates[-1] for template, dates, _ in plans if dates}
+        advanced = due_templates(today).filter(pk__in=[template.pk for template in templates]).update(
+            next_run=_case({template.pk: next_run for template, _, next_run in plans}, models.DateField(),
+                           F('next_run')),
+            last_run=_case(last_runs, models.DateField(), F('last_run')),
+            is_active=_case(finished, models.BooleanField(), F('is_active')),
+            updated_at=timezone.now(),
+        )
+        if advanced != len(templates):
+            raise StaleTemplates
+    return invoices
+
+
+def generate_recurring_invoices(today, chunk_size=CHUNK_SIZE):
+    """Issue every recurring invoice due by ``today``, one transaction per chunk; yield running totals"""
+    issued = 0
+    while True:
+        templates = list(due_templates(today).order_by('next_run', 'pk').prefetch_related('items')[:chunk_size])
+        if not templates:
+            return
+        try:
+            issued += len(issue_chunk(templates, today))
+        except StaleTemplates:
+            continue
+        yield issued
@@ -5,6 +5,8 @@ from django.shortcuts import redirect, get_object_or_404
 from django.db.models import Q
 from django.contrib import messages
 from django.http import HttpResponse, FileResponse
+from core.search import search_filter
+from .archive import get_invoice_or_404
 from .models import Invoice, InvoiceItem
 from .forms import InvoiceForm, InvoiceItemForm
 from .utils import generate_invoice_pdf, generate_invoice_excel
@@ -34,10 +36,7 @@ class InvoiceListView(LoginRequiredMixin, ListView):
         # Search functionality
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(invoice_number__icontains=search) |
-                Q(client__name__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['invoice_number', 'client_name'])
 
         return queryset
 
@@ -49,9 +48,14 @@ class InvoiceDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'invoice'
     login_url = 'accounts:login'
 
+    def get_object(self, queryset=None):
+        # Falls back to the archive for invoices moved by archive_invoices
+        return get_invoice_or_404(self.kwargs['pk'])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['items'] = self.object.items.select_related('product').all()
+        context['balance_due'] = self.object.total - self.object.paid_amount
         return context
 
 
@@ -138,7 +142,7 @@ class InvoiceExportPDFView(LoginRequiredMixin, View):
     login_url = 'accounts:login'
 
     def get(self, request, pk):
-        invoice = get_object_or_404(Invoice, pk=pk)
+        invoice = get_invoice_or_404(pk)
         pdf_buffer = generate_invoice_pdf(invoice)
 
         response = HttpResponse(pdf_buffer, content_type='application/pdf')
@@ -151,7 +155,7 @@ class InvoiceExportExcelView(LoginRequiredMixin, View):
     login_url = 'accounts:login'
 
     def get(self, request, pk):
-        invoice = get_object_or_404(Invoice, pk=pk)
+        invoice = get_invoice_or_404(pk)
         excel_buffer = generate_invoice_excel(invoice)
 
         response = HttpResponse(
@@ -15,7 +15,7 @@ class CustomerOrderItemInline(admin.TabularInline):
 class CustomerOrderAdmin(admin.ModelAdmin):
     list_display = ('order_number', 'client', 'order_date', 'delivery_date', 'total', 'status')
     list_filter = ('status', 'order_date', 'created_at')
-    search_fields = ('order_number', 'client__name', 'description')
+    search_fields = ('order_number', 'client_name', 'description')
     readonly_fields = ('id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at')
     inlines = [CustomerOrderItemInline]
 
@@ -30,6 +30,6 @@ class SupplierOrderItemInline(admin.TabularInline):
 class SupplierOrderAdmin(admin.ModelAdmin):
     list_display = ('purchase_order_number', 'supplier', 'order_date', 'expected_delivery', 'total', 'status')
     list_filter = ('status', 'order_date', 'created_at')
-    search_fields = ('purchase_order_number', 'supplier__name', 'description')
+    search_fields = ('purchase_order_number', 'supplier_name', 'description')
     readonly_fields = ('id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at')
     inlines = [SupplierOrderItemInline]
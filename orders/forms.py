@@ -1,4 +1,5 @@
 from django import forms
+from core.widgets import AutocompleteSelect
 from .models import CustomerOrder, CustomerOrderItem, SupplierOrder, SupplierOrderItem
 
 
@@ -9,7 +10,7 @@ class CustomerOrderForm(forms.ModelForm):
         model = CustomerOrder
         fields = ['client', 'order_date', 'delivery_date', 'status', 'description', 'notes']
         widgets = {
-            'client': forms.Select(attrs={
+            'client': AutocompleteSelect('clients', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'order_date': forms.DateInput(attrs={
@@ -41,7 +42,7 @@ class CustomerOrderItemForm(forms.ModelForm):
         model = CustomerOrderItem
         fields = ['product', 'description', 'quantity', 'unit_price', 'tax_rate']
         widgets = {
-            'product': forms.Select(attrs={
+            'product': AutocompleteSelect('products', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'description': forms.TextInput(attrs={
@@ -69,7 +70,7 @@ class SupplierOrderForm(forms.ModelForm):
         model = SupplierOrder
         fields = ['supplier', 'order_date', 'expected_delivery', 'status', 'description', 'notes']
         widgets = {
-            'supplier': forms.Select(attrs={
+            'supplier': AutocompleteSelect('suppliers', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'order_date': forms.DateInput(attrs={
@@ -101,7 +102,7 @@ class SupplierOrderItemForm(forms.ModelForm):
         model = SupplierOrderItem
         fields = ['product', 'description', 'quantity', 'unit_price', 'tax_rate', 'quantity_received']
         widgets = {
-            'product': forms.Select(attrs={
+            'product': AutocompleteSelect('products', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'description': forms.TextInput(attrs={
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-19 02:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_clients_cli_updated_bf75f6_idx'),
+        ('orders', '0001_initial'),
+        ('products', '0002_product_products_pr_updated_e6e93b_idx'),
+        ('suppliers', '0002_supplier_suppliers_s_updated_9ae646_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerorderitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='supplierorderitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='customerorder',
+            index=models.Index(fields=['updated_at', 'id'], name='orders_cust_updated_fd71fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerorderitem',
+            index=models.Index(fields=['updated_at', 'id'], name='orders_cust_updated_cf8b9f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierorder',
+            index=models.Index(fields=['updated_at', 'id'], name='orders_supp_updated_5b5a28_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierorderitem',
+            index=models.Index(fields=['updated_at', 'id'], name='orders_supp_updated_56a558_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_party_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerorderitem',
+            name='quantity_reserved',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
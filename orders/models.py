@@ -1,13 +1,16 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-import uuid
+from core.ids import uuid7
+from core.snapshots import PartySnapshotMixin, PartySnapshotQuerySet
+from products.models import StockMovement
+from products.stock import StockLineMixin, StockLineQuerySet
 
 
-class CustomerOrder(models.Model):
+class CustomerOrder(PartySnapshotMixin, models.Model):
     """Customer Order model"""
 
     STATUS_CHOICES = [
@@ -19,9 +22,12 @@ class CustomerOrder(models.Model):
         ('cancelled', _('Cancelled')),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     order_number = models.CharField(max_length=100, unique=True, db_index=True)
     client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='orders')
+    # Snapshot of the client, see core.snapshots
+    client_name = models.CharField(max_length=255, blank=True, default='', editable=False)
+    client_tax_id = models.CharField(max_length=50, blank=True, default='', editable=False)
 
     order_date = models.DateField(db_index=True)
     delivery_date = models.DateField(null=True, blank=True)
@@ -38,10 +44,16 @@ class CustomerOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PartySnapshotQuerySet.as_manager()
+
     class Meta:
         ordering = ['-order_date']
         verbose_name = _('Customer Order')
         verbose_name_plural = _('Customer Orders')
+        indexes = [
+            models.Index(fields=['client_name']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number}"
@@ -68,7 +80,35 @@ class CustomerOrder(models.Model):
                     self.order_number = f"CMD-{CustomerOrder.objects.count() + 1:05d}"
             else:
                 self.order_number = "CMD-00001"
-        super().save(*args, **kwargs)
+        self._save_reserving(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_status = self.__dict__.get('status')
+
+    def _save_reserving(self, *args, update_fields=None, **kwargs):
+        """Save, reserving or releasing stock when the status enters or leaves a reserving one"""
+        from .reservations import RESERVING_STATUSES, release_order, reserve_order
+
+        if update_fields is not None and 'status' not in update_fields:
+            super().save(*args, update_fields=update_fields, **kwargs)
+            return
+
+        was_reserving = getattr(self, '_loaded_status', None) in RESERVING_STATUSES
+        reserving = self.status in RESERVING_STATUSES
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            super().save(*args, update_fields=update_fields, **kwargs)
+            if reserving and not was_reserving:
+                reserve_order(self)
+            elif was_reserving and not reserving:
+                release_order(self)
+        self._loaded_status = self.status
 
 
 class CustomerOrderItem(models.Model):
@@ -84,15 +124,25 @@ class CustomerOrderItem(models.Model):
     subtotal = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
     tax = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
     total = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
+    # Units of the product still reserved by this line, see orders.reservations
+    quantity_reserved = models.IntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Customer Order Item')
         verbose_name_plural = _('Customer Order Items')
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
-    def save(self, *args, **kwargs):
+    def calculate_amounts(self):
+        """Compute line subtotal, tax and total without saving"""
         self.subtotal = (self.quantity * self.unit_price).quantize(Decimal('0.01'))
         self.tax = (self.subtotal * self.tax_rate / 100).quantize(Decimal('0.01'))
         self.total = (self.subtotal + self.tax).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        self.calculate_amounts()
         super().save(*args, **kwargs)
         self.order.calculate_totals()
 
@@ -100,8 +150,10 @@ class CustomerOrderItem(models.Model):
         return f"{self.description} - {self.order.order_number}"
 
 
-class SupplierOrder(models.Model):
+class SupplierOrder(PartySnapshotMixin, models.Model):
     """Supplier Purchase Order model"""
+    party_field = 'supplier'
+    snapshot_fields = {'supplier_name': 'name'}
 
     STATUS_CHOICES = [
         ('draft', _('Draft')),
@@ -112,9 +164,11 @@ class SupplierOrder(models.Model):
         ('cancelled', _('Cancelled')),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     purchase_order_number = models.CharField(max_length=100, unique=True, db_index=True)
     supplier = models.ForeignKey('suppliers.Supplier', on_delete=models.PROTECT, related_name='purchase_orders')
+    # Snapshot of the supplier, see core.snapshots
+    supplier_name = models.CharField(max_length=255, blank=True, default='', editable=False)
 
     order_date = models.DateField(db_index=True)
     expected_delivery = models.DateField(null=True, blank=True)
@@ -131,10 +185,16 @@ class SupplierOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PartySnapshotQuerySet.as_manager()
+
     class Meta:
         ordering = ['-order_date']
         verbose_name = _('Supplier Order')
         verbose_name_plural = _('Supplier Orders')
+        indexes = [
+            models.Index(fields=['supplier_name']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"PO {self.purchase_order_number}"
@@ -164,8 +224,10 @@ class SupplierOrder(models.Model):
         super().save(*args, **kwargs)
 
 
-class SupplierOrderItem(models.Model):
+class SupplierOrderItem(StockLineMixin, models.Model):
     """Supplier Order line items"""
+    stock_quantity_field = 'quantity_received'
+    stock_kind = StockMovement.RECEIPT
 
     order = models.ForeignKey(SupplierOrder, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey('products.Product', on_delete=models.SET_NULL, null=True, blank=True)
@@ -178,17 +240,30 @@ class SupplierOrderItem(models.Model):
     subtotal = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
     tax = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
     total = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StockLineQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Supplier Order Item')
         verbose_name_plural = _('Supplier Order Items')
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
-    def save(self, *args, **kwargs):
+    def calculate_amounts(self):
+        """Compute line subtotal, tax and total without saving"""
         self.subtotal = (self.quantity * self.unit_price).quantize(Decimal('0.01'))
         self.tax = (self.subtotal * self.tax_rate / 100).quantize(Decimal('0.01'))
         self.total = (self.subtotal + self.tax).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        self.calculate_amounts()
         super().save(*args, **kwargs)
         self.order.calculate_totals()
 
+    def stock_reference(self):
+        return self.order.purchase_order_number
+
     def __str__(self):
         return f"{self.description} - {self.order.purchase_order_number}"
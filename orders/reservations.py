@@ -0,0 +1,132 @@
+# ============================================================================
+# orders/reservations.py - Réservation du stock par les commandes clients
+# ============================================================================
+"""
+Stock reservations for customer orders.
+
+A customer order entering a reserving status (confirmed, partially
+delivered) reserves the units of its lines on their products; leaving
+those statuses (cancelled, completed, back to draft or pending) releases
+what is still reserved, and deliveries of the order's delivery notes
+consume it as the goods leave (see ``DeliveryItem.stock_moved``).
+
+Each product is reserved with one conditional UPDATE::
+
+    UPDATE products_product SET quantity_reserved = quantity_reserved + n
+    WHERE id = %s AND quantity_in_stock >= quantity_reserved + n
+
+so two confirmations racing for the last units cannot both succeed, and
+no lock is held while the application reads. Products are updated in
+primary key order, so orders sharing products lock their rows in the same
+order and cannot deadlock. When a line cannot be reserved the whole order
+is rolled back and :class:`InsufficientStock` is raised.
+
+Lines added to a confirmed order through the API are reserved when they
+are written (see ``CustomerOrderSerializer``), with the same all-or-nothing
+rule. Lines added from the admin are only reserved the next time the order
+enters a reserving status.
+
+Delivery notes without a customer order have no reservation to consume:
+their stock-outs only apply while the units reserved by the orders stay
+in stock, and raise :class:`InsufficientStock` otherwise (see
+``StockLineMixin.stock_keeps_reserved``).
+"""
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from products.models import Product
+from products.stock import InsufficientStock, stock_units
+
+from .models import CustomerOrderItem
+
+RESERVING_STATUSES = ('confirmed', 'partial')
+
+
+def _change_reserved(products, product_id, units, now):
+    return products.filter(pk=product_id).update(
+        quantity_reserved=F('quantity_reserved') + units, updated_at=now,
+    )
+
+
+def reserve_order(order):
+    """Reserve the unreserved units of every line of ``order``, all or nothing"""
+    db = order._state.db or DEFAULT_DB_ALIAS
+    products = Product.objects.using(db)
+    lines = [
+        line for line in order.items.using(db).filter(product__isnull=False)
+        if stock_units(line.quantity) > line.quantity_reserved
+    ]
+    needed = defaultdict(int)
+    for line in lines:
+        needed[line.product_id] += stock_units(line.quantity) - line.quantity_reserved
+    if not needed:
+        return 0
+
+    now = timezone.now()
+    with transaction.atomic(using=db):
+        for product_id in sorted(needed):
+            units = needed[product_id]
+            reserved = products.filter(
+                pk=product_id, quantity_in_stock__gte=F('quantity_reserved') + units,
+            ).update(quantity_reserved=F('quantity_reserved') + units, updated_at=now)
+            if not reserved:
+                name = products.filter(pk=product_id).values_list('name', flat=True).first()
+                raise InsufficientStock(name, units)
+        for line in lines:
+            line.quantity_reserved = stock_units(line.quantity)
+            line.updated_at = now
+        CustomerOrderItem.objects.using(db).bulk_update(lines, ['quantity_reserved', 'updated_at'])
+    return sum(needed.values())
+
+
+def release_order(order):
+    """Give back the units still reserved by ``order``"""
+    db = order._state.db or DEFAULT_DB_ALIAS
+    lines = order.items.using(db).filter(quantity_reserved__gt=0)
+    reserved = defaultdict(int)
+    for product_id, units in lines.values_list('product_id', 'quantity_reserved'):
+        if product_id:
+            reserved[product_id] += units
+    if not reserved:
+        return 0
+
+    now = timezone.now()
+    products = Product.objects.using(db)
+    with transaction.atomic(using=db):
+        for product_id in sorted(reserved):
+            _change_reserved(products, product_id, -reserved[product_id], now)
+        lines.update(quantity_reserved=0, updated_at=now)
+    return sum(reserved.values())
+
+
+def consume_reservation(order_id, product_id, units, using=DEFAULT_DB_ALIAS):
+    """Turn up to ``units`` reserved by the order for the product into delivered stock"""
+    now = timezone.now()
+    products = Product.objects.using(using)
+    lines = CustomerOrderItem.objects.using(using).filter(
+        order_id=order_id, product_id=product_id, quantity_reserved__gt=0,
+    ).order_by('pk')
+    with transaction.atomic(using=using):
+        for pk, reserved in lines.values_list('pk', 'quantity_reserved'):
+            if units <= 0:
+                break
+            taken = min(units, reserved)
+            if CustomerOrderItem.objects.using(using).filter(pk=pk, quantity_reserved__gte=taken).update(
+                quantity_reserved=F('quantity_reserved') - taken, updated_at=now,
+            ):
+                _change_reserved(products, product_id, -taken, now)
+                units -= taken
+
+
+def _release_on_delete(sender, instance, using, **kwargs):
+    if instance.product_id and instance.quantity_reserved:
+        _change_reserved(Product.objects.using(using), instance.product_id, -instance.quantity_reserved,
+                         timezone.now())
+
+
+def connect_reservations():
+    post_delete.connect(_release_on_delete, sender=CustomerOrderItem, dispatch_uid='reservation_release')
@@ -1,3 +1,102 @@
+# ============================================================================
+# orders/tests.py - Tests des réservations de stock
+# ============================================================================
+import datetime
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from clients.models import Client
+from delivery.models import DeliveryItem, DeliveryNote
+from products.models import Product
+
+from .models import CustomerOrder, CustomerOrderItem
+from .reservations import InsufficientStock
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.client_record = Client.objects.create(
+            name='Client', address='1 rue', city='Paris', postal_code='75001', country='FR',
+        )
+        self.product = Product.objects.create(name='Widget', sku='W-1', unit_price=Decimal('10'), quantity_in_stock=10)
+
+    def order(self, *lines):
+        """Draft order with one line per (product, quantity)"""
+        order = CustomerOrder.objects.create(client=self.client_record, order_date=datetime.date(2026, 1, 5))
+        for product, quantity in lines:
+            CustomerOrderItem.objects.create(
+                order=order, product=product, description=product.name,
+                quantity=Decimal(quantity), unit_price=Decimal('10'),
+            )
+        return order
+
+    def set_status(self, order, status):
+        order.status = status
+        order.save()
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.quantity_in_stock, product.quantity_reserved
+
+    def test_confirming_reserves_the_lines(self):
+        order = self.order((self.product, 4))
+        self.set_status(order, 'confirmed')
+
+        self.assertEqual(self.stock(self.product), (10, 4))
+        self.assertEqual(order.items.get().quantity_reserved, 4)
+
+    def test_reserving_beyond_stock_rolls_back(self):
+        # Reserved first (primary key order), then undone when the second line fails
+        other = Product.objects.create(name='Gadget', sku='G-1', unit_price=Decimal('10'), quantity_in_stock=2)
+        order = self.order((self.product, 4), (other, 3))
+
+        with self.assertRaises(InsufficientStock) as raised:
+            self.set_status(order, 'confirmed')
+
+        self.assertEqual(raised.exception.product_name, 'Gadget')
+        self.assertEqual(raised.exception.requested, 3)
+        self.assertEqual(self.stock(self.product), (10, 0))
+        self.assertEqual(self.stock(other), (2, 0))
+        self.assertEqual(CustomerOrder.objects.get(pk=order.pk).status, 'draft')
+        self.assertFalse(order.items.filter(quantity_reserved__gt=0).exists())
+
+    def test_competing_orders_cannot_both_reserve(self):
+        self.set_status(self.order((self.product, 7)), 'confirmed')
+
+        with self.assertRaises(InsufficientStock):
+            self.set_status(self.order((self.product, 4)), 'confirmed')
+        self.assertEqual(self.stock(self.product), (10, 7))
+
+    def test_cancelling_releases(self):
+        order = self.order((self.product, 4))
+        self.set_status(order, 'confirmed')
+        self.set_status(order, 'cancelled')
+
+        self.assertEqual(self.stock(self.product), (10, 0))
+        self.assertEqual(order.items.get().quantity_reserved, 0)
+
+    def test_deleting_a_line_releases(self):
+        order = self.order((self.product, 4))
+        self.set_status(order, 'confirmed')
+        order.items.get().delete()
+
+        self.assertEqual(self.stock(self.product), (10, 0))
+
+    def test_delivery_consumes_the_reservation(self):
+        order = self.order((self.product, 4))
+        self.set_status(order, 'confirmed')
+        note = DeliveryNote.objects.create(
+            client=self.client_record, customer_order=order, delivery_date=datetime.date(2026, 1, 6),
+        )
+        DeliveryItem.objects.create(
+            delivery_note=note, product=self.product, description='Widget',
+            quantity_ordered=Decimal('4'), quantity_delivered=Decimal('3'), unit_price=Decimal('10'),
+        )
+
+        self.assertEqual(self.stock(self.product), (7, 1))
+        self.assertEqual(order.items.get().quantity_reserved, 1)
+
+        # Cancelling gives back what was not delivered
+        self.set_status(order, 'cancelled')
+        self.assertEqual(self.stock(self.product), (7, 0))
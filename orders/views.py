@@ -6,8 +6,10 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q
 from django.contrib import messages
+from core.search import search_filter
 from .models import CustomerOrder, CustomerOrderItem, SupplierOrder, SupplierOrderItem
 from .forms import CustomerOrderForm, SupplierOrderForm
+from .reservations import InsufficientStock
 
 
 # Customer Orders Views
@@ -28,10 +30,7 @@ class CustomerOrderListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(order_number__icontains=search) |
-                Q(client__name__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['order_number', 'client_name'])
         return queryset
 
     def get_context_data(self, **kwargs):
@@ -57,8 +56,13 @@ class CustomerOrderCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.created_by = self.request.user
+        try:
+            response = super().form_valid(form)
+        except InsufficientStock as exc:
+            form.add_error('status', str(exc))
+            return self.form_invalid(form)
         messages.success(self.request, f'Commande {form.instance.order_number} créée!')
-        return super().form_valid(form)
+        return response
 
 
 class CustomerOrderUpdateView(LoginRequiredMixin, UpdateView):
@@ -69,8 +73,13 @@ class CustomerOrderUpdateView(LoginRequiredMixin, UpdateView):
     login_url = 'accounts:login'
 
     def form_valid(self, form):
+        try:
+            response = super().form_valid(form)
+        except InsufficientStock as exc:
+            form.add_error('status', str(exc))
+            return self.form_invalid(form)
         messages.success(self.request, 'Commande mise à jour!')
-        return super().form_valid(form)
+        return response
 
 
 class CustomerOrderDeleteView(LoginRequiredMixin, DeleteView):
@@ -99,10 +108,7 @@ class SupplierOrderListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(purchase_order_number__icontains=search) |
-                Q(supplier__name__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['purchase_order_number', 'supplier_name'])
         return queryset
 
 
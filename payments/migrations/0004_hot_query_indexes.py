@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0004_hot_query_indexes'),
+        ('payments', '0003_payment_reference_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date', 'amount'], name='payments_pa_payment_f5dabd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-created_at'], name='payments_pa_created_3147e3_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 03:01
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_archivedpayment'),
+    ]
+
+    # The default is applied in Python only: skip the table rebuild SQLite
+    # would otherwise do for each AlterField
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='payment',
+                    name='id',
+                    field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
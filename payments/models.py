@@ -7,7 +7,7 @@ from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-import uuid
+from core.ids import uuid7
 
 
 class Payment(models.Model):
@@ -21,22 +21,28 @@ class Payment(models.Model):
         ('other', _('Other')),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     invoice = models.ForeignKey('invoices.Invoice', on_delete=models.CASCADE, related_name='payments')
     payment_date = models.DateField(db_index=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2,
                                 validators=[MinValueValidator(Decimal('0'))])
     method = models.CharField(max_length=20, choices=METHOD_CHOICES, default='bank_transfer')
-    reference = models.CharField(max_length=100, blank=True)
+    reference = models.CharField(max_length=100, blank=True, db_index=True)
     notes = models.TextField(blank=True)
 
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='payments_created')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-payment_date']
         verbose_name = _('Payment')
         verbose_name_plural = _('Payments')
+        indexes = [
+            models.Index(fields=['payment_date', 'amount']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Payment {self.amount} for {self.invoice.invoice_number}"
@@ -58,3 +64,27 @@ class Payment(models.Model):
             self.invoice.status = 'partial'
 
         self.invoice.save()
+
+
+class ArchivedPayment(models.Model):
+    """Payment of an archived invoice, moved along with it"""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    invoice = models.ForeignKey('invoices.ArchivedInvoice', on_delete=models.CASCADE, related_name='payments')
+    payment_date = models.DateField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    method = models.CharField(max_length=20, choices=Payment.METHOD_CHOICES, default='bank_transfer')
+    reference = models.CharField(max_length=100, blank=True)
+    notes = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-payment_date']
+        verbose_name = _('Archived Payment')
+        verbose_name_plural = _('Archived Payments')
+
+    def __str__(self):
+        return f"Payment {self.amount} for {self.invoice.invoice_number} (archived)"
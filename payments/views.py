@@ -6,6 +6,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q
 from django.contrib import messages
+from core.search import search_filter
 from .models import Payment
 from .forms import PaymentForm
 
@@ -23,10 +24,7 @@ class PaymentListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(invoice__invoice_number__icontains=search) |
-                Q(reference__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['invoice__invoice_number', 'reference'])
 
         return queryset
 
@@ -57,7 +55,7 @@ class PaymentCreateView(LoginRequiredMixin, CreateView):
         # Get unpaid or partially paid invoices
         from invoices.models import Invoice
         context['invoices'] = Invoice.objects.filter(
-            status__in=['sent', 'partial']
+            status__in=Invoice.OPEN_STATUSES
         ).select_related('client').order_by('-invoice_date')
         return context
 
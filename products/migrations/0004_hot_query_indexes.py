@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_search_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity_in_stock__lte', models.F('reorder_level'))), fields=['name'], name='product_low_stock_idx'),
+        ),
+    ]
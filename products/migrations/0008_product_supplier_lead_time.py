@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 03:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_is_low_stock'),
+        ('suppliers', '0004_uuid7_primary_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='lead_time_days',
+            field=models.PositiveSmallIntegerField(default=7, verbose_name='Lead Time (days)'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='supplier',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='suppliers.supplier', verbose_name='Preferred Supplier'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_supplier_lead_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='quantity_reserved',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
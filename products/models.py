@@ -1,16 +1,19 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-import uuid
 
+from core.search import SearchColumnsMixin, SearchColumnsQuerySet
+from core.ids import uuid7
 
-class Product(models.Model):
+
+class Product(SearchColumnsMixin, models.Model):
     """Product/Article catalog"""
+    search_columns = ('name',)
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=255, db_index=True, verbose_name=_('Product Name'))
     description = models.TextField(blank=True)
     sku = models.CharField(max_length=100, unique=True, db_index=True, verbose_name=_('SKU'))
@@ -28,8 +31,19 @@ class Product(models.Model):
     )
 
     quantity_in_stock = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    # Units held by confirmed customer orders, see orders.reservations
+    quantity_reserved = models.IntegerField(default=0, editable=False)
     reorder_level = models.IntegerField(default=10, validators=[MinValueValidator(0)],
                                         verbose_name=_('Reorder Level'))
+    supplier = models.ForeignKey('suppliers.Supplier', on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='products', verbose_name=_('Preferred Supplier'))
+    lead_time_days = models.PositiveSmallIntegerField(default=7, verbose_name=_('Lead Time (days)'))
+    # Stored by the database, so every write path (F() updates included) keeps it current
+    is_low_stock = models.GeneratedField(
+        expression=models.Q(quantity_in_stock__lte=models.F('reorder_level')),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
 
     tax_rate = models.DecimalField(
         max_digits=5, decimal_places=2, default=20,
@@ -46,6 +60,11 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Lowercased, accent-stripped copy for search (see core.search)
+    name_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+
+    objects = SearchColumnsQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
         verbose_name = _('Product')
@@ -54,6 +73,12 @@ class Product(models.Model):
             models.Index(fields=['sku']),
             models.Index(fields=['name']),
             models.Index(fields=['category']),
+            models.Index(fields=['updated_at', 'id']),
+            # Partial index: only the (few) products at or below their reorder level
+            models.Index(
+                fields=['name'], name='product_low_stock_idx',
+                condition=models.Q(is_low_stock=True),
+            ),
         ]
 
     def __str__(self):
@@ -62,5 +87,109 @@ class Product(models.Model):
     def get_absolute_url(self):
         return reverse('products:detail', kwargs={'pk': self.pk})
 
-    def is_low_stock(self):
-        return self.quantity_in_stock <= self.reorder_level
+    @property
+    def quantity_available(self):
+        return self.quantity_in_stock - self.quantity_reserved
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stock level as read, to turn an edited value into a movement
+        instance._loaded_stock = instance.__dict__.get('quantity_in_stock')
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_stock = self.__dict__.get('quantity_in_stock')
+
+    def save(self, *args, update_fields=None, **kwargs):
+        """
+        Stock is only changed through movements (see products.stock).
+
+        A new product records its initial stock as an adjustment. On an
+        existing product, ``quantity_in_stock`` and ``quantity_reserved``
+        are left out of the UPDATE so a stale copy cannot overwrite
+        concurrent movements and reservations; an edited stock value is
+        applied as an adjustment of the difference.
+        """
+        from .stock import move_stock
+
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, update_fields=update_fields, **kwargs)
+                move_stock(self.pk, self.quantity_in_stock, StockMovement.ADJUSTMENT,
+                           reference='Opening balance', apply=False)
+            self._loaded_stock = self.quantity_in_stock
+            return
+
+        loaded = getattr(self, '_loaded_stock', None)
+        if loaded is None:
+            super().save(*args, update_fields=update_fields, **kwargs)
+            return
+        if update_fields is None:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated
+            ]
+        update_fields = [name for name in update_fields if name not in ('quantity_in_stock', 'quantity_reserved')]
+
+        with transaction.atomic():
+            super().save(*args, update_fields=update_fields, **kwargs)
+            if self.quantity_in_stock == loaded:
+                return
+            move_stock(self.pk, self.quantity_in_stock - loaded, StockMovement.ADJUSTMENT,
+                       reference='Manual adjustment')
+            self.quantity_in_stock = self._loaded_stock = (
+                Product.objects.filter(pk=self.pk).values_list('quantity_in_stock', flat=True).get()
+            )
+
+
+class StockMovement(models.Model):
+    """Ledger of stock changes; quantity is signed (in > 0, out < 0)"""
+
+    RECEIPT = 'receipt'
+    DELIVERY = 'delivery'
+    ADJUSTMENT = 'adjustment'
+    KIND_CHOICES = [
+        (RECEIPT, _('Supplier Receipt')),
+        (DELIVERY, _('Delivery')),
+        (ADJUSTMENT, _('Adjustment')),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField()
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Stock Movement')
+        verbose_name_plural = _('Stock Movements')
+        indexes = [
+            # Delta scans between a snapshot and a date
+            models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.kind} {self.quantity:+d}"
+
+
+class StockSnapshot(models.Model):
+    """Stock level of a product at the end of a day"""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_snapshots')
+    date = models.DateField()
+    quantity = models.IntegerField()
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = _('Stock Snapshot')
+        verbose_name_plural = _('Stock Snapshots')
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='unique_stock_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.date}: {self.quantity}"
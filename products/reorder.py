@@ -0,0 +1,211 @@
+# ============================================================================
+# products/reorder.py - Suggestions de réapprovisionnement et commandes brouillon
+# ============================================================================
+"""
+Reorder suggestions from sales velocity.
+
+:func:`suggest_reorders` loads the daily quantities sold per product over a
+history window (invoice lines, plus delivery note lines whose invoice is
+not counted, so a sale is counted once) with one grouped query per
+source, then computes for all products at once, with NumPy arrays:
+
+* velocity: mean units sold per day, and its daily standard deviation;
+* lead-time demand: velocity times the product's ``lead_time_days``;
+* reorder point: lead-time demand plus safety stock
+  (``z * sigma * sqrt(lead time)``), never below ``reorder_level``;
+* stock position: stock on hand plus quantities still expected on open
+  supplier orders.
+
+Products whose position is at or below their reorder point get a quantity
+bringing the position above the reorder point plus ``cover_days`` of
+demand. :func:`create_draft_orders` turns suggestions into one draft
+:class:`~orders.models.SupplierOrder` per supplier, with bulk-created lines.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import CharField, F, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+
+from core.utils import next_numbers
+from delivery.models import DeliveryItem
+from invoices.models import InvoiceItem
+from orders.models import SupplierOrder, SupplierOrderItem
+
+from .models import Product
+
+HISTORY_DAYS = 90
+COVER_DAYS = 30
+# Safety factor for a ~95% service level
+SERVICE_Z = 1.65
+
+OPEN_SUPPLIER_ORDER_STATUSES = ('draft', 'sent', 'confirmed', 'partial')
+SALE_EXCLUDED_STATUSES = ('draft', 'cancelled')
+
+
+def _text(expression):
+    return Cast(expression, output_field=CharField())
+
+
+def _raw_rows(queryset):
+    """Rows of a values_list() as the driver returns them, without Django's per-row converters"""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _load_products():
+    """Active products as parallel arrays, with their supplier or the last one they were bought from"""
+    last_supplier = SupplierOrderItem.objects.filter(product=OuterRef('pk')).order_by(
+        '-order__order_date'
+    ).values('order__supplier')[:1]
+    rows = _raw_rows(
+        Product.objects.filter(is_active=True)
+        .order_by()
+        .values_list(
+            _text('pk'),
+            _text(Coalesce('supplier', Subquery(last_supplier))),
+            'quantity_in_stock', 'reorder_level', 'lead_time_days',
+        )
+    )
+    ids = [row[0] for row in rows]
+    suppliers = [row[1] for row in rows]
+    numbers = np.array([row[2:] for row in rows], dtype=np.float64).reshape(len(rows), 3)
+    return ids, suppliers, numbers[:, 0], numbers[:, 1], numbers[:, 2]
+
+
+def _daily_sales(index, start, end):
+    """``(product position, day offset, quantity)`` arrays of sales between start and end"""
+    invoiced = (
+        InvoiceItem.objects.filter(
+            product__isnull=False,
+            invoice__invoice_date__gte=start, invoice__invoice_date__lte=end,
+        )
+        .exclude(invoice__status__in=SALE_EXCLUDED_STATUSES)
+        .values('product_id', 'invoice__invoice_date')
+        .annotate(quantity=Cast(Sum('quantity'), output_field=FloatField()))
+        .values_list(_text('product_id'), _text('invoice__invoice_date'), 'quantity')
+    )
+    # Notes whose invoice is not counted above (none yet, or a draft or cancelled one)
+    delivered = (
+        DeliveryItem.objects.filter(
+            Q(delivery_note__invoice__isnull=True) | Q(delivery_note__invoice__status__in=SALE_EXCLUDED_STATUSES),
+            Q(delivery_note__archived_invoice__isnull=True)
+            | Q(delivery_note__archived_invoice__status__in=SALE_EXCLUDED_STATUSES),
+            product__isnull=False, quantity_delivered__gt=0,
+            delivery_note__delivery_date__gte=start, delivery_note__delivery_date__lte=end,
+        )
+        .values('product_id', 'delivery_note__delivery_date')
+        .annotate(quantity=Cast(Sum('quantity_delivered'), output_field=FloatField()))
+        .values_list(_text('product_id'), _text('delivery_note__delivery_date'), 'quantity')
+    )
+    offsets = {(start + timedelta(days=n)).isoformat(): n for n in range((end - start).days + 1)}
+    rows = [row for source in (invoiced, delivered) for row in _raw_rows(source) if row[0] in index]
+    return (
+        np.fromiter((index[row[0]] for row in rows), dtype=np.int64, count=len(rows)),
+        np.fromiter((offsets[row[1]] for row in rows), dtype=np.int64, count=len(rows)),
+        np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)),
+    )
+
+
+def _on_order(index, size):
+    """Units still expected from open supplier orders, per product position"""
+    on_order = np.zeros(size)
+    rows = (
+        SupplierOrderItem.objects.filter(product__isnull=False, order__status__in=OPEN_SUPPLIER_ORDER_STATUSES)
+        .values('product_id')
+        .annotate(expected=Sum(F('quantity') - F('quantity_received')))
+        .values_list(_text('product_id'), 'expected')
+    )
+    for product_id, expected in rows:
+        position = index.get(product_id)
+        if position is not None and expected and expected > 0:
+            on_order[position] = float(expected)
+    return on_order
+
+
+def suggest_reorders(today, history_days=HISTORY_DAYS, cover_days=COVER_DAYS, z=SERVICE_Z):
+    """List of ``{product_id, supplier_id, quantity, ...}`` for the products to reorder"""
+    ids, suppliers, stock, reorder_level, lead_time = _load_products()
+    size = len(ids)
+    if not size:
+        return []
+    index = {pk: position for position, pk in enumerate(ids)}
+
+    start = today - timedelta(days=history_days - 1)
+    positions, days, quantities = _daily_sales(index, start, today)
+
+    # One value per product and day, both sources added up
+    keys, inverse = np.unique(positions * history_days + days, return_inverse=True)
+    daily = np.bincount(inverse, weights=quantities, minlength=len(keys))
+    owners = keys // history_days
+
+    total = np.bincount(owners, weights=daily, minlength=size)
+    total_squares = np.bincount(owners, weights=daily ** 2, minlength=size)
+    velocity = total / history_days
+    sigma = np.sqrt(np.maximum(total_squares / history_days - velocity ** 2, 0))
+
+    lead_time_demand = velocity * lead_time
+    reorder_point = np.maximum(lead_time_demand + z * sigma * np.sqrt(lead_time), reorder_level)
+    position = stock + _on_order(index, size)
+    target = reorder_point + velocity * cover_days
+
+    has_supplier = np.array([supplier is not None for supplier in suppliers])
+    to_order = np.flatnonzero(has_supplier & (position <= reorder_point))
+    quantity = np.floor(target[to_order] - position[to_order]) + 1
+
+    to_pk = Product._meta.pk.to_python
+    return [
+        {
+            'product_id': to_pk(ids[i]),
+            'supplier_id': to_pk(suppliers[i]),
+            'quantity': int(q),
+            'velocity': round(float(velocity[i]), 3),
+            'lead_time_demand': round(float(lead_time_demand[i]), 2),
+            'reorder_point': round(float(reorder_point[i]), 2),
+            'stock_position': int(position[i]),
+        }
+        for i, q in zip(to_order.tolist(), quantity.tolist())
+    ]
+
+
+def create_draft_orders(suggestions, today, user=None):
+    """One draft supplier order per supplier for the given suggestions; returns the orders"""
+    by_supplier = defaultdict(list)
+    for suggestion in suggestions:
+        by_supplier[suggestion['supplier_id']].append(suggestion)
+    if not by_supplier:
+        return []
+
+    products = Product.objects.in_bulk([s['product_id'] for s in suggestions])
+    with transaction.atomic():
+        orders, items = [], []
+        numbers = next_numbers('PO', len(by_supplier), (SupplierOrder.objects, 'purchase_order_number'))
+        for number, (supplier_id, lines) in zip(numbers, by_supplier.items()):
+            order = SupplierOrder(
+                supplier_id=supplier_id, purchase_order_number=number, order_date=today,
+                status='draft', created_by=user, notes='Generated from reorder suggestions',
+            )
+            order_items = []
+            for line in lines:
+                product = products[line['product_id']]
+                item = SupplierOrderItem(
+                    order=order, product=product, description=product.name,
+                    quantity=Decimal(line['quantity']), unit_price=product.cost_price,
+                    tax_rate=product.tax_rate,
+                )
+                item.calculate_amounts()
+                order_items.append(item)
+            order.subtotal = sum(item.subtotal for item in order_items)
+            order.tax_amount = sum(item.tax for item in order_items)
+            order.total = order.subtotal + order.tax_amount
+            orders.append(order)
+            items.extend(order_items)
+
+        SupplierOrder.objects.bulk_create(orders, batch_size=500)
+        SupplierOrderItem.objects.bulk_create(items, batch_size=1000)
+    return orders
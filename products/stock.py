@@ -0,0 +1,211 @@
+# ============================================================================
+# products/stock.py - Mouvements de stock et niveau de stock à une date
+# ============================================================================
+"""
+Stock ledger.
+
+Every change of ``Product.quantity_in_stock`` is recorded as a
+:class:`~products.models.StockMovement` and applied with an
+``F('quantity_in_stock') + n`` UPDATE in the same transaction, so
+concurrent receipts, deliveries and edits add up instead of overwriting
+each other.
+
+Lines using :class:`StockLineMixin` (supplier receipts and delivery note
+lines) move stock by the difference between their stored and new
+quantity on save, back out their quantity when deleted, and move it in
+one pass per product on ``bulk_create``. Stock counts whole units: the
+fractional part of a line quantity is not counted.
+
+:func:`stock_at` reads the level at the end of a past day from the
+nearest daily :class:`~products.models.StockSnapshot` plus the movements
+between that snapshot and the day; :func:`take_stock_snapshot` writes
+those snapshots (see the ``snapshot_stock`` command).
+"""
+import datetime
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from .models import Product, StockMovement, StockSnapshot
+
+# Lines moving stock
+STOCK_LINE_MODELS = [
+    'orders.SupplierOrderItem',
+    'delivery.DeliveryItem',
+]
+
+
+def stock_units(quantity):
+    return int(quantity or 0)
+
+
+class InsufficientStock(ValueError):
+    """Not enough available stock to reserve or take out units of a product"""
+
+    def __init__(self, product_name, requested):
+        self.product_name = product_name
+        self.requested = requested
+        super().__init__(f"Insufficient stock for {product_name}: {requested} requested.")
+
+
+def _apply(deltas, keep_reserved=False):
+    """
+    Add the deltas to the products' stock. With ``keep_reserved``, a
+    stock-out only applies while the units reserved by customer orders
+    stay in stock, else :class:`InsufficientStock` is raised.
+    """
+    now = timezone.now()
+    for product_id, delta in deltas.items():
+        if not delta:
+            continue
+        products = Product.objects.filter(pk=product_id)
+        if keep_reserved and delta < 0:
+            products = products.filter(quantity_in_stock__gte=F('quantity_reserved') - delta)
+        if not products.update(quantity_in_stock=F('quantity_in_stock') + delta, updated_at=now) and keep_reserved:
+            name = Product.objects.filter(pk=product_id).values_list('name', flat=True).first()
+            raise InsufficientStock(name, -delta)
+
+
+def move_stock(product_id, quantity, kind, reference='', apply=True, keep_reserved=False):
+    """Record a movement of ``quantity`` units and apply it to the product's stock"""
+    if not product_id or not quantity:
+        return None
+    with transaction.atomic():
+        movement = StockMovement.objects.create(
+            product_id=product_id, kind=kind, quantity=quantity, reference=reference,
+        )
+        if apply:
+            _apply({product_id: quantity}, keep_reserved)
+    return movement
+
+
+class StockLineMixin:
+    """Moves the product's stock by ``stock_quantity_field`` times ``stock_direction``"""
+    stock_quantity_field = None
+    stock_direction = 1
+    stock_kind = None
+
+    def stock_reference(self):
+        return ''
+
+    def stock_moved(self, product_id, quantity):
+        """Called in the transaction after the line moved ``quantity`` units of the product"""
+
+    def stock_keeps_reserved(self):
+        """Whether taking the line's units out must leave the reserved units in stock"""
+        return False
+
+    def stock_units(self):
+        return self.stock_direction * stock_units(getattr(self, self.stock_quantity_field))
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None and not {self.stock_quantity_field, 'product'}.intersection(update_fields):
+            super().save(*args, update_fields=update_fields, **kwargs)
+            return
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = type(self)._default_manager.filter(pk=self.pk).values_list(
+                    'product_id', self.stock_quantity_field
+                ).first()
+            super().save(*args, update_fields=update_fields, **kwargs)
+
+            moves = defaultdict(int)
+            if previous is not None:
+                moves[previous[0]] -= self.stock_direction * stock_units(previous[1])
+            moves[self.product_id] += self.stock_units()
+            for product_id, quantity in moves.items():
+                if move_stock(product_id, quantity, self.stock_kind, self.stock_reference(),
+                              keep_reserved=self.stock_keeps_reserved()):
+                    self.stock_moved(product_id, quantity)
+
+
+class StockLineQuerySet(models.QuerySet):
+    """Moves stock for lines inserted with bulk_create, which bypasses save()"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            moved = [obj for obj in objs if obj.product_id and obj.stock_units()]
+            movements = [
+                StockMovement(
+                    product_id=obj.product_id, kind=obj.stock_kind,
+                    quantity=obj.stock_units(), reference=obj.stock_reference(),
+                )
+                for obj in moved
+            ]
+            StockMovement.objects.bulk_create(movements)
+            deltas, guarded = defaultdict(int), defaultdict(int)
+            for obj, movement in zip(moved, movements):
+                (guarded if obj.stock_keeps_reserved() else deltas)[movement.product_id] += movement.quantity
+            _apply(deltas)
+            for obj in moved:
+                obj.stock_moved(obj.product_id, obj.stock_units())
+            # Once the other lines have consumed their reservations
+            _apply(guarded, keep_reserved=True)
+        return created
+
+
+def _reverse_on_delete(sender, instance, **kwargs):
+    # Sent inside the deletion's transaction, for cascades and queryset deletes too
+    move_stock(instance.product_id, -instance.stock_units(), instance.stock_kind, instance.stock_reference())
+
+
+def connect_stock():
+    for label in STOCK_LINE_MODELS:
+        post_delete.connect(_reverse_on_delete, sender=apps.get_model(label), dispatch_uid=f'stock_{label}')
+
+
+def _end_of_day(day):
+    return timezone.make_aware(datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min))
+
+
+def _moved(product_id, start, end):
+    """Sum of the movements of a product created in [start, end)"""
+    movements = StockMovement.objects.filter(product_id=product_id, created_at__gte=start)
+    if end is not None:
+        movements = movements.filter(created_at__lt=end)
+    return movements.aggregate(total=Sum('quantity'))['total'] or 0
+
+
+def stock_at(product, day):
+    """Stock level of ``product`` at the end of ``day``"""
+    product_id = getattr(product, 'pk', product)
+    snapshots = StockSnapshot.objects.filter(product_id=product_id)
+    before = snapshots.filter(date__lte=day).order_by('-date').values_list('date', 'quantity').first()
+    after = snapshots.filter(date__gt=day).order_by('date').values_list('date', 'quantity').first()
+
+    if before is not None and (after is None or day - before[0] <= after[0] - day):
+        # Forward from the snapshot
+        return before[1] + _moved(product_id, _end_of_day(before[0]), _end_of_day(day))
+    if after is not None:
+        # Backward from the snapshot
+        return after[1] - _moved(product_id, _end_of_day(day), _end_of_day(after[0]))
+    # Backward from the live level
+    current = Product.objects.filter(pk=product_id).values_list('quantity_in_stock', flat=True).get()
+    return current - _moved(product_id, _end_of_day(day), None)
+
+
+def take_stock_snapshot(day):
+    """Store the stock level of every product at the end of ``day``"""
+    with transaction.atomic():
+        moved_since = dict(
+            StockMovement.objects.filter(created_at__gte=_end_of_day(day))
+            .values('product_id').annotate(total=Sum('quantity'))
+            .values_list('product_id', 'total')
+        )
+        snapshots = [
+            StockSnapshot(product_id=pk, date=day, quantity=quantity - moved_since.get(pk, 0))
+            for pk, quantity in Product.objects.values_list('pk', 'quantity_in_stock').iterator()
+        ]
+        StockSnapshot.objects.bulk_create(
+            snapshots, batch_size=1000, update_conflicts=True,
+            unique_fields=['product', 'date'], update_fields=['quantity'],
+        )
+    return len(snapshots)
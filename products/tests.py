@@ -1,3 +1,179 @@
+# ============================================================================
+# products/tests.py - Tests du registre de stock
+# ============================================================================
+import datetime
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+
+from clients.models import Client
+from delivery.models import DeliveryItem, DeliveryNote
+from orders.models import CustomerOrder, CustomerOrderItem, SupplierOrder, SupplierOrderItem
+from suppliers.models import Supplier
+
+from .models import Product, StockMovement, StockSnapshot
+from .stock import InsufficientStock, move_stock, stock_at, take_stock_snapshot
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Widget', sku='W-1', unit_price=Decimal('10'), quantity_in_stock=10)
+
+    def stock(self):
+        return Product.objects.values_list('quantity_in_stock', flat=True).get(pk=self.product.pk)
+
+    def movements(self):
+        return list(self.product.stock_movements.order_by('pk').values_list('kind', 'quantity', 'reference'))
+
+    def test_opening_balance(self):
+        self.assertEqual(self.movements(), [(StockMovement.ADJUSTMENT, 10, 'Opening balance')])
+        self.assertEqual(self.stock(), 10)
+
+    def test_edited_stock_is_an_adjustment(self):
+        product = Product.objects.get(pk=self.product.pk)
+        move_stock(product.pk, 5, StockMovement.RECEIPT)  # concurrent with the edit
+        product.quantity_in_stock = 7
+        product.save()
+
+        self.assertEqual(self.movements()[-1], (StockMovement.ADJUSTMENT, -3, 'Manual adjustment'))
+        self.assertEqual(self.stock(), 12)
+        self.assertEqual(product.quantity_in_stock, 12)
+
+    def test_unchanged_stock_records_nothing(self):
+        product = Product.objects.get(pk=self.product.pk)
+        product.name = 'Renamed'
+        product.save()
+        self.assertEqual(len(self.movements()), 1)
+
+    def test_receipt_lines(self):
+        supplier = Supplier.objects.create(name='Supplier', address='1 rue', city='Lyon', postal_code='69001',
+                                           country='FR')
+        order = SupplierOrder.objects.create(supplier=supplier, order_date=datetime.date(2026, 1, 5))
+        line = SupplierOrderItem.objects.create(
+            order=order, product=self.product, description='Widget',
+            quantity=Decimal('6'), unit_price=Decimal('5'), quantity_received=Decimal('4'),
+        )
+        self.assertEqual(self.stock(), 14)
+
+        line.quantity_received = Decimal('6')
+        line.save()
+        self.assertEqual(self.stock(), 16)
+        self.assertEqual(self.movements()[-1], (StockMovement.RECEIPT, 2, order.purchase_order_number))
+
+        line.delete()
+        self.assertEqual(self.stock(), 10)
+        self.assertEqual(self.movements()[-1], (StockMovement.RECEIPT, -6, order.purchase_order_number))
+
+    def test_delivery_lines(self):
+        client = Client.objects.create(name='Client', address='1 rue', city='Paris', postal_code='75001', country='FR')
+        note = DeliveryNote.objects.create(client=client, delivery_date=datetime.date(2026, 1, 6))
+        line = DeliveryItem.objects.create(
+            delivery_note=note, product=self.product, description='Widget',
+            quantity_ordered=Decimal('5'), quantity_delivered=Decimal('3'), unit_price=Decimal('10'),
+        )
+        self.assertEqual(self.stock(), 7)
+
+        line.quantity_delivered = Decimal('1')
+        line.save()
+        self.assertEqual(self.stock(), 9)
+
+        # Moving the line to another product moves the stock with it
+        other = Product.objects.create(name='Gadget', sku='G-1', unit_price=Decimal('10'), quantity_in_stock=5)
+        line.product = other
+        line.save()
+        self.assertEqual(self.stock(), 10)
+        self.assertEqual(Product.objects.get(pk=other.pk).quantity_in_stock, 4)
+
+        DeliveryItem.objects.bulk_create([
+            DeliveryItem(delivery_note=note, product=self.product, description='Widget',
+                         quantity_ordered=Decimal('2'), quantity_delivered=Decimal(n), unit_price=Decimal('10'))
+            for n in ('2', '1.5')
+        ])
+        self.assertEqual(self.stock(), 7)
+
+        note.delete()
+        self.assertEqual(self.stock(), 10)
+        self.assertEqual(Product.objects.get(pk=other.pk).quantity_in_stock, 5)
+
+
+class StockAtTests(TestCase):
+    """stock_at() from snapshots matches a replay of every movement"""
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Widget', sku='W-1', unit_price=Decimal('10'), quantity_in_stock=10)
+        self.start = datetime.date(2026, 1, 1)
+        self.product.stock_movements.update(created_at=self.at(0))
+        for day, quantity in [(1, 5), (3, -2), (3, 4), (6, -7), (9, 3)]:
+            movement = move_stock(self.product.pk, quantity, StockMovement.ADJUSTMENT)
+            StockMovement.objects.filter(pk=movement.pk).update(created_at=self.at(day))
+
+    def day(self, n):
+        return self.start + datetime.timedelta(days=n)
+
+    def at(self, n):
+        return timezone.make_aware(datetime.datetime.combine(self.day(n), datetime.time(12)))
+
+    def replay(self, n):
+        movements = self.product.stock_movements.filter(created_at__lt=self.at(n + 1).replace(hour=0))
+        return sum(movements.values_list('quantity', flat=True))
+
+    def assert_matches_replay(self):
+        for n in range(-1, 12):
+            with self.subTest(day=self.day(n)):
+                self.assertEqual(stock_at(self.product, self.day(n)), self.replay(n))
+
+    def test_without_snapshots(self):
+        self.assert_matches_replay()
+
+    def test_from_snapshots(self):
+        take_stock_snapshot(self.day(2))
+        take_stock_snapshot(self.day(7))
+        self.assertEqual(
+            list(StockSnapshot.objects.order_by('date').values_list('quantity', flat=True)),
+            [self.replay(2), self.replay(7)],
+        )
+        self.assert_matches_replay()
+
+
+class UnorderedDeliveryTests(TestCase):
+    """Delivery notes without a customer order leave the orders' reserved units in stock"""
+
+    def setUp(self):
+        client = Client.objects.create(name='Client', address='1 rue', city='Paris', postal_code='75001', country='FR')
+        self.product = Product.objects.create(name='Widget', sku='W-1', unit_price=Decimal('10'), quantity_in_stock=10)
+        order = CustomerOrder.objects.create(client=client, order_date=datetime.date(2026, 1, 5))
+        CustomerOrderItem.objects.create(
+            order=order, product=self.product, description='Widget', quantity=Decimal('8'), unit_price=Decimal('10'),
+        )
+        order.status = 'confirmed'
+        order.save()
+        self.note = DeliveryNote.objects.create(client=client, delivery_date=datetime.date(2026, 1, 6))
+
+    def item(self, delivered):
+        return DeliveryItem(
+            delivery_note=self.note, product=self.product, description='Widget',
+            quantity_ordered=Decimal(delivered), quantity_delivered=Decimal(delivered), unit_price=Decimal('10'),
+        )
+
+    def stock(self):
+        self.product.refresh_from_db()
+        return self.product.quantity_in_stock, self.product.quantity_reserved
+
+    def test_save_takes_only_unreserved_units(self):
+        self.item(2).save()
+        self.assertEqual(self.stock(), (8, 8))
+
+        with self.assertRaises(InsufficientStock):
+            self.item(1).save()
+        self.assertEqual(self.stock(), (8, 8))
+        self.assertEqual(self.note.items.count(), 1)
+
+    def test_bulk_create_takes_only_unreserved_units(self):
+        with self.assertRaises(InsufficientStock):
+            DeliveryItem.objects.bulk_create([self.item(2), self.item(1)])
+        self.assertEqual(self.stock(), (10, 8))
+        self.assertFalse(self.note.items.exists())
 
-# Create your tests here.
+        DeliveryItem.objects.bulk_create([self.item(1), self.item(1)])
+        self.assertEqual(self.stock(), (8, 8))
@@ -1,7 +1,7 @@
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
-from django.db.models import Q, F
+from django.db.models import Q
 from django.contrib import messages
 from core.mixins import SearchMixin, UserCreatedMixin, FormMessageMixin
 from .models import Product
@@ -27,7 +27,7 @@ class ProductListView(LoginRequiredMixin, SearchMixin, ListView):
 
         # Filter low stock
         if self.request.GET.get('low_stock'):
-            queryset = queryset.filter(quantity_in_stock__lte=F('reorder_level'))
+            queryset = queryset.filter(is_low_stock=True)
 
         return queryset.order_by('name')
 
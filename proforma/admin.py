@@ -15,6 +15,6 @@ class ProformaItemInline(admin.TabularInline):
 class ProformaInvoiceAdmin(admin.ModelAdmin):
     list_display = ('proforma_number', 'client', 'issue_date', 'expiry_date', 'total', 'status')
     list_filter = ('status', 'issue_date', 'created_at')
-    search_fields = ('proforma_number', 'client__name', 'description')
+    search_fields = ('proforma_number', 'client_name', 'description')
     readonly_fields = ('id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at')
     inlines = [ProformaItemInline]
@@ -2,6 +2,7 @@
 # proforma/forms.py
 # ============================================================================
 from django import forms
+from core.widgets import AutocompleteSelect
 from .models import ProformaInvoice, ProformaItem
 
 
@@ -12,7 +13,7 @@ class ProformaInvoiceForm(forms.ModelForm):
         model = ProformaInvoice
         fields = ['client', 'issue_date', 'expiry_date', 'status', 'description', 'notes']
         widgets = {
-            'client': forms.Select(attrs={
+            'client': AutocompleteSelect('clients', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'issue_date': forms.DateInput(attrs={
@@ -44,7 +45,7 @@ class ProformaItemForm(forms.ModelForm):
         model = ProformaItem
         fields = ['product', 'description', 'quantity', 'unit_price', 'tax_rate']
         widgets = {
-            'product': forms.Select(attrs={
+            'product': AutocompleteSelect('products', attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500'
             }),
             'description': forms.TextInput(attrs={
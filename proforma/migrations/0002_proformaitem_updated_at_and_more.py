@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 02:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_clients_cli_updated_bf75f6_idx'),
+        ('products', '0002_product_products_pr_updated_e6e93b_idx'),
+        ('proforma', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proformaitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='proformainvoice',
+            index=models.Index(fields=['updated_at', 'id'], name='proforma_pr_updated_71d24e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proformaitem',
+            index=models.Index(fields=['updated_at', 'id'], name='proforma_pr_updated_5e94db_idx'),
+        ),
+    ]
@@ -7,10 +7,11 @@ from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-import uuid
+from core.ids import uuid7
+from core.snapshots import PartySnapshotMixin, PartySnapshotQuerySet
 
 
-class ProformaInvoice(models.Model):
+class ProformaInvoice(PartySnapshotMixin, models.Model):
     """Proforma Invoice model"""
 
     STATUS_CHOICES = [
@@ -21,9 +22,12 @@ class ProformaInvoice(models.Model):
         ('expired', _('Expired')),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     proforma_number = models.CharField(max_length=100, unique=True, db_index=True)
     client = models.ForeignKey('clients.Client', on_delete=models.PROTECT, related_name='proforma_invoices')
+    # Snapshot of the client, see core.snapshots
+    client_name = models.CharField(max_length=255, blank=True, default='', editable=False)
+    client_tax_id = models.CharField(max_length=50, blank=True, default='', editable=False)
 
     issue_date = models.DateField(db_index=True)
     expiry_date = models.DateField()
@@ -40,10 +44,16 @@ class ProformaInvoice(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PartySnapshotQuerySet.as_manager()
+
     class Meta:
         ordering = ['-issue_date']
         verbose_name = _('Proforma Invoice')
         verbose_name_plural = _('Proforma Invoices')
+        indexes = [
+            models.Index(fields=['client_name']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Proforma {self.proforma_number}"
@@ -88,15 +98,23 @@ class ProformaItem(models.Model):
     total = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Proforma Item')
         verbose_name_plural = _('Proforma Items')
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
-    def save(self, *args, **kwargs):
+    def calculate_amounts(self):
+        """Compute line subtotal, tax and total without saving"""
         self.subtotal = (self.quantity * self.unit_price).quantize(Decimal('0.01'))
         self.tax = (self.subtotal * self.tax_rate / 100).quantize(Decimal('0.01'))
         self.total = (self.subtotal + self.tax).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        self.calculate_amounts()
         super().save(*args, **kwargs)
         self.proforma.calculate_totals()
 
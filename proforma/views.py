@@ -7,6 +7,7 @@ from django.urls import reverse_lazy
 from django.db.models import Q
 from django.contrib import messages
 from django.utils import timezone
+from core.search import search_filter
 from .models import ProformaInvoice, ProformaItem
 from .forms import ProformaInvoiceForm, ProformaItemForm
 
@@ -28,10 +29,7 @@ class ProformaInvoiceListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(proforma_number__icontains=search) |
-                Q(client__name__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['proforma_number', 'client_name'])
 
         return queryset
 
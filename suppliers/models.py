@@ -1,13 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
-import uuid
 
+from core.search import SearchColumnsMixin, SearchColumnsQuerySet
+from core.ids import uuid7
 
-class Supplier(models.Model):
+
+class Supplier(SearchColumnsMixin, models.Model):
     """Supplier/Vendor model"""
+    search_columns = ('name', 'company', 'email')
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=255, db_index=True, verbose_name=_('Supplier Name'))
     company = models.CharField(max_length=255, blank=True)
     email = models.EmailField(blank=True)
@@ -18,6 +21,9 @@ class Supplier(models.Model):
     postal_code = models.CharField(max_length=20)
     country = models.CharField(max_length=100)
     tax_id = models.CharField(max_length=50, blank=True, verbose_name=_('Tax ID'))
+    # Key of the record in the system it is synced from (see BulkUpsertMixin); NULL when not synced
+    external_reference = models.CharField(max_length=100, unique=True, null=True, blank=True,
+                                          verbose_name=_('External Reference'))
     website = models.URLField(blank=True)
     contact_person = models.CharField(max_length=255, blank=True)
     payment_terms = models.CharField(max_length=100, blank=True)
@@ -26,6 +32,13 @@ class Supplier(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='suppliers_created')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Lowercased, accent-stripped copies for search (see core.search)
+    name_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+    company_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+    email_search = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
+
+    objects = SearchColumnsQuerySet.as_manager()
     
     class Meta:
         ordering = ['name']
@@ -34,6 +47,7 @@ class Supplier(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['email']),
+            models.Index(fields=['updated_at', 'id']),
         ]
     
     def __str__(self):
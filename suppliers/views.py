@@ -11,6 +11,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q
 from django.contrib import messages
+from core.search import search_filter
 from .models import Supplier
 from .forms import SupplierForm
 
@@ -28,11 +29,7 @@ class SupplierListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(company__icontains=search)
-            )
+            queryset = search_filter(queryset, search, ['name', 'email', 'company'])
 
         return queryset.order_by('name')
 